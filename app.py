@@ -1,141 +1,112 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-from datetime import datetime
 import os
-import shutil
-from fpdf import FPDF
-from io import BytesIO
-import matplotlib.pyplot as plt
-import matplotlib
 import tempfile
-import numpy as np
-
-# Configuración Matplotlib
-matplotlib.use('Agg')
+import time
+import uuid
+from functools import partial
+from sst import medicion
+from sst.medicion import medido
+from sst.schema import COL_VERSION, CONSOLIDADO, LOGO_FILE, get_structure_for_year, mes_idx, version_datos, version_incremental
+from sst.kpi import COLS_DERIVADAS, calcular_derivados, centros, columnas_entrada, preparar_anio, resumen_periodo
+from sst.incremental import RegistroCambios, diferencias
+from sst.agregados import IndiceAcumulado
+from sst.storage import ConflictoVersion, abrir_almacen, save_data
+from sst.compacto import Observaciones, compactar, expandir
+from sst.compartido import activar_cow, cargar_compartido, firma_almacen
+from sst.eventos import TIPOS, abrir_registro, registrar
+from sst.excel import excel_cacheado
+from sst.importacion import aplicar_importacion, errores_csv, preparar_importacion
+from sst.lote import generar_lote_zip, trabajos_lote
+from sst.insights import generar_insight_automatico
+from sst.alertas import METAS_DEFECTO, NIVELES, alertas
+from sst.cola import cola_informes
+from sst.historial import ACTIVO as HISTORIAL_ACTIVO, abrir_historial, fijar_usuario, registrar_informe, restaurar
 
 # --- 1. CONFIGURACIÓN ---
 st.set_page_config(page_title="SST - Maderas Galvez", layout="wide", page_icon="🌲")
+T0_EJECUCION = time.perf_counter()
+st.session_state.setdefault('sesion_id', uuid.uuid4().hex[:8])
+medicion.iniciar_ejecucion('app', st.session_state['sesion_id'])  # no-op con la medición desactivada
+activar_cow()
+fijar_usuario(st.session_state.get('usuario'))  # autor de los guardados de esta ejecución (historial)
 
 # --- 2. GESTIÓN DE DATOS ---
-CSV_FILE = "base_datos_galvez_v26.csv"
-LOGO_FILE = "logo_empresa_persistente.png"
-MESES_ORDEN = ['Enero','Febrero','Marzo','Abril','Mayo','Junio','Julio','Agosto','Septiembre','Octubre','Noviembre','Diciembre']
-
-# COLORES
-COLOR_PRIMARY = (183, 28, 28)
-COLOR_SECONDARY = (50, 50, 50)
-
-def get_structure_for_year(year):
-    data = []
-    for m in MESES_ORDEN:
-        data.append({
-            'Año': int(year), 'Mes': m,
-            # DATOS BASE
-            'Masa Laboral': 0.0, 'Horas Extras': 0.0, 'Horas Ausentismo': 0.0,
-            # ACCIDENTABILIDAD
-            'Accidentes CTP': 0.0, 'Accidentes Fatales': 0.0,
-            'Días Perdidos': 0.0, 'Días Cargo': 0.0,
-            # ENFERMEDADES PROFESIONALES
-            'Enf. Profesionales': 0.0, 'Días Perdidos EP': 0.0,
-            # SINIESTRALIDAD DS67
-            'Pensionados': 0.0, 'Indemnizados': 0.0,
-            # GESTIÓN
-            'Insp. Programadas': 0.0, 'Insp. Ejecutadas': 0.0,
-            'Cap. Programadas': 0.0, 'Cap. Ejecutadas': 0.0,
-            'Medidas Abiertas': 0.0, 'Medidas Cerradas': 0.0,
-            'Expuestos Silice/Ruido': 0.0, 'Vig. Salud Vigente': 0.0,
-            'Observaciones': "",
-            # CALCULADOS
-            'HHT': 0.0, 'Tasa Acc.': 0.0, 'Tasa Sin.': 0.0, 'Indice Frec.': 0.0, 'Indice Grav.': 0.0
-        })
-    return pd.DataFrame(data)
-
-def inicializar_db_completa():
-    df_24 = get_structure_for_year(2024)
-    df_25 = get_structure_for_year(2025)
-    df_26 = get_structure_for_year(2026)
-    return pd.concat([df_24, df_25, df_26], ignore_index=True)
-
-def procesar_datos(df, factor_base=210):
-    # Limpieza de tipos
-    cols_exclude = ['Año', 'Mes', 'Observaciones']
-    for col in df.columns:
-        if col not in cols_exclude:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-    
-    df['Año'] = df['Año'].fillna(2026).astype(int)
-    if 'Observaciones' not in df.columns: df['Observaciones'] = ""
-    df['Observaciones'] = df['Observaciones'].fillna("").astype(str)
-
-    # CÁLCULOS CRÍTICOS (HHT BASE 210)
-    # Fórmula Mutual: (Trabajadores * 210) + Extras - Ausentismo
-    df['HHT'] = (df['Masa Laboral'] * factor_base) + df['Horas Extras'] - df['Horas Ausentismo']
-    df['HHT'] = df['HHT'].apply(lambda x: x if x > 0 else 0)
-    
-    def calc_row(row):
-        masa = row['Masa Laboral']
-        hht = row['HHT']
-        if masa <= 0 or hht <= 0: return 0, 0, 0, 0
-        
-        ta = (row['Accidentes CTP'] / masa) * 100
-        ts = (row['Días Perdidos'] / masa) * 100 
-        if_ = (row['Accidentes CTP'] * 1000000) / hht
-        ig = ((row['Días Perdidos'] + row['Días Cargo']) * 1000000) / hht
-        return ta, ts, if_, ig
-
-    result = df.apply(calc_row, axis=1, result_type='expand')
-    df['Tasa Acc.'] = result[0]
-    df['Tasa Sin.'] = result[1]
-    df['Indice Frec.'] = result[2]
-    df['Indice Grav.'] = result[3]
-    return df
-
-def load_data():
-    if os.path.exists(CSV_FILE):
-        try:
-            df = pd.read_csv(CSV_FILE)
-            if df.empty: return inicializar_db_completa()
-            # Reparación estructura
-            ref_df = get_structure_for_year(2026)
-            for col in ref_df.columns:
-                if col not in df.columns:
-                    if col == 'Observaciones': df[col] = ""
-                    else: df[col] = 0.0
-            # Se procesa inicialmente con 210, luego la UI lo actualiza si cambia
-            return procesar_datos(df[ref_df.columns], 210)
-        except: return inicializar_db_completa()
-    return inicializar_db_completa()
-
-def save_data(df, factor_base):
-    df_calc = procesar_datos(df, factor_base)
-    if os.path.exists(CSV_FILE):
-        try: shutil.copy(CSV_FILE, f"{CSV_FILE}.bak")
-        except: pass
-    df_calc.to_csv(CSV_FILE, index=False)
-    return df_calc
-
-def generar_insight_automatico(row_mes, ta_acum, metas):
-    insights = []
-    if ta_acum > metas['meta_ta']:
-        insights.append(f"⚠️ <b>ALERTA:</b> Tasa Acumulada ({ta_acum:.2f}%) excede meta ({metas['meta_ta']}%)")
-    elif ta_acum > (metas['meta_ta'] * 0.8):
-        insights.append(f"🔸 <b>PRECAUCIÓN:</b> Tasa Acumulada al límite.")
+def set_df(df, filas=None):
+    # Toda modificación de df_main pasa por aquí: nueva versión de datos e índice de acumulados.
+    # Con `filas` (solo esas filas cambiaron) versión e índice se actualizan de forma incremental.
+    # df_main queda en formato compacto (sst.compacto); las columnas ya compactas no se copian
+    df = compactar(df)
+    st.session_state['df_main'] = df
+    indice = st.session_state.get('indice_acum')
+    if indice is not None and filas is not None:
+        st.session_state['data_version'] = version_incremental(st.session_state['data_version'], df, filas)
+        indice.actualizar_filas(df, filas)
     else:
-        insights.append(f"✅ <b>EXCELENTE:</b> Accidentabilidad bajo control.")
-    
-    if row_mes['Tasa Sin.'] > 0:
-        insights.append(f"🚑 <b>DÍAS PERDIDOS:</b> {int(row_mes['Días Perdidos'])} días perdidos.")
-    
-    if not insights: return "Sin desviaciones."
-    return "<br>".join(insights)
-
-if 'df_main' not in st.session_state:
-    st.session_state['df_main'] = load_data()
+        st.session_state['data_version'] = version_datos(df)
+        st.session_state['indice_acum'] = IndiceAcumulado(df)
+
+def guardar(df, factor, cambios, motivo="guardado"):
+    # Guardado optimista: si otro usuario modificó esas filas desde que se leyeron, no se
+    # sobreescribe nada; se avisa y se recarga la base vigente. Devuelve True si se guardó.
+    # Las observaciones editadas (fuera de df_main) se escriben en la misma transacción
+    textos = {idx: v['Observaciones'] for idx, v in cambios.textos.items() if 'Observaciones' in v}
+    try:
+        set_df(save_data(df, factor, filas=cambios.filas, textos=textos, motivo=motivo), cambios.filas)
+    except ConflictoVersion as e:
+        st.session_state['conflicto'] = f"No se guardó: {e}. Se cargaron los datos vigentes; revise y vuelva a guardar."
+        recargar(); return False
+    finally: cambios.limpiar()
+    for idx, t in textos.items(): st.session_state['observaciones'].actualizar(df.at[idx, 'Centro'], df.at[idx, 'Año'], df.at[idx, 'Mes'], t)
+    st.session_state['firma_datos'] = firma_almacen()
+    return True
+
+def texto_observaciones(centro, year, month):
+    # Observación del mes (consolidado: una línea por centro, como consolidar())
+    obs = st.session_state['observaciones']
+    if centro is not None: return obs.texto(centro, year, month)
+    cs = centros(st.session_state['df_main'])
+    return obs.texto(cs[0], year, month) if len(cs) == 1 else obs.consolidado(cs, year, month)
+
+def excel_completo(df, version, obs):
+    # Cache por versión; la tabla se expande y las observaciones se leen del almacén solo al generar el libro
+    return excel_cacheado(df, version, preparar=partial(expandir, observaciones=obs))
+
+def versiones_previas(nombre, df, filas):
+    # Versión de cada fila (clave centro/año/mes) con la que se mostró la vista en la ejecución
+    # anterior; si otro usuario guardó entre medio difiere de la actual y el envío se rechaza
+    claves = list(zip(df.loc[filas, 'Centro'], df.loc[filas, 'Año'], df.loc[filas, 'Mes']))
+    actuales = dict(zip(claves, df.loc[filas, COL_VERSION] if COL_VERSION in df.columns else [0] * len(claves)))
+    previas = st.session_state.get(nombre, {})
+    st.session_state[nombre] = actuales
+    return {idx: (previas.get(k, v), v) for idx, k, v in zip(filas, claves, actuales.values())}
+
+def leer_archivo(path):
+    with open(path, "rb") as f: return f.read()
+
+def recargar():
+    # Vista copy-on-write de la base compartida por todas las sesiones del servidor
+    try: df, firma = cargar_compartido()
+    except Exception as e:
+        # La base no se reemplaza por una vacía: se informa y se detiene hasta corregir el archivo
+        st.error(f"No se pudo leer la base de datos: {e}"); st.stop()
+    st.session_state['firma_datos'] = firma
+    st.session_state['observaciones'] = Observaciones(abrir_almacen())
+    if 'factor_hht_cache' in st.session_state: df = calcular_derivados(df, st.session_state['factor_hht_cache'])
+    set_df(df)
+
+# Carga inicial, o recarga si otra sesión guardó cambios
+if 'df_main' not in st.session_state or st.session_state['firma_datos'] != firma_almacen():
+    recargar()
+if 'conflicto' in st.session_state: st.error(st.session_state.pop('conflicto'))
+if 'aviso' in st.session_state: st.success(st.session_state.pop('aviso'))
 
 # --- 3. BARRA LATERAL ---
-with st.sidebar:
+with st.sidebar, medicion.tramo('app.barra_lateral'):
     st.title("🌲 Panel de Control")
+    st.text_input("👤 Usuario", key='usuario', placeholder=os.environ.get('SST_USUARIO', ''), help="Queda registrado en el historial de cambios.")
     uploaded_logo = st.file_uploader("Actualizar Logo", type=['png', 'jpg'])
     if uploaded_logo:
         with open(LOGO_FILE, "wb") as f: f.write(uploaded_logo.getbuffer())
@@ -151,9 +122,27 @@ with st.sidebar:
     
     # Recalcular en tiempo real
     if 'factor_hht_cache' not in st.session_state or st.session_state['factor_hht_cache'] != factor_hht:
-        st.session_state['df_main'] = procesar_datos(st.session_state['df_main'], factor_hht)
+        set_df(calcular_derivados(st.session_state['df_main'], factor_hht))
         st.session_state['factor_hht_cache'] = factor_hht
 
+    st.markdown("---")
+    st.markdown("### 🏭 Centro de Trabajo")
+    centros_present = centros(st.session_state['df_main'])
+    # Con más de un centro se ofrece el consolidado (sumas de todos los centros)
+    opciones_centro = ([CONSOLIDADO] if len(centros_present) > 1 else []) + centros_present
+    sel_centro_txt = st.selectbox("Centro", opciones_centro)
+    sel_centro = None if sel_centro_txt == CONSOLIDADO else sel_centro_txt
+    c_c1, c_c2 = st.columns(2)
+    new_centro_input = c_c1.text_input("Nuevo centro", label_visibility="collapsed", placeholder="Nuevo centro")
+    if c_c2.button("Crear Centro") and new_centro_input.strip():
+        if new_centro_input.strip() in centros_present: st.warning("Ya existe.")
+        else:
+            anios = sorted(st.session_state['df_main']['Año'].unique())
+            df_new = pd.concat([get_structure_for_year(y, new_centro_input.strip()) for y in anios], ignore_index=True)
+            df_all = pd.concat([st.session_state['df_main'], df_new], ignore_index=True)
+            cambios = RegistroCambios(); cambios.marcar(*df_all.index[-len(df_new):])
+            guardar(df_all, factor_hht, cambios, motivo=f"crear centro {new_centro_input.strip()}"); st.rerun()
+
     st.markdown("---")
     st.markdown("### 📅 Gestión de Años")
     years_present = st.session_state['df_main']['Año'].unique()
@@ -162,337 +151,274 @@ with st.sidebar:
     if c_y2.button("Crear Año"):
         if new_year_input in years_present: st.warning("Ya existe.")
         else:
-            df_new = get_structure_for_year(new_year_input)
-            st.session_state['df_main'] = pd.concat([st.session_state['df_main'], df_new], ignore_index=True)
-            save_data(st.session_state['df_main'], factor_hht); st.rerun()
+            # El año se crea para todos los centros
+            df_new = pd.concat([get_structure_for_year(new_year_input, c) for c in centros_present], ignore_index=True)
+            df_all = pd.concat([st.session_state['df_main'], df_new], ignore_index=True)
+            cambios = RegistroCambios(); cambios.marcar(*df_all.index[-len(df_new):])
+            guardar(df_all, factor_hht, cambios, motivo=f"crear año {new_year_input}"); st.rerun()
 
     st.markdown("---")
-    def to_excel(df):
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='SST_Data')
-        return output.getvalue()
-    
-    excel_data = to_excel(st.session_state['df_main'])
+    # El libro se genera solo al hacer clic y se reutiliza mientras no cambien los datos
+    excel_data = partial(excel_completo, st.session_state['df_main'], st.session_state['data_version'], st.session_state['observaciones'])
     st.download_button("📊 Descargar Excel", data=excel_data, file_name="Base_SST_Completa.xlsx")
 
     st.markdown("---")
     meta_ta = st.slider("Meta Tasa Acc. (%)", 0.0, 8.0, 3.0)
     meta_gestion = st.slider("Meta Gestión (%)", 50, 100, 90)
-    metas = {'meta_ta': meta_ta, 'meta_gestion': meta_gestion}
-
-# --- 4. MOTOR PDF EJECUTIVO ---
-class PDF_SST(FPDF):
-    def header(self):
-        self.set_fill_color(245, 245, 245)
-        self.rect(0, 0, 210, 40, 'F')
-        if os.path.exists(LOGO_FILE): self.image(LOGO_FILE, 10, 8, 35)
-        
-        self.set_xy(50, 10); self.set_font('Arial', 'B', 16); self.set_text_color(*COLOR_PRIMARY)
-        self.cell(0, 8, 'SOCIEDAD MADERERA GALVEZ Y DI GENOVA LTDA', 0, 1, 'L')
-        self.set_xy(50, 18); self.set_font('Arial', 'B', 11); self.set_text_color(*COLOR_SECONDARY)
-        self.cell(0, 6, 'INFORME EJECUTIVO DE GESTIÓN SST (DS 44)', 0, 1, 'L')
-        
-        self.set_draw_color(*COLOR_PRIMARY); self.set_line_width(1)
-        self.line(10, 38, 200, 38); self.ln(30)
-
-    def footer(self):
-        self.set_y(-15); self.set_font('Arial', 'I', 8); self.set_text_color(150)
-        self.cell(0, 10, f'Documento Oficial SGSST - Pagina {self.page_no()}', 0, 0, 'C')
-
-    def section_title(self, title):
-        self.set_font('Arial', 'B', 12); self.set_fill_color(*COLOR_SECONDARY); self.set_text_color(255, 255, 255)
-        self.cell(0, 8, f"  {title}", 0, 1, 'L', 1)
-        self.set_text_color(0, 0, 0); self.ln(4)
-
-    def draw_donut_chart_image(self, val_pct, color_hex, x, y, size=30):
-        try:
-            val_plot = min(val_pct, 100); val_plot = max(val_plot, 0)
-            fig, ax = plt.subplots(figsize=(2, 2))
-            ax.pie([val_plot, 100-val_plot], colors=[color_hex, '#eeeeee'], startangle=90, counterclock=False, 
-                   wedgeprops=dict(width=0.4, edgecolor='white'))
-            ax.text(0, 0, f"{val_pct:.0f}%", ha='center', va='center', fontsize=12, fontweight='bold', color='#333333')
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                plt.savefig(tmp.name, format='png', transparent=True, dpi=100, bbox_inches='tight')
-                tmp_name = tmp.name
-            plt.close(fig)
-            self.image(tmp_name, x=x, y=y, w=size, h=size)
-            os.unlink(tmp_name)
-        except: pass
-
-    def draw_kpi_circle_pair(self, title, val_m, val_a, max_scale, meta, unit, x, y):
-        try:
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(4, 2))
-            
-            color_m = '#4CAF50' if val_m <= meta else '#F44336' 
-            if "Gest" in title: color_m = '#4CAF50' if val_m >= meta else '#F44336'
-            val_m_plot = min(val_m, max_scale); rem_m = max_scale - val_m_plot
-            ax1.pie([val_m_plot, rem_m], colors=[color_m, '#EEEEEE'], startangle=90, counterclock=False, wedgeprops=dict(width=0.3, edgecolor='white'))
-            ax1.text(0, 0, f"{val_m:.1f}\n{unit}", ha='center', va='center', fontsize=10, fontweight='bold')
-            ax1.set_title("MENSUAL", fontsize=8, color='#555555')
-
-            color_a = '#4CAF50' if val_a <= meta else '#F44336'
-            if "Gest" in title: color_a = '#4CAF50' if val_a >= meta else '#F44336'
-            val_a_plot = min(val_a, max_scale); rem_a = max_scale - val_a_plot
-            ax2.pie([val_a_plot, rem_a], colors=[color_a, '#EEEEEE'], startangle=90, counterclock=False, wedgeprops=dict(width=0.3, edgecolor='white'))
-            ax2.text(0, 0, f"{val_a:.1f}\n{unit}", ha='center', va='center', fontsize=10, fontweight='bold')
-            ax2.set_title("ACUMULADO", fontsize=8, color='#555555')
-
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                plt.savefig(tmp.name, format='png', bbox_inches='tight', dpi=100)
-                tmp_name = tmp.name
-            plt.close(fig)
-            self.set_xy(x, y); self.set_font('Arial', 'B', 9)
-            self.cell(90, 8, title, 0, 1, 'C')
-            self.image(tmp_name, x=x+5, y=y+8, w=80, h=40)
-            os.unlink(tmp_name)
-        except: pass
-
-    def clean_text(self, text):
-        replacements = {'\u2013': '-', '\u2014': '-', '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"', '\u2022': '*', '€': 'EUR'}
-        for k, v in replacements.items(): text = text.replace(k, v)
-        return text.encode('latin-1', 'replace').decode('latin-1')
-
-    def footer_signatures(self):
-        y_pos = self.get_y() + 10
-        if y_pos > 250:
-            self.add_page(); y_pos = self.get_y() + 20
-        self.set_y(y_pos)
-        self.line(20, y_pos, 90, y_pos)
-        self.set_xy(20, y_pos + 2); self.set_font('Arial', 'B', 9); self.set_text_color(0,0,0)
-        self.cell(70, 5, "RODRIGO GALVEZ REBOLLEDO", 0, 1, 'C')
-        self.set_xy(20, y_pos + 7); self.set_font('Arial', '', 8)
-        self.cell(70, 5, "Gerente General / Rep. Legal", 0, 1, 'C')
-        self.line(120, y_pos, 190, y_pos)
-        self.set_xy(120, y_pos + 2); self.set_font('Arial', 'B', 9)
-        self.cell(70, 5, "ALAN GARCIA VIDAL", 0, 1, 'C')
-        self.set_xy(120, y_pos + 7); self.set_font('Arial', '', 8)
-        self.cell(70, 5, "Ingeniero en Prevención de Riesgos", 0, 1, 'C')
-        self.ln(15); self.set_font('Arial', 'I', 7); self.set_text_color(128)
-        self.multi_cell(0, 4, "Este documento es parte integrante del SGSST. Confidencial.", 0, 'C')
-
-    def draw_detailed_stats_table(self, data_list):
-        self.set_font('Arial', 'B', 9)
-        self.set_fill_color(230, 230, 230); self.set_text_color(0, 0, 0)
-        self.cell(100, 8, "INDICADOR (DS 67 / DS 40)", 1, 0, 'L', 1)
-        self.cell(45, 8, "MES ACTUAL", 1, 0, 'C', 1)
-        self.cell(45, 8, "ACUMULADO ANUAL", 1, 1, 'C', 1)
-        self.set_font('Arial', '', 9)
-        for label, val_m, val_a, is_bold in data_list:
-            if is_bold: self.set_font('Arial', 'B', 9)
-            else: self.set_font('Arial', '', 9)
-            self.ln()
-            self.cell(100, 7, f" {label}", 1, 0, 'L')
-            self.cell(45, 7, str(val_m), 1, 0, 'C')
-            self.cell(45, 7, str(val_a), 1, 1, 'C')
-
-# --- 5. DASHBOARD ---
+    metas = {**METAS_DEFECTO, 'meta_ta': meta_ta, 'meta_gestion': meta_gestion}
+
+    st.markdown("---")
+    st.markdown("### 🗂️ Informes en Lote")
+    lote_years = st.multiselect("Años del lote", sorted(years_present), default=sorted(years_present))
+    if st.button("Generar Lote PDF (ZIP)"):
+        barra = st.progress(0.0, text="Iniciando...")
+        def avance(hechos, total, year, month, error):
+            barra.progress(hechos / total, text=f"{hechos}/{total} · {month} {year}" + (" ⚠️" if error else ""))
+        # El ZIP se escribe a disco mientras terminan los informes; solo se lee al descargar.
+        # Un archivo por sesión: cada lote nuevo reemplaza al anterior (no se acumulan en /tmp)
+        destino = os.path.join(tempfile.gettempdir(), f"sst_lote_{st.session_state['sesion_id']}.zip")
+        with open(destino + ".tmp", "wb") as tmp:
+            ok, errores = generar_lote_zip(expandir(st.session_state['df_main'], st.session_state['observaciones']), tmp, trabajos_lote(st.session_state['df_main'], set(lote_years), sel_centro), metas,
+                                           progreso=avance, centro=sel_centro)
+        os.replace(destino + ".tmp", destino)
+        st.session_state['lote_zip'] = destino
+        if errores: st.warning(f"{len(errores)} informes con error (ver errores.txt en el ZIP).")
+    if os.path.exists(st.session_state.get('lote_zip', '')):
+        st.download_button("📥 Descargar Lote", data=partial(leer_archivo, st.session_state['lote_zip']), file_name="Reportes_SST.zip", mime="application/zip")
+
+# --- 4. DASHBOARD ---
 df = st.session_state['df_main']
-tab_dash, tab_editor = st.tabs(["📊 DASHBOARD EJECUTIVO", "📝 EDITOR DE DATOS"])
+tab_dash, tab_editor, tab_grilla, tab_eventos, tab_historial = st.tabs(["📊 DASHBOARD EJECUTIVO", "📝 EDITOR DE DATOS", "🧮 CARGA MASIVA", "🚑 EVENTOS", "🕓 HISTORIAL"])
 
 years = sorted(df['Año'].unique(), reverse=True)
 if not years: years = [2026]
 
-with tab_dash:
-    c1, c2 = st.columns([1, 4])
-    with c1:
-        if os.path.exists(LOGO_FILE): st.image(LOGO_FILE, width=160)
-    with c2:
-        st.title("SOCIEDAD MADERERA GALVEZ Y DI GENOVA LTDA")
-        st.markdown(f"### 🛡️ CONTROL DE MANDO EJECUTIVO (Base HHT: {factor_hht})")
-
+# Figuras cacheadas por sus entradas (compartidas entre sesiones): un cambio de mes solo
+# construye las que cambian de valor
+@st.cache_resource(max_entries=512, show_spinner=False)
+@medido('app.figura_gauge')
+def figura_gauge(value, title, max_val, threshold, inverse=False):
+    colors = {'good': '#2E7D32', 'bad': '#C62828'}
+    bar_color = colors['good'] if (value <= threshold if inverse else value >= threshold) else colors['bad']
+    fig = go.Figure(go.Indicator(mode = "gauge+number", value = value, title = {'text': title, 'font': {'size': 14}},
+        gauge = {'axis': {'range': [0, max_val]}, 'bar': {'color': bar_color}}))
+    fig.update_layout(height=200, margin=dict(t=30,b=10,l=20,r=20))
+    return fig
+
+@st.cache_resource(max_entries=512, show_spinner=False)
+@medido('app.figura_donut')
+def figura_donut(val, meta):
+    color = "#66BB6A" if val >= meta else "#EF5350"
+    fig = go.Figure(go.Pie(values=[val, 100-val], hole=0.7, marker_colors=[color, '#eee'], textinfo='none'))
+    fig.update_layout(height=140, margin=dict(t=0,b=0,l=0,r=0), annotations=[dict(text=f"{val:.0f}%", x=0.5, y=0.5, font_size=20, showarrow=False)])
+    return fig
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+@medido('app.figura_tendencia')
+def figura_tendencia(etiquetas, valores, completas, titulo, meta=None):
+    # Serie de ventanas móviles; las ventanas incompletas (inicio de la serie) en gris
+    fig = go.Figure(go.Scatter(x=list(etiquetas), y=list(valores), mode='lines+markers', name=titulo, line=dict(color='#1565C0'),
+                               marker=dict(color=['#1565C0' if c else '#BDBDBD' for c in completas], size=6)))
+    if meta is not None: fig.add_hline(y=meta, line_dash='dash', line_color='#C62828', annotation_text=f"Meta {meta}")
+    fig.update_layout(height=280, margin=dict(t=30,b=10,l=20,r=20), title=dict(text=titulo, font=dict(size=14)))
+    return fig
+
+@st.fragment
+def panel_periodo(years, factor_hht, sel_centro, sel_centro_txt, metas):
+    # Fragmento: cambiar año o mes vuelve a ejecutar solo este panel (indicadores, gráficos,
+    # tabla DS67 y PDF), no la barra lateral ni las demás pestañas. Ejecutado solo, es
+    # una ejecución propia para la medición
+    propia = not medicion.en_ejecucion()
+    if propia: medicion.iniciar_ejecucion('fragmento', st.session_state['sesion_id'])
+    t0 = time.perf_counter()
+    try:
+        with medicion.tramo('app.panel_periodo'): contenido_periodo(years, factor_hht, sel_centro, sel_centro_txt, metas)
+    finally:
+        if propia: medicion.terminar_ejecucion()
+    st.session_state['t_panel'] = (time.perf_counter() - t0) * 1000
+    st.caption(f"⏱ Panel: {st.session_state['t_panel']:.0f} ms")
+
+def estado_informe(sondeo=False, clave='informe'):
+    tid, nombre = st.session_state[clave]
+    e = cola_informes().estado(tid)
+    # Terminó mientras se sondeaba: un rerun deja de programar el sondeo
+    if sondeo and e['estado'] not in ('en cola', 'generando'): st.rerun()
+    if e['estado'] == 'listo':
+        st.download_button("📥 Descargar Reporte Ejecutivo", e['pdf'], nombre, "application/pdf", key=f"descargar_{clave}")
+        st.caption(f"Generado en {e['segundos']:.1f} s")
+    elif e['estado'] == 'error': st.error(f"Error PDF: {e['error']}")
+    elif e['estado'] == 'desconocido': del st.session_state[clave]
+    else: st.info(f"⏳ Informe {e['estado']}... ({e['segundos']:.0f} s, {cola_informes().pendientes()} en la cola)")
+
+def contenido_periodo(years, factor_hht, sel_centro, sel_centro_txt, metas):
+    df = st.session_state['df_main']
     col_y, col_m = st.columns(2)
     sel_year = col_y.selectbox("Año Fiscal", years)
     
-    df_year = df[df['Año'] == sel_year].copy()
-    df_year['Mes_Idx'] = df_year['Mes'].apply(lambda x: MESES_ORDEN.index(x) if x in MESES_ORDEN else 99)
-    df_year = df_year.sort_values('Mes_Idx')
+    df_year = preparar_anio(df, sel_year, sel_centro)
     months_avail = df_year['Mes'].tolist()
     
-    if not months_avail: st.warning("Sin datos."); st.stop()
+    if not months_avail: st.warning("Sin datos."); return
     sel_month = col_m.selectbox("Mes de Corte", months_avail, index=len(months_avail)-1 if months_avail else 0)
     
-    # CÁLCULOS
-    row_mes = df_year[df_year['Mes'] == sel_month].iloc[0]
-    idx_corte = MESES_ORDEN.index(sel_month)
-    df_acum = df_year[df_year['Mes_Idx'] <= idx_corte]
-    
-    sum_acc = df_acum['Accidentes CTP'].sum()
-    sum_fatales = df_acum['Accidentes Fatales'].sum()
-    sum_ep = df_acum['Enf. Profesionales'].sum()
-    sum_dias_acc = df_acum['Días Perdidos'].sum()
-    sum_dias_ep = df_acum['Días Perdidos EP'].sum()
-    sum_pensionados = df_acum['Pensionados'].sum()
-    sum_indemnizados = df_acum['Indemnizados'].sum()
-    sum_hht = df_acum['HHT'].sum()
-    
-    df_masa_ok = df_acum[df_acum['Masa Laboral'] > 0]
-    avg_masa = df_masa_ok['Masa Laboral'].mean() if not df_masa_ok.empty else 0
-
-    ta_acum = (sum_acc / avg_masa * 100) if avg_masa > 0 else 0
-    ts_acum = (sum_dias_acc / avg_masa * 100) if avg_masa > 0 else 0 
-    if_acum = (sum_acc * 1000000 / sum_hht) if sum_hht > 0 else 0
-    sum_dias_cargo = df_acum['Días Cargo'].sum()
-    ig_acum = ((sum_dias_acc + sum_dias_cargo) * 1000000 / sum_hht) if sum_hht > 0 else 0
-    
-    def safe_div(a, b): return (a/b*100) if b > 0 else 0
-    p_insp = safe_div(row_mes['Insp. Ejecutadas'], row_mes['Insp. Programadas'])
-    p_cap = safe_div(row_mes['Cap. Ejecutadas'], row_mes['Cap. Programadas'])
-    p_medidas = safe_div(row_mes['Medidas Cerradas'], row_mes['Medidas Abiertas']) if row_mes['Medidas Abiertas']>0 else 100
-    p_salud = safe_div(row_mes['Vig. Salud Vigente'], row_mes['Expuestos Silice/Ruido']) if row_mes['Expuestos Silice/Ruido']>0 else 100
+    # CÁLCULOS (núcleo sst: los mismos que usa el PDF)
+    row_mes, acum, gestion = resumen_periodo(df, sel_year, sel_month, df_year, st.session_state['indice_acum'], sel_centro)
+    ta_acum, ts_acum, if_acum, ig_acum = acum['ta_acum'], acum['ts_acum'], acum['if_acum'], acum['ig_acum']
+    p_insp, p_cap, p_medidas, p_salud = gestion['p_insp'], gestion['p_cap'], gestion['p_medidas'], gestion['p_salud']
 
-    insight_text = generar_insight_automatico(row_mes, ta_acum, metas)
+    insight_text = generar_insight_automatico(row_mes, ta_acum, metas, acum, gestion)
     st.info("💡 **ANÁLISIS INTELIGENTE DEL SISTEMA:**")
     st.markdown(f"<div style='background-color:#e3f2fd; padding:10px; border-radius:5px;'>{insight_text}</div>", unsafe_allow_html=True)
     
-    col_g1, col_g2, col_g3, col_g4 = st.columns(4)
-    def plot_gauge(value, title, max_val, threshold, inverse=False):
-        colors = {'good': '#2E7D32', 'bad': '#C62828'}
-        bar_color = colors['good'] if (value <= threshold if inverse else value >= threshold) else colors['bad']
-        fig = go.Figure(go.Indicator(mode = "gauge+number", value = value, title = {'text': title, 'font': {'size': 14}},
-            gauge = {'axis': {'range': [0, max_val]}, 'bar': {'color': bar_color}}))
-        fig.update_layout(height=200, margin=dict(t=30,b=10,l=20,r=20))
-        return fig
-
-    with col_g1: st.plotly_chart(plot_gauge(ta_acum, "Tasa Acc. Acum", 8, metas['meta_ta'], True), use_container_width=True)
-    with col_g2: st.plotly_chart(plot_gauge(ts_acum, "Tasa Sin. Acum", 50, 10, True), use_container_width=True)
-    with col_g3: st.plotly_chart(plot_gauge(if_acum, "Ind. Frec. Acum", 50, 10, True), use_container_width=True)
-    
-    with col_g4:
-        st.markdown("<br>", unsafe_allow_html=True)
-        st.metric("Total HHT (Año)", f"{int(sum_hht):,}".replace(",", "."))
-        st.caption(f"Calculado con Factor {factor_hht}")
+    with medicion.tramo('app.gauges'):
+        col_g1, col_g2, col_g3, col_g4 = st.columns(4)
+        with col_g1: st.plotly_chart(figura_gauge(round(ta_acum, 2), "Tasa Acc. Acum", 8, metas['meta_ta'], True), use_container_width=True)
+        with col_g2: st.plotly_chart(figura_gauge(round(ts_acum, 2), "Tasa Sin. Acum", 50, metas['meta_ts'], True), use_container_width=True)
+        with col_g3: st.plotly_chart(figura_gauge(round(if_acum, 2), "Ind. Frec. Acum", 50, metas['meta_if'], True), use_container_width=True)
+
+        with col_g4:
+            st.markdown("<br>", unsafe_allow_html=True)
+            st.metric("Total HHT (Año)", f"{int(acum['sum_hht']):,}".replace(",", "."))
+            st.caption(f"Calculado con Factor {factor_hht}")
 
     st.markdown("---")
     st.markdown("#### 📋 LISTADO MAESTRO DE INDICADORES (DS67)")
     
-    stats_data = {
-        'Indicador': [
-            'Nº de Accidentes CTP', 'Nº de Enfermedades Profesionales', 
-            'Días Perdidos (Acc. Trabajo)', 'Días Perdidos (Enf. Prof.)', 
-            'Promedio de Trabajadores', 'Nº de Accidentes Fatales', 
-            'Nº de Pensionados', 'Nº de Indemnizados', 
-            'Tasa Siniestralidad (Inc. Temporal)', 'Dias Cargo (Factor Inv/Muerte)',
-            'Tasa de Accidentabilidad', 'Tasa de Frecuencia', 
-            'Tasa de Gravedad', 'Horas Hombre (HHT)'
-        ],
-        'Mes Actual': [
-            int(row_mes['Accidentes CTP']), int(row_mes['Enf. Profesionales']),
-            int(row_mes['Días Perdidos']), int(row_mes['Días Perdidos EP']),
-            f"{row_mes['Masa Laboral']:.1f}", int(row_mes['Accidentes Fatales']),
-            int(row_mes['Pensionados']), int(row_mes['Indemnizados']),
-            f"{row_mes['Tasa Sin.']:.2f}", int(row_mes['Días Cargo']),
-            f"{row_mes['Tasa Acc.']:.2f}%", f"{row_mes['Indice Frec.']:.2f}",
-            f"{row_mes['Indice Grav.']:.0f}", int(row_mes['HHT'])
-        ],
-        'Acumulado Anual': [
-            int(sum_acc), int(sum_ep),
-            int(sum_dias_acc), int(sum_dias_ep),
-            f"{avg_masa:.1f}", int(sum_fatales),
-            int(sum_pensionados), int(sum_indemnizados),
-            f"{ts_acum:.2f}", int(sum_dias_cargo),
-            f"{ta_acum:.2f}%", f"{if_acum:.2f}",
-            f"{ig_acum:.0f}", int(sum_hht)
-        ]
-    }
-    st.table(pd.DataFrame(stats_data))
+    with medicion.tramo('app.tabla_ds67'):
+        stats_data = {
+            'Indicador': [
+                'Nº de Accidentes CTP', 'Nº de Enfermedades Profesionales', 
+                'Días Perdidos (Acc. Trabajo)', 'Días Perdidos (Enf. Prof.)', 
+                'Promedio de Trabajadores', 'Nº de Accidentes Fatales', 
+                'Nº de Pensionados', 'Nº de Indemnizados', 
+                'Tasa Siniestralidad (Inc. Temporal)', 'Dias Cargo (Factor Inv/Muerte)',
+                'Tasa de Accidentabilidad', 'Tasa de Frecuencia', 
+                'Tasa de Gravedad', 'Horas Hombre (HHT)'
+            ],
+            'Mes Actual': [
+                int(row_mes['Accidentes CTP']), int(row_mes['Enf. Profesionales']),
+                int(row_mes['Días Perdidos']), int(row_mes['Días Perdidos EP']),
+                f"{row_mes['Masa Laboral']:.1f}", int(row_mes['Accidentes Fatales']),
+                int(row_mes['Pensionados']), int(row_mes['Indemnizados']),
+                f"{row_mes['Tasa Sin.']:.2f}", int(row_mes['Días Cargo']),
+                f"{row_mes['Tasa Acc.']:.2f}%", f"{row_mes['Indice Frec.']:.2f}",
+                f"{row_mes['Indice Grav.']:.0f}", int(row_mes['HHT'])
+            ],
+            'Acumulado Anual': [
+                int(acum['sum_acc']), int(acum['sum_ep']),
+                int(acum['sum_dias_acc']), int(acum['sum_dias_ep']),
+                f"{acum['avg_masa']:.1f}", int(acum['sum_fatales']),
+                int(acum['sum_pensionados']), int(acum['sum_indemnizados']),
+                f"{ts_acum:.2f}", int(acum['sum_dias_cargo']),
+                f"{ta_acum:.2f}%", f"{if_acum:.2f}",
+                f"{ig_acum:.0f}", int(acum['sum_hht'])
+            ]
+        }
+        st.table(pd.DataFrame(stats_data))
+
+    st.markdown("---")
+    with medicion.tramo('app.donas'):
+        g1, g2, g3, g4 = st.columns(4)
+        def donut(val, title, col_obj):
+            col_obj.markdown(f"<div style='text-align:center; font-size:13px;'>{title}</div>", unsafe_allow_html=True)
+            col_obj.plotly_chart(figura_donut(round(val, 1), metas['meta_gestion']), use_container_width=True, key=title)
+
+        donut(p_insp, "Inspecciones", g1)
+        donut(p_cap, "Capacitaciones", g2)
+        donut(p_medidas, "Cierre Hallazgos", g3)
+        donut(p_salud, "Salud Ocupacional", g4)
+
+    st.markdown("---")
+    st.markdown("#### 📈 TENDENCIA MÓVIL (DS67)")
+    with medicion.tramo('app.tendencia'):
+        c_v, c_i = st.columns(2)
+        meses_v = c_v.radio("Ventana", [12, 24, 36], horizontal=True, format_func=lambda m: f"{m} meses", key='ventana_meses')
+        indicadores = {'Tasa de Accidentabilidad': 'ta_acum', 'Tasa de Siniestralidad': 'ts_acum',
+                       'Índice de Frecuencia': 'if_acum', 'Índice de Gravedad': 'ig_acum'}
+        sel_ind = c_i.selectbox("Indicador", list(indicadores), key='ventana_indicador')
+        # Todas las ventanas salen del índice acumulado (cacheado por versión de datos); se
+        # muestran los últimos 5 años que terminan en el mes de corte
+        v = st.session_state['indice_acum'].ventanas(meses_v, sel_centro)
+        corte = np.flatnonzero((v['Año'] == sel_year) & (v['Mes'] == sel_month))
+        fin = int(corte[0]) + 1 if len(corte) else 0
+        v = v.iloc[max(0, fin - 60):fin]
+        if v.empty: st.caption("Sin datos para la serie móvil.")
+        else:
+            col = indicadores[sel_ind]
+            etiquetas = tuple(f"{m[:3]} {a}" for a, m in zip(v['Año'], v['Mes']))
+            st.plotly_chart(figura_tendencia(etiquetas, tuple(v[col].round(3)), tuple(v['Completa']), f"{sel_ind} móvil {meses_v} meses",
+                                             metas['meta_ta'] if col == 'ta_acum' else None), use_container_width=True)
+            ult = v.iloc[-1]
+            k1, k2, k3, k4 = st.columns(4)
+            k1.metric(f"TA {meses_v}m", f"{ult['ta_acum']:.2f}%"); k2.metric(f"TS {meses_v}m", f"{ult['ts_acum']:.2f}")
+            k3.metric(f"IF {meses_v}m", f"{ult['if_acum']:.2f}"); k4.metric(f"IG {meses_v}m", f"{ult['ig_acum']:.0f}")
+            if not ult['Completa']: st.caption(f"⚠️ La serie tiene solo {int(ult['Meses'])} meses hasta el corte.")
 
     st.markdown("---")
-    g1, g2, g3, g4 = st.columns(4)
-    def donut(val, title, col_obj):
-        color = "#66BB6A" if val >= metas['meta_gestion'] else "#EF5350"
-        fig = go.Figure(go.Pie(values=[val, 100-val], hole=0.7, marker_colors=[color, '#eee'], textinfo='none'))
-        fig.update_layout(height=140, margin=dict(t=0,b=0,l=0,r=0), annotations=[dict(text=f"{val:.0f}%", x=0.5, y=0.5, font_size=20, showarrow=False)])
-        col_obj.markdown(f"<div style='text-align:center; font-size:13px;'>{title}</div>", unsafe_allow_html=True)
-        col_obj.plotly_chart(fig, use_container_width=True, key=title)
-
-    donut(p_insp, "Inspecciones", g1)
-    donut(p_cap, "Capacitaciones", g2)
-    donut(p_medidas, "Cierre Hallazgos", g3)
-    donut(p_salud, "Salud Ocupacional", g4)
+    st.markdown("#### 🚨 ALERTAS DE LA CARTERA")
+    with medicion.tramo('app.alertas'):
+        # Todas las reglas sobre todos los centros y meses en una pasada, cacheada por versión de datos y metas
+        tabla_al = alertas(df, st.session_state['indice_acum'], metas, st.session_state['data_version'])
+        if sel_centro is not None: tabla_al = tabla_al[tabla_al['Centro'] == str(sel_centro)]
+        del_mes = tabla_al[(tabla_al['Año'] == sel_year) & (tabla_al['Mes'] == sel_month)]
+        cols_n = st.columns(len(NIVELES) - 1)
+        for col_n, (nivel, (icono, rotulo)) in zip(cols_n, list(NIVELES.items())[:-1]):
+            col_n.metric(f"{icono} {rotulo.capitalize()}", int((del_mes['Nivel'] == nivel).sum()))
+        if del_mes.empty: st.caption(f"Sin alertas en {sel_month} {sel_year}.")
+        else: st.dataframe(del_mes[['Centro', 'Nivel', 'Mensaje']], hide_index=True, use_container_width=True)
+        with st.expander(f"Todas las alertas ({len(tabla_al)})"):
+            niveles_sel = st.multiselect("Niveles", list(NIVELES)[:-1], default=['critica', 'alta', 'datos'], key='alertas_niveles')
+            st.dataframe(tabla_al[tabla_al['Nivel'].isin(niveles_sel)], hide_index=True, use_container_width=True)
 
     st.markdown("---")
+    # El PDF se genera en la cola de informes (pool de procesos del servidor): la sesión sigue
+    # respondiendo y pedidos idénticos de otras sesiones reutilizan el mismo trabajo
     if st.button("📄 Generar Reporte Ejecutivo PDF"):
-        try:
-            pdf = PDF_SST(orientation='P', format='A4')
-            pdf.add_page(); pdf.set_font('Arial', 'B', 12)
-            pdf.cell(0, 10, f"PERIODO: {sel_month.upper()} {sel_year}", 0, 1, 'R')
-            
-            pdf.section_title("1. INDICADORES VISUALES (MES vs ACUMULADO)")
-            y_start = pdf.get_y()
-            pdf.draw_kpi_circle_pair("TASA ACCIDENTABILIDAD", row_mes['Tasa Acc.'], ta_acum, 8, metas['meta_ta'], "%", 10, y_start)
-            pdf.draw_kpi_circle_pair("TASA SINIESTRALIDAD", row_mes['Tasa Sin.'], ts_acum, 50, 10, "Dias", 110, y_start)
-            y_start += 55
-            pdf.draw_kpi_circle_pair("TASA FRECUENCIA", row_mes['Indice Frec.'], if_acum, 50, 10, "IF", 10, y_start)
-            pdf.draw_kpi_circle_pair("TASA GRAVEDAD", row_mes['Indice Grav.'], ig_acum, 200, 50, "IG", 110, y_start)
-            pdf.set_y(y_start + 60)
-            
-            pdf.section_title("2. ESTADÍSTICA DE SINIESTRALIDAD (DS 67)")
-            pdf.ln(2)
-            table_rows = [
-                ("Nro de Accidentes CTP", int(row_mes['Accidentes CTP']), int(sum_acc), False),
-                ("Nro de Enfermedades Profesionales", int(row_mes['Enf. Profesionales']), int(sum_ep), False),
-                ("Dias Perdidos (Acc. Trabajo)", int(row_mes['Días Perdidos']), int(sum_dias_acc), False),
-                ("Dias Perdidos (Enf. Profesional)", int(row_mes['Días Perdidos EP']), int(sum_dias_ep), False),
-                ("Promedio de Trabajadores", f"{row_mes['Masa Laboral']:.1f}", f"{avg_masa:.1f}", False),
-                ("Nro Accidentes Fatales", int(row_mes['Accidentes Fatales']), int(sum_fatales), False),
-                ("Nro Pensionados (Invalidez)", int(row_mes['Pensionados']), int(sum_pensionados), False),
-                ("Nro Indemnizados", int(row_mes['Indemnizados']), int(sum_indemnizados), False),
-                ("Tasa Siniestralidad (Inc. Temporal)", f"{row_mes['Tasa Sin.']:.2f}", f"{ts_acum:.2f}", False),
-                ("Dias Cargo (Inv. y Muerte)", int(row_mes['Días Cargo']), int(sum_dias_cargo), False), 
-                ("Tasa de Accidentabilidad (%)", f"{row_mes['Tasa Acc.']:.2f}", f"{ta_acum:.2f}", True),
-                ("Tasa de Frecuencia", f"{row_mes['Indice Frec.']:.2f}", f"{if_acum:.2f}", True),
-                ("Tasa de Gravedad", f"{row_mes['Indice Grav.']:.0f}", f"{ig_acum:.0f}", True),
-                ("Horas Hombre (HHT)", int(row_mes['HHT']), int(sum_hht), False)
-            ]
-            pdf.draw_detailed_stats_table(table_rows)
-            
-            pdf.add_page()
-            pdf.section_title("3. CUMPLIMIENTO PROGRAMA GESTIÓN")
-            insp_txt = f"{int(row_mes['Insp. Ejecutadas'])} de {int(row_mes['Insp. Programadas'])}"
-            cap_txt = f"{int(row_mes['Cap. Ejecutadas'])} de {int(row_mes['Cap. Programadas'])}"
-            med_txt = f"{int(row_mes['Medidas Cerradas'])} de {int(row_mes['Medidas Abiertas'])}"
-            salud_txt = f"{int(row_mes['Vig. Salud Vigente'])} de {int(row_mes['Expuestos Silice/Ruido'])}"
-            
-            data_gest = [("Inspecciones", p_insp, insp_txt), ("Capacitaciones", p_cap, cap_txt),
-                         ("Hallazgos", p_medidas, med_txt), ("Salud Ocup.", p_salud, salud_txt)]
-            
-            y_circles = pdf.get_y()
-            for i, (label, val, txt) in enumerate(data_gest):
-                x_pos = 15 + (i * 48)
-                color_hex = '#4CAF50' if val >= metas['meta_gestion'] else '#F44336'
-                pdf.draw_donut_chart_image(val, color_hex, x_pos, y_circles, size=30)
-                pdf.set_text_color(0,0,0)
-                pdf.set_xy(x_pos - 5, y_circles + 32); pdf.set_font('Arial', 'B', 8); pdf.cell(40, 4, label, 0, 1, 'C')
-                pdf.set_xy(x_pos - 5, y_circles + 36); pdf.set_font('Arial', '', 7); pdf.set_text_color(100); pdf.cell(40, 4, txt, 0, 1, 'C'); pdf.set_text_color(0)
-
-            pdf.set_y(y_circles + 45)
-            pdf.section_title("4. OBSERVACIONES DEL EXPERTO")
-            pdf.set_font('Arial', '', 10); pdf.set_text_color(0,0,0)
-            clean_insight = pdf.clean_text(insight_text.replace("<b>","").replace("</b>","").replace("<br>","\n").replace("⚠️","").replace("✅","").replace("🚑",""))
-            obs_raw = str(row_mes['Observaciones'])
-            if obs_raw.lower() in ["nan", "none", "0", "0.0", ""]: obs_raw = "Sin observaciones registradas."
-            clean_obs = pdf.clean_text(obs_raw)
-            pdf.multi_cell(0, 6, f"ANALISIS SISTEMA:\n{clean_insight}\n\nCOMENTARIOS EXPERTO:\n{clean_obs}", 1, 'L')
-            
-            pdf.ln(20); pdf.footer_signatures()
-            
-            out = pdf.output(dest='S').encode('latin-1')
-            st.download_button("📥 Descargar Reporte Ejecutivo", out, f"Reporte_SST_{sel_month}.pdf", "application/pdf")
-        except Exception as e: st.error(f"Error PDF: {e}")
+        row_mes = row_mes.copy(); row_mes['Observaciones'] = texto_observaciones(sel_centro, sel_year, sel_month)
+        # Período, metas y factor quedan en el historial para regenerar el informe tal como se emitió.
+        # Antes de encolarlo se verifica que las filas impresas sean las de la última instantánea
+        # (el fragmento no recarga: otra sesión pudo guardar entre medio)
+        impresas = df[(df['Año'] == sel_year) & ((df['Centro'] == sel_centro) if sel_centro is not None else True)]
+        try: registrar_informe(sel_centro, sel_year, sel_month, metas, factor_hht,
+                               datos=impresas.assign(Observaciones=st.session_state['observaciones'].columna(impresas)))
+        except ConflictoVersion as e:
+            st.session_state['conflicto'] = f"No se generó el informe: {e}. Se cargaron los datos vigentes; vuelva a generarlo."
+            recargar(); st.rerun()
+        st.session_state['informe'] = (cola_informes().enviar(row_mes, acum, gestion, metas, sel_month, sel_year, insight_text,
+                                                              centro=sel_centro_txt, version=st.session_state['data_version']),
+                                       f"Reporte_SST_{sel_month}.pdf")
+    if 'informe' in st.session_state:
+        pendiente = cola_informes().estado(st.session_state['informe'][0])['estado'] in ('en cola', 'generando')
+        # Mientras el informe no esté listo solo este fragmento se vuelve a ejecutar (cada segundo)
+        st.fragment(estado_informe, run_every=1.0 if pendiente else None)(pendiente)
+
+with tab_dash, medicion.tramo('app.tablero'):
+    c1, c2 = st.columns([1, 4])
+    with c1:
+        if os.path.exists(LOGO_FILE): st.image(LOGO_FILE, width=160)
+    with c2:
+        st.title("SOCIEDAD MADERERA GALVEZ Y DI GENOVA LTDA")
+        st.markdown(f"### 🛡️ CONTROL DE MANDO EJECUTIVO (Base HHT: {factor_hht})")
+        st.caption(f"🏭 {sel_centro_txt}")
+    panel_periodo(years, factor_hht, sel_centro, sel_centro_txt, metas)
 
-with tab_editor:
+with tab_editor, medicion.tramo('app.editor'):
     st.subheader("📝 Carga de Datos")
-    c_y, c_m = st.columns(2)
+    c_c, c_y, c_m = st.columns(3)
+    # Los datos se cargan por centro (el consolidado es solo lectura)
+    edit_centro = c_c.selectbox("Centro:", centros_present, index=centros_present.index(sel_centro) if sel_centro in centros_present else 0, key="ed_c")
     edit_year = c_y.selectbox("Año:", years, key="ed_y")
-    m_list = df[df['Año'] == edit_year]['Mes'].tolist()
-    m_list.sort(key=lambda x: MESES_ORDEN.index(x) if x in MESES_ORDEN else 99)
+    m_list = df[(df['Centro'] == edit_centro) & (df['Año'] == edit_year)]['Mes'].tolist()
+    m_list.sort(key=mes_idx)
     edit_month = c_m.selectbox("Mes:", m_list, key="ed_m")
     
     try:
-        row_idx = df.index[(df['Año'] == edit_year) & (df['Mes'] == edit_month)].tolist()[0]
+        row_idx = df.index[(df['Centro'] == edit_centro) & (df['Año'] == edit_year) & (df['Mes'] == edit_month)].tolist()[0]
+        version_form, version_actual = versiones_previas('ed_version', df, [row_idx])[row_idx]
+        # Con eventos registrados, accidentes/EP del mes se derivan del registro (solo lectura aquí)
+        con_eventos = not abrir_registro().cargar(edit_year, edit_month, edit_centro).empty
         with st.form("edit_form"):
-            st.info(f"Editando: **{edit_month} {edit_year}**")
+            st.info(f"Editando: **{edit_centro} · {edit_month} {edit_year}**")
             
             st.markdown("##### 🏭 Datos Base")
             c1, c2, c3 = st.columns(3)
@@ -505,15 +431,16 @@ with tab_editor:
             st.caption(f"HHT Estimadas (Factor {factor_hht}): {hht_prev:,.0f}")
 
             st.markdown("##### 🚑 Siniestralidad")
+            if con_eventos: st.caption("Accidentes, EP y días de este mes se calculan desde la pestaña 🚑 EVENTOS.")
             c6, c7, c8 = st.columns(3)
-            val_acc = c6.number_input("Nº Accidentes CTP", value=float(df.at[row_idx, 'Accidentes CTP']))
-            val_dias = c7.number_input("Días Perdidos (Acc)", value=float(df.at[row_idx, 'Días Perdidos']))
-            val_fatales = c8.number_input("Nº Accidentes Fatales", value=float(df.at[row_idx, 'Accidentes Fatales']))
+            val_acc = c6.number_input("Nº Accidentes CTP", value=float(df.at[row_idx, 'Accidentes CTP']), disabled=con_eventos)
+            val_dias = c7.number_input("Días Perdidos (Acc)", value=float(df.at[row_idx, 'Días Perdidos']), disabled=con_eventos)
+            val_fatales = c8.number_input("Nº Accidentes Fatales", value=float(df.at[row_idx, 'Accidentes Fatales']), disabled=con_eventos)
             
             c9, c10, c11 = st.columns(3)
-            val_ep = c9.number_input("Nº Enf. Profesionales", value=float(df.at[row_idx, 'Enf. Profesionales']))
-            val_dias_ep = c10.number_input("Días Perdidos (EP)", value=float(df.at[row_idx, 'Días Perdidos EP']))
-            val_cargo = c11.number_input("Días Cargo (Inv/Muerte)", value=float(df.at[row_idx, 'Días Cargo']))
+            val_ep = c9.number_input("Nº Enf. Profesionales", value=float(df.at[row_idx, 'Enf. Profesionales']), disabled=con_eventos)
+            val_dias_ep = c10.number_input("Días Perdidos (EP)", value=float(df.at[row_idx, 'Días Perdidos EP']), disabled=con_eventos)
+            val_cargo = c11.number_input("Días Cargo (Inv/Muerte)", value=float(df.at[row_idx, 'Días Cargo']), disabled=con_eventos)
             
             c12, c13 = st.columns(2)
             val_pen = c12.number_input("Nº Pensionados", value=float(df.at[row_idx, 'Pensionados']))
@@ -537,39 +464,212 @@ with tab_editor:
             val_vig = c21.number_input("Vigilancia Salud Vigente", value=float(df.at[row_idx, 'Vig. Salud Vigente']))
 
             st.markdown("##### 📝 Observaciones")
-            c_obs = str(df.at[row_idx, 'Observaciones'])
+            c_obs = st.session_state['observaciones'].texto(edit_centro, edit_year, edit_month)
             if c_obs.lower() in ["nan", "none", "0", ""]: c_obs = ""
             val_obs = st.text_area("Texto del Reporte:", value=c_obs, height=100)
 
             if st.form_submit_button("💾 GUARDAR DATOS"):
-                # Guardar Base
-                df.at[row_idx, 'Masa Laboral'] = val_masa
-                df.at[row_idx, 'Horas Extras'] = val_extras
-                df.at[row_idx, 'Horas Ausentismo'] = val_aus
-                # Acc
-                df.at[row_idx, 'Accidentes CTP'] = val_acc
-                df.at[row_idx, 'Días Perdidos'] = val_dias
-                df.at[row_idx, 'Accidentes Fatales'] = val_fatales
-                df.at[row_idx, 'Días Cargo'] = val_cargo
-                # EP
-                df.at[row_idx, 'Enf. Profesionales'] = val_ep
-                df.at[row_idx, 'Días Perdidos EP'] = val_dias_ep
-                # DS67
-                df.at[row_idx, 'Pensionados'] = val_pen
-                df.at[row_idx, 'Indemnizados'] = val_ind
-                # Gestion
-                df.at[row_idx, 'Insp. Programadas'] = val_insp_p
-                df.at[row_idx, 'Insp. Ejecutadas'] = val_insp_e
-                df.at[row_idx, 'Cap. Programadas'] = val_cap_p
-                df.at[row_idx, 'Cap. Ejecutadas'] = val_cap_e
-                df.at[row_idx, 'Medidas Abiertas'] = val_med_ab
-                df.at[row_idx, 'Medidas Cerradas'] = val_med_ce
-                df.at[row_idx, 'Expuestos Silice/Ruido'] = val_exp
-                df.at[row_idx, 'Vig. Salud Vigente'] = val_vig
-                df.at[row_idx, 'Observaciones'] = val_obs
-                
-                st.session_state['df_main'] = save_data(df, factor_hht)
-                st.success("Guardado.")
+                if version_form != version_actual:
+                    st.session_state['conflicto'] = (f"No se guardó: otro usuario modificó {edit_month} {edit_year} ({edit_centro}) "
+                                                     "mientras se editaba. Se muestran los datos vigentes; revise y vuelva a guardar.")
+                    st.rerun()
+                valores = {
+                    # Base
+                    'Masa Laboral': val_masa, 'Horas Extras': val_extras, 'Horas Ausentismo': val_aus,
+                    # Acc
+                    'Accidentes CTP': val_acc, 'Días Perdidos': val_dias, 'Accidentes Fatales': val_fatales, 'Días Cargo': val_cargo,
+                    # EP
+                    'Enf. Profesionales': val_ep, 'Días Perdidos EP': val_dias_ep,
+                    # DS67
+                    'Pensionados': val_pen, 'Indemnizados': val_ind,
+                    # Gestion
+                    'Insp. Programadas': val_insp_p, 'Insp. Ejecutadas': val_insp_e,
+                    'Cap. Programadas': val_cap_p, 'Cap. Ejecutadas': val_cap_e,
+                    'Medidas Abiertas': val_med_ab, 'Medidas Cerradas': val_med_ce,
+                    'Expuestos Silice/Ruido': val_exp, 'Vig. Salud Vigente': val_vig,
+                }
+                # Observaciones no está en df_main: solo se envía si cambió
+                if val_obs != c_obs: valores['Observaciones'] = val_obs
+                cambios = RegistroCambios()
+                cambios.editar(df, row_idx, valores)
+                if not cambios or guardar(df, factor_hht, cambios, motivo="editor"): st.success("Guardado.")
                 st.rerun()
+        if HISTORIAL_ACTIVO:
+            with st.expander("🕓 Historial de cambios del mes"):
+                hist_mes = abrir_historial().cambios(edit_centro, edit_year, edit_month)
+                if hist_mes.empty: st.caption("Sin cambios registrados para este mes.")
+                else: st.dataframe(hist_mes.drop(columns=['Centro', 'Año', 'Mes']).astype({'Anterior': str, 'Valor': str}), hide_index=True, use_container_width=True)
     except Exception as e:
         st.error(f"Error al cargar registro: {e}")
+
+with tab_grilla, medicion.tramo('app.grilla'):
+    # Un año completo (uno o varios centros) en una grilla. Al guardar se comparan las celdas
+    # con la base y solo las filas con cambios se recalculan y escriben, en una transacción
+    st.subheader("🧮 Carga Masiva Anual")
+    c_gc, c_gy = st.columns([3, 1])
+    grid_centros = c_gc.multiselect("Centros:", centros_present, default=[sel_centro] if sel_centro else centros_present[:1], key="gr_c")
+    grid_year = c_gy.selectbox("Año:", years, key="gr_y")
+    vista = df[(df['Año'] == grid_year) & df['Centro'].isin(grid_centros)]
+    vista = vista.iloc[np.lexsort((vista['Mes'].map(mes_idx).to_numpy(), vista['Centro'].astype(str).to_numpy()))]
+    vista = vista.assign(Observaciones=st.session_state['observaciones'].columna(vista))
+    cols_entrada = columnas_entrada(df)
+
+    if vista.empty: st.info("Seleccione al menos un centro.")
+    else:
+        with st.form("grid_form"):
+            editado = st.data_editor(
+                vista[['Centro', 'Mes'] + cols_entrada + COLS_DERIVADAS], key="grilla",
+                hide_index=True, num_rows="fixed", disabled=['Centro', 'Mes'] + COLS_DERIVADAS,
+                column_config={c: st.column_config.NumberColumn(c, min_value=0.0) for c in cols_entrada if c != 'Observaciones'})
+            st.caption("HHT e índices se recalculan al guardar.")
+            enviado = st.form_submit_button("💾 GUARDAR CAMBIOS")
+        previas = versiones_previas('gr_version', df, list(vista.index))
+        if enviado:
+            cambios = RegistroCambios()
+            n_celdas = cambios.editar_tabla(df, editado, cols_entrada, referencia=vista); n_meses = len(cambios.filas)
+            vencidas = [idx for idx in cambios.filas if previas[idx][0] != previas[idx][1]]
+            if vencidas:
+                st.session_state['conflicto'] = (f"No se guardó: otro usuario modificó {len(vencidas)} de los meses editados mientras "
+                                                 "se editaba. Se muestran los datos vigentes; revise y vuelva a guardar.")
+                recargar()
+            elif cambios and guardar(df, factor_hht, cambios, motivo="carga masiva"):
+                st.session_state['aviso'] = f"Guardado: {n_celdas} celdas en {n_meses} meses."
+            st.rerun()
+
+    # Importación de exportaciones de la mutual o RR.HH.: se lee por bloques, se valida y
+    # se agrega por mes; las filas con error se informan y el resto se importa
+    st.divider()
+    st.subheader("📥 Importar Excel / CSV")
+    c_if, c_ic = st.columns([3, 1])
+    archivo = c_if.file_uploader("Exportación de la mutual o RR.HH. (una fila por mes o por trabajador):", type=['xlsx', 'csv'], key="imp_archivo")
+    imp_centro = c_ic.text_input("Centro (filas sin centro):", value=sel_centro or "", key="imp_centro").strip() or None
+    if archivo is not None and st.button("📥 IMPORTAR", key="imp_btn"):
+        try:
+            with st.spinner("Leyendo y validando..."):
+                agregado, resumen = preparar_importacion(archivo, archivo.name, imp_centro, factor_base=factor_hht)
+            aplicar_importacion(agregado, abrir_almacen(), factor_hht)
+            st.session_state['importacion'] = resumen
+            recargar(); st.rerun()
+        except ConflictoVersion as e: st.error(f"No se importó: {e}. Vuelva a intentarlo.")
+        except ValueError as e: st.error(f"No se importó: {e}.")
+    if 'importacion' in st.session_state:
+        r = st.session_state['importacion']
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Filas leídas", f"{r['filas_leidas']:,}".replace(",", ".")); c2.metric("Válidas", f"{r['filas_validas']:,}".replace(",", "."))
+        c3.metric("Con error", f"{r['filas_con_error']:,}".replace(",", ".")); c4.metric("Meses importados", r['meses'])
+        st.caption("Columnas reconocidas: " + ", ".join(f"{a} → {b}" for a, b in r['columnas'].items() if not b.startswith('_')))
+        if r['errores']:
+            st.dataframe(pd.DataFrame(r['errores'][:200], columns=['Fila', 'Columna', 'Error']), hide_index=True)
+            st.download_button("📄 Descargar errores (CSV)", errores_csv(r), "errores_importacion.csv", "text/csv")
+
+with tab_eventos, medicion.tramo('app.eventos'):
+    # Un registro por accidente o enfermedad profesional; al guardar solo se recalculan
+    # los meses de los eventos creados, modificados o borrados
+    st.subheader("🚑 Registro de Accidentes y Enfermedades Profesionales")
+    c_ec, c_ey = st.columns([3, 1])
+    ev_centro = c_ec.selectbox("Centro:", centros_present, index=centros_present.index(sel_centro) if sel_centro in centros_present else 0, key="ev_c")
+    ev_year = c_ey.selectbox("Año:", years, key="ev_y")
+    ev = abrir_registro().cargar(year=ev_year, centro=ev_centro).set_index('ID')
+    cols_ev = ['Fecha', 'Trabajador', 'Tipo', 'Días Perdidos', 'Días Cargo', 'Descripción']
+    with st.form("eventos_form"):
+        editado = st.data_editor(
+            ev[cols_ev].assign(Fecha=pd.to_datetime(ev['Fecha'])).reset_index(), key="eventos", hide_index=True, num_rows="dynamic",
+            disabled=['ID'], column_config={
+                'Fecha': st.column_config.DateColumn("Fecha", format="DD/MM/YYYY", required=True),
+                'Tipo': st.column_config.SelectboxColumn("Tipo", options=TIPOS, required=True),
+                'Días Perdidos': st.column_config.NumberColumn("Días Perdidos", min_value=0.0),
+                'Días Cargo': st.column_config.NumberColumn("Días Cargo", min_value=0.0)})
+        st.caption(f"{len(ev)} eventos en {ev_year}. Agregue filas al final; para borrar, selecciónelas y use la papelera.")
+        enviado = st.form_submit_button("💾 GUARDAR EVENTOS")
+    if enviado:
+        editado = editado.assign(Fecha=pd.to_datetime(editado['Fecha']).dt.strftime('%Y-%m-%d'))
+        existentes = editado[editado['ID'].notna()].astype({'ID': 'int64'}).set_index('ID')
+        nuevos = editado[editado['ID'].isna()].drop(columns='ID').dropna(how='all').assign(Centro=ev_centro)
+        borrar = [int(i) for i in ev.index.difference(existentes.index)]
+        cambios = diferencias(ev[cols_ev], existentes[cols_ev], cols_ev)
+        if nuevos.empty and not cambios and not borrar: st.rerun()
+        try:
+            if not abrir_almacen().existe(): save_data(df, factor_hht)  # base aún no guardada: se crea completa
+            _, meses = registrar(nuevos=nuevos, cambios=cambios, borrar=borrar, factor_base=factor_hht)
+            st.session_state['aviso'] = (f"Eventos: {len(nuevos)} nuevos, {len(cambios)} modificados, {len(borrar)} borrados; "
+                                         f"{len(meses)} meses recalculados.")
+            recargar()
+        except ConflictoVersion as e: st.session_state['conflicto'] = f"Eventos guardados, pero no se pudo actualizar el mes: {e}"
+        except (ValueError, KeyError) as e: st.session_state['conflicto'] = f"No se guardó: {e}"
+        st.rerun()
+
+with tab_historial, medicion.tramo('app.historial'):
+    # Instantáneas de la base (solo celdas cambiadas por guardado): auditoría, vista de la base
+    # en una instantánea, restauración y regeneración de informes tal como se emitieron
+    st.subheader("🕓 Historial de Versiones")
+    if not HISTORIAL_ACTIVO: st.info("Historial desactivado (SST_HISTORIAL=0).")
+    else:
+        hist = abrir_historial()
+        inst = hist.instantaneas()
+        if inst.empty: st.caption("Sin instantáneas registradas todavía: se registran desde el primer guardado.")
+        else:
+            st.dataframe(inst.iloc[::-1], hide_index=True, use_container_width=True)
+            c_hs, c_hv, c_hr = st.columns([2, 1, 1])
+            sel_inst = c_hs.selectbox("Instantánea:", inst['id'].iloc[::-1].tolist(), key="hist_sel",
+                                      format_func=lambda i: f"{i} · {inst.set_index('id').at[i, 'Fecha']} · {inst.set_index('id').at[i, 'motivo']}")
+            if c_hv.button("👁️ Ver base", key="hist_ver"):
+                try: st.session_state['hist_vista'] = (sel_inst, hist.estado(sel_inst))
+                except ValueError as e: st.error(str(e))
+            if c_hr.button("↩️ Restaurar", key="hist_restaurar"):
+                try:
+                    restaurar(sel_inst, factor_base=factor_hht)
+                    st.session_state['aviso'] = f"Base restaurada a la instantánea {sel_inst} (registrado como una instantánea nueva)."
+                    recargar(); st.rerun()
+                except (ValueError, ConflictoVersion) as e: st.error(f"No se restauró: {e}")
+            if 'hist_vista' in st.session_state:
+                sid, vista_h = st.session_state['hist_vista']
+                st.markdown(f"**Base en la instantánea {sid}**")
+                st.dataframe(vista_h, hide_index=True, use_container_width=True)
+            with st.expander("Cambios por celda"):
+                st.dataframe(hist.cambios(sel_centro).head(2000).astype({'Anterior': str, 'Valor': str}), hide_index=True, use_container_width=True)
+
+        st.markdown("##### 📄 Informes emitidos")
+        emitidos = hist.informes()
+        if emitidos.empty: st.caption("Sin informes emitidos.")
+        else:
+            st.dataframe(emitidos, hide_index=True, use_container_width=True)
+            c_ie, c_ib = st.columns([3, 1])
+            sel_inf = c_ie.selectbox("Informe:", emitidos['id'].tolist(), key="hist_inf")
+            if c_ib.button("📄 Regenerar", key="hist_regenerar"):
+                # Datos de la instantánea del informe, mismas metas y factor; se genera en la cola
+                try: params = hist.parametros_informe(sel_inf)
+                except ValueError as e: st.error(f"No se puede regenerar: {e}")
+                else:
+                    st.session_state['informe_hist'] = (cola_informes().enviar(**params, version=f"informe-{sel_inf}"),
+                                                        f"Reporte_SST_{params['sel_month']}_{params['sel_year']}_{sel_inf}.pdf")
+            if 'informe_hist' in st.session_state:
+                pendiente = cola_informes().estado(st.session_state['informe_hist'][0])['estado'] in ('en cola', 'generando')
+                st.fragment(estado_informe, run_every=1.0 if pendiente else None)(pendiente, 'informe_hist')
+
+# --- 5. RENDIMIENTO ---
+# Panel de administración (?admin=1): activa la medición por tramos (sst.medicion) y
+# muestra las últimas ejecuciones de esta sesión con el desglose de la más reciente
+if st.query_params.get('admin') == '1':
+    with st.sidebar:
+        st.markdown("---")
+        activo = st.toggle("⏱ Medir tiempos", value=medicion.ACTIVO, key='medir_tiempos')
+        if activo != medicion.ACTIVO:
+            medicion.activar() if activo else medicion.desactivar()
+            st.rerun()
+    if medicion.ACTIVO:
+        with st.expander("⏱ Rendimiento (esta sesión)", expanded=False):
+            ejec = medicion.ejecuciones(st.session_state['sesion_id'])
+            if ejec.empty: st.caption("Sin ejecuciones medidas todavía.")
+            else:
+                st.dataframe(ejec, hide_index=True, use_container_width=True)
+                st.markdown(f"**Desglose {ejec['tipo'].iloc[0]} {ejec['ejecucion'].iloc[0]}**")
+                st.dataframe(medicion.desglose(ejec['ejecucion'].iloc[0]), hide_index=True, use_container_width=True)
+            st.markdown("**Percentiles por tramo (proceso)**")
+            st.dataframe(medicion.percentiles(), hide_index=True, use_container_width=True)
+            st.caption(f"Registro: {os.path.abspath(medicion.LOG) if medicion.LOG else 'solo memoria'}")
+medicion.terminar_ejecucion()
+
+# Tiempo de la ejecución completa del script (los cambios de año/mes del tablero solo
+# ejecutan panel_periodo: ver "Panel" en el tablero)
+st.session_state['t_completo'] = (time.perf_counter() - T0_EJECUCION) * 1000
+with st.sidebar: st.caption(f"⏱ Ejecución completa: {st.session_state['t_completo']:.0f} ms")
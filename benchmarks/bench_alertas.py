@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst.agregados import IndiceAcumulado
+from sst.alertas import alertas, alertas_fila
+from sst.kpi import resumen_periodo
+from sst.sintetico import generar_base
+
+# --- BENCHMARK MOTOR DE ALERTAS ---
+# Alertas de toda la cartera: mes a mes (resumen_periodo + reglas sobre una fila, como
+# arma la app el análisis de un período) versus una pasada vectorizada de todas las
+# reglas sobre la tabla de indicadores, y su consulta cacheada por versión de datos.
+# El mes a mes se mide sobre --muestra meses y se extrapola al total.
+
+METAS = {'meta_ta': 3.0, 'meta_gestion': 90}
+
+def mes_a_mes(df, indice, claves):
+    return [alertas_fila(*resumen_periodo(df, y, m, indice=indice, centro=c), METAS) for c, y, m in claves]
+
+def main():
+    ap = argparse.ArgumentParser(description="Alertas: reglas mes a mes vs una pasada vectorizada")
+    ap.add_argument('--centros', type=int, nargs='+', default=[5, 20, 100]); ap.add_argument('--anios', type=int, default=10)
+    ap.add_argument('--muestra', type=int, default=100)
+    args = ap.parse_args()
+    print(f"{'centros':>8} {'meses':>7} {'alertas':>8} {'mes a mes (ms)':>15} {'vectorizado (ms)':>17} {'cacheado (ms)':>14} {'mejora':>8}")
+    for centros in args.centros:
+        df = generar_base(centros, args.anios); indice = IndiceAcumulado(df)
+        claves = list(zip(df['Centro'], df['Año'], df['Mes']))
+        t0 = time.perf_counter(); mes_a_mes(df, indice, claves[:args.muestra])
+        t_fila = (time.perf_counter() - t0) * len(claves) / min(args.muestra, len(claves))
+        t0 = time.perf_counter(); n = len(alertas(df, indice, METAS, version=('bench', centros))); t_vec = time.perf_counter() - t0
+        t0 = time.perf_counter(); alertas(df, indice, METAS, version=('bench', centros)); t_cache = time.perf_counter() - t0
+        print(f"{centros:>8} {len(claves):>7} {n:>8} {t_fila * 1000:>15.0f} {t_vec * 1000:>17.1f} {t_cache * 1000:>14.3f} {t_fila / t_vec:>7.0f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import http.client
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from sst.kpi import procesar_datos, resumen_periodo
+from sst.schema import MESES_ORDEN
+from sst.sintetico import generar_base
+from sst.storage import AlmacenCSV, load_data, save_data
+
+# --- BENCHMARK API DE INDICADORES ---
+# Servidor `python -m sst api` en otro proceso sobre una base CSV sintética y --clientes
+# hilos con conexión persistente pidiendo KPI de (centro, año, mes) al azar, series y
+# ventanas. Se informan peticiones por segundo y latencia p50/p99 con las respuestas
+# en cache, con If-None-Match (304 sin cuerpo) y, como referencia, lo que costaría
+# cada petición releyendo el CSV y recalculando (una API sin cache).
+
+def rutas(centros, anios, n, semilla=0):
+    rnd = random.Random(semilla); out = []
+    for _ in range(n):
+        r = rnd.random(); c = rnd.choice(centros).replace(' ', '%20')
+        if r < 0.8: out.append(f"/api/kpi/{rnd.choice(anios)}/{rnd.choice(MESES_ORDEN)}?centro={c}")
+        elif r < 0.9: out.append(f"/api/serie?centro={c}")
+        else: out.append("/api/ventanas?meses=12")
+    return out
+
+def cliente(puerto, lista, etags, condicional, latencias):
+    conn = http.client.HTTPConnection("127.0.0.1", puerto)
+    for ruta in lista:
+        t0 = time.perf_counter()
+        conn.request("GET", ruta, headers={'If-None-Match': etags[ruta]} if condicional and ruta in etags else {})
+        r = conn.getresponse(); r.read()
+        latencias.append(time.perf_counter() - t0)
+        if r.status == 200: etags[ruta] = r.getheader('ETag')
+    conn.close()
+
+def carga(puerto, lista, clientes, etags, condicional):
+    latencias = []; partes = [lista[i::clientes] for i in range(clientes)]
+    hilos = [threading.Thread(target=cliente, args=(puerto, p, etags, condicional, latencias)) for p in partes]
+    t0 = time.perf_counter()
+    for h in hilos: h.start()
+    for h in hilos: h.join()
+    total = time.perf_counter() - t0; latencias.sort()
+    return len(lista) / total, latencias[len(latencias) // 2], latencias[int(len(latencias) * 0.99)]
+
+def main():
+    ap = argparse.ArgumentParser(description="API de indicadores: peticiones por segundo con cache y ETag")
+    ap.add_argument('--centros', type=int, default=5); ap.add_argument('--anios', type=int, default=10)
+    ap.add_argument('--peticiones', type=int, default=3000); ap.add_argument('--clientes', type=int, default=8)
+    ap.add_argument('--puerto', type=int, default=8599)
+    args = ap.parse_args()
+    df = generar_base(args.centros, args.anios)
+    centros = sorted(df['Centro'].unique()); anios = sorted(int(y) for y in df['Año'].unique())
+    with tempfile.TemporaryDirectory() as tmp:
+        almacen = AlmacenCSV(os.path.join(tmp, "base.csv")); save_data(df, 210, almacen)
+        entorno = {**os.environ, 'PYTHONPATH': RAIZ, 'SST_HISTORIAL': '0'}
+        servidor = subprocess.Popen([sys.executable, "-m", "sst", "--almacen", almacen.path, "api", "--puerto", str(args.puerto)],
+                                    stdout=subprocess.PIPE, env=entorno, text=True)
+        try:
+            servidor.stdout.readline()  # "API SST en ..." cuando la base ya está cargada
+            lista = rutas(centros, anios, args.peticiones)
+            etags = {}
+            frio = carga(args.puerto, lista, args.clientes, etags, False)       # primera vez: calcula y guarda cada respuesta
+            cache = carga(args.puerto, lista, args.clientes, etags, False)
+            cond = carga(args.puerto, lista, args.clientes, etags, True)
+        finally:
+            servidor.terminate(); servidor.wait()
+
+        n = 20; t0 = time.perf_counter()
+        for ruta in lista[:n]:
+            if not ruta.startswith("/api/kpi/"): continue
+            _, _, year, mes = ruta.split('?')[0].split('/')[1:]
+            d = procesar_datos(load_data(almacen), 210)
+            resumen_periodo(d, int(year), mes, centro=ruta.split('centro=')[1].replace('%20', ' '))
+        sin = n / (time.perf_counter() - t0)
+
+    print(f"{len(df)} filas, {len(set(lista))} rutas distintas, {args.peticiones} peticiones, {args.clientes} clientes")
+    print(f"{'':<28}{'pet./s':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for nombre, (rps, p50, p99) in [("primera pasada (calcula)", frio), ("en cache (200)", cache), ("If-None-Match (304)", cond)]:
+        print(f"{nombre:<28}{rps:>10.0f}{p50 * 1000:>10.2f}{p99 * 1000:>10.2f}")
+    print(f"{'releyendo el CSV c/petición':<28}{sin:>10.1f}")
+
+if __name__ == '__main__':
+    main()
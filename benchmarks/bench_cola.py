@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst import graficos
+from sst.agregados import IndiceAcumulado
+from sst.cola import ColaInformes
+from sst.kpi import resumen_periodo
+from sst.pdf import generar_reporte_pdf
+from sst.sintetico import generar_base
+
+# --- BENCHMARK COLA DE INFORMES ---
+# Cierre de mes: --sesiones sesiones piden el informe de un mes cada una (--distintos
+# informes distintos, el resto repetidos). En línea: cada pedido genera su PDF dentro de
+# la ejecución del script (la sesión queda bloqueada ese tiempo). Con la cola: el envío
+# vuelve al instante, los repetidos se unen al mismo trabajo y los distintos se reparten
+# en el pool. Se informa el bloqueo por sesión (promedio y máximo) y el total hasta el último PDF.
+
+METAS = {'meta_ta': 3.0, 'meta_gestion': 90}
+
+def main():
+    ap = argparse.ArgumentParser(description="Informes PDF: en línea vs cola en segundo plano")
+    ap.add_argument('--sesiones', type=int, default=12); ap.add_argument('--distintos', type=int, default=4)
+    ap.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+    df = generar_base(args.distintos, 1, desde=2025); indice = IndiceAcumulado(df)
+    pedidos = [resumen_periodo(df, 2025, 'Junio', indice=indice, centro=f"Centro {i % args.distintos + 1}")
+               for i in range(args.sesiones)]
+
+    bloqueos = []; t0 = time.perf_counter()
+    for row_mes, acum, gestion in pedidos:
+        graficos.limpiar_cache(); t = time.perf_counter()
+        generar_reporte_pdf(row_mes, acum, gestion, METAS, 'Junio', 2025, centro=row_mes['Centro'])
+        bloqueos.append(time.perf_counter() - t)
+    t_linea = time.perf_counter() - t0
+    print(f"en línea   bloqueo prom. {sum(bloqueos) / len(bloqueos) * 1000:>8.1f} ms  máx. {max(bloqueos) * 1000:>8.1f} ms  total {t_linea:>6.2f} s")
+
+    cola = ColaInformes(procesos=args.procesos)
+    calentar = cola.enviar(*pedidos[0], METAS, 'Enero', 2025, version='calentar')  # arranque del pool fuera de la medición
+    while cola.estado(calentar)['estado'] in ('en cola', 'generando'): time.sleep(0.01)
+    bloqueos = []; t0 = time.perf_counter()
+    ids = []
+    for row_mes, acum, gestion in pedidos:
+        t = time.perf_counter()
+        ids.append(cola.enviar(row_mes, acum, gestion, METAS, 'Junio', 2025, centro=row_mes['Centro'], version='bench'))
+        bloqueos.append(time.perf_counter() - t)
+    while any(cola.estado(i)['estado'] in ('en cola', 'generando') for i in ids): time.sleep(0.01)
+    t_cola = time.perf_counter() - t0
+    print(f"cola       bloqueo prom. {sum(bloqueos) / len(bloqueos) * 1000:>8.1f} ms  máx. {max(bloqueos) * 1000:>8.1f} ms  total {t_cola:>6.2f} s"
+          f"  ({len(set(ids))} trabajos para {len(ids)} pedidos, {args.procesos} procesos)")
+    cola.cerrar()
+
+if __name__ == '__main__':
+    main()
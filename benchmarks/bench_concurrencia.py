@@ -0,0 +1,65 @@
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst.schema import MESES_ORDEN, inicializar_db_completa
+from sst.storage import ConflictoVersion, abrir_almacen, save_data
+
+# --- PRUEBA DE CARGA: ESCRITORES CONCURRENTES ---
+# N procesos suman +1 a 'Accidentes CTP' de un mes, K veces cada uno, con el ciclo de
+# la app: leer fila -> editar -> guardar con verificación de versión (reintento si hay
+# conflicto). Al final la suma de la base debe ser exactamente N x K: ninguna
+# actualización perdida. Con --meses 1 todos compiten por la misma fila.
+
+def escritor(path, n, k, meses, salida, largada):
+    almacen = abrir_almacen(path)
+    conflictos = 0
+    largada.wait()  # se mide sin el arranque de los procesos
+    for j in range(k):
+        mes = MESES_ORDEN[(n + j) % meses]
+        while True:
+            fila = almacen.cargar(year=2025, month=mes)
+            fila.loc[0, 'Accidentes CTP'] += 1
+            try:
+                save_data(fila, 210, almacen, filas=[0]); break
+            except ConflictoVersion:
+                conflictos += 1
+    salida.put(conflictos)
+
+def correr(path, procesos, k, meses):
+    almacen = abrir_almacen(path)
+    save_data(inicializar_db_completa(), 210, almacen)
+    salida = mp.Queue(); largada = mp.Barrier(procesos + 1)
+    ps = [mp.Process(target=escritor, args=(path, n, k, meses, salida, largada)) for n in range(procesos)]
+    for p in ps: p.start()
+    largada.wait(); t0 = time.perf_counter()
+    conflictos = sum(salida.get() for _ in ps)
+    for p in ps: p.join()
+    dt = time.perf_counter() - t0
+    total = almacen.cargar(year=2025)['Accidentes CTP'].sum()
+    return total, conflictos, dt
+
+def main():
+    ap = argparse.ArgumentParser(description="Escritores concurrentes: actualizaciones perdidas y rendimiento")
+    ap.add_argument('--procesos', type=int, default=8)
+    ap.add_argument('--escrituras', type=int, default=50, help="Guardados por proceso")
+    ap.add_argument('--meses', type=int, default=1, choices=range(1, 13), help="Filas en disputa (1 = máxima contención)")
+    ap.add_argument('--motores', nargs='+', default=['db', 'csv', 'parquet'])
+    args = ap.parse_args()
+    esperado = args.procesos * args.escrituras
+    print(f"{args.procesos} procesos x {args.escrituras} guardados sobre {args.meses} fila(s)")
+    print(f"{'motor':>8} {'suma':>6} {'esperado':>9} {'conflictos':>11} {'guardados/s':>12}  resultado")
+    fallas = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for motor in args.motores:
+            total, conflictos, dt = correr(os.path.join(tmp, f"carga.{motor}"), args.procesos, args.escrituras, args.meses)
+            ok = int(total) == esperado; fallas += not ok
+            print(f"{motor:>8} {int(total):>6} {esperado:>9} {conflictos:>11} {esperado / dt:>12.1f}  {'OK' if ok else 'PERDIDAS'}")
+    return 1 if fallas else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst.eventos import TIPOS, abrir_registro, recalcular, registrar
+from sst.schema import get_structure_for_year
+from sst.storage import AlmacenSQLite, save_data
+
+# --- BENCHMARK REGISTRO DE EVENTOS ---
+# Registro sintético de accidentes/EP (varios centros y años). Se mide la carga masiva,
+# el recálculo completo de las columnas mensuales y el costo de modificar un evento, que
+# solo recalcula su mes (debe ser plano respecto del tamaño del registro).
+
+def eventos(n, centros, anios, semilla=0):
+    rng = np.random.default_rng(semilla)
+    dias = pd.to_datetime("2000-01-01") + pd.to_timedelta(rng.integers(0, 365 * anios, n), unit="D")
+    return pd.DataFrame({
+        'Centro': np.array([f"Planta {i + 1}" for i in range(centros)])[rng.integers(0, centros, n)],
+        'Fecha': dias.strftime("%Y-%m-%d"), 'Trabajador': rng.integers(1_000_000, 2_000_000, n).astype(str),
+        'Tipo': np.array(TIPOS)[rng.choice(3, n, p=[0.85, 0.01, 0.14])],
+        'Días Perdidos': rng.integers(0, 60, n).astype(float), 'Días Cargo': 0.0, 'Descripción': "",
+    })
+
+def medir(fn, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter(); fn(); tiempos.append(time.perf_counter() - t0)
+    return sorted(tiempos)[len(tiempos) // 2]
+
+def main():
+    ap = argparse.ArgumentParser(description="Registro de eventos: carga, recálculo completo y edición de un evento")
+    ap.add_argument('--eventos', type=int, nargs='+', default=[10_000, 100_000, 300_000])
+    ap.add_argument('--centros', type=int, default=5); ap.add_argument('--anios', type=int, default=20)
+    args = ap.parse_args()
+    print(f"{'eventos':>8} {'carga (s)':>10} {'recálculo (s)':>14} {'editar 1 (ms)':>14} {'mes (ms)':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.eventos:
+            almacen = AlmacenSQLite(os.path.join(tmp, f"e{n}.db"))
+            base = pd.concat([get_structure_for_year(2000 + a, f"Planta {c + 1}") for c in range(args.centros) for a in range(args.anios)],
+                             ignore_index=True)
+            save_data(base, 210, almacen)
+            registro = abrir_registro(almacen)
+            t0 = time.perf_counter(); registro.aplicar(nuevos=eventos(n, args.centros, args.anios)); t_carga = time.perf_counter() - t0
+            t_total = medir(lambda: recalcular(almacen), repeticiones=1)
+            dias = iter(range(1, 10_000))
+            t_uno = medir(lambda: registrar(almacen, cambios={n // 2: {'Días Perdidos': next(dias)}}))
+            t_mes = medir(lambda: registro.resumen([("Planta 1", 2010, "Marzo")]))
+            print(f"{n:>8} {t_carga:>10.2f} {t_total:>14.2f} {t_uno * 1000:>14.1f} {t_mes * 1000:>9.2f}")
+
+if __name__ == '__main__':
+    main()
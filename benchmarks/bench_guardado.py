@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst.agregados import IndiceAcumulado
+from sst.incremental import RegistroCambios
+from sst.kpi import procesar_datos
+from sst.schema import COL_VERSION, get_structure_for_year, version_datos, version_incremental
+from sst.storage import AlmacenSQLite, load_data, save_data
+
+# --- BENCHMARK LATENCIA DE GUARDADO ---
+# Editar un mes y guardar: ruta completa (recalcular todo, reescribir, re-hashear,
+# reconstruir índice) contra la ruta incremental (solo la fila tocada).
+
+def base(almacen, n_anios):
+    # Se relee desde la base, como en la app (columnas de texto en un solo bloque)
+    almacen.guardar(procesar_datos(pd.concat([get_structure_for_year(2000 + i) for i in range(n_anios)], ignore_index=True)))
+    return load_data(almacen)
+
+def completo(df, almacen, idx):
+    df.at[idx, 'Accidentes CTP'] = df.at[idx, 'Accidentes CTP'] + 1
+    guardado = save_data(df, 210, almacen)
+    df[COL_VERSION] = guardado[COL_VERSION]  # versiones nuevas para la siguiente repetición
+    return version_datos(guardado), IndiceAcumulado(guardado)
+
+def incremental(df, almacen, idx, version, indice):
+    cambios = RegistroCambios()
+    cambios.editar(df, idx, {'Accidentes CTP': df.at[idx, 'Accidentes CTP'] + 1, 'Masa Laboral': 100.0})
+    df = save_data(df, 210, almacen, filas=cambios.filas)
+    indice.actualizar_filas(df, cambios.filas)
+    return version_incremental(version, df, cambios.filas)
+
+def medir(fn, *args, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter(); fn(*args); tiempos.append(time.perf_counter() - t0)
+    return sorted(tiempos)[len(tiempos) // 2]
+
+def main():
+    ap = argparse.ArgumentParser(description="Latencia de guardado de un mes según tamaño del histórico")
+    ap.add_argument('--anios', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    args = ap.parse_args()
+    print(f"{'filas':>8} {'completo (ms)':>14} {'incremental (ms)':>17}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.anios:
+            almacen = AlmacenSQLite(os.path.join(tmp, f"b{n}.db")); df = base(almacen, n)
+            idx = len(df) // 2
+            t_full = medir(completo, df, almacen, idx, repeticiones=3)
+            version, indice = version_datos(df), IndiceAcumulado(df)
+            t_inc = medir(incremental, df, almacen, idx, version, indice)
+            print(f"{len(df):>8} {t_full * 1000:>14.1f} {t_inc * 1000:>17.1f}")
+
+if __name__ == '__main__':
+    main()
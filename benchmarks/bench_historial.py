@@ -0,0 +1,78 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst import historial
+from sst.historial import abrir_historial
+from sst.incremental import RegistroCambios
+from sst.sintetico import generar_base
+from sst.storage import AlmacenSQLite, load_data, save_data
+
+# --- BENCHMARK HISTORIAL DE VERSIONES ---
+# --guardados ediciones de un mes (como el editor de la app), cada una registrada en el
+# historial (solo celdas cambiadas + checkpoints periódicos) contra guardar una copia
+# completa de la tabla por versión. Se informa el espacio de cada alternativa, el costo
+# agregado al guardado y el tiempo de reconstruir instantáneas al azar (la copia completa
+# es una lectura directa; el historial, checkpoint anterior + cambios).
+
+def tam_historial(path):
+    conn = sqlite3.connect(path)
+    try: return sum(conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name LIKE ?", (p,)).fetchone()[0] or 0
+                    for p in ('hist_%', 'ix_hist_%'))
+    except sqlite3.OperationalError: return os.path.getsize(path)  # SQLite sin dbstat
+    finally: conn.close()
+
+def guardados(almacen, n, semilla=0):
+    rnd = random.Random(semilla); df = load_data(almacen); tiempos = []
+    for _ in range(n):
+        idx = df.index[rnd.randrange(len(df))]
+        cambios = RegistroCambios()
+        cambios.editar(df, idx, {'Accidentes CTP': df.at[idx, 'Accidentes CTP'] + 1, 'Masa Laboral': float(rnd.randint(20, 200))})
+        t0 = time.perf_counter(); df = save_data(df, 210, almacen, filas=cambios.filas); tiempos.append(time.perf_counter() - t0)
+    return sorted(tiempos)[len(tiempos) // 2]
+
+def main():
+    ap = argparse.ArgumentParser(description="Historial por celdas vs copia completa por versión")
+    ap.add_argument('--centros', type=int, default=5); ap.add_argument('--anios', type=int, default=10)
+    ap.add_argument('--guardados', type=int, default=200); ap.add_argument('--consultas', type=int, default=20)
+    args = ap.parse_args()
+    df = generar_base(args.centros, args.anios)
+    with tempfile.TemporaryDirectory() as tmp:
+        historial.ACTIVO = False
+        sin = AlmacenSQLite(os.path.join(tmp, "sin.db")); save_data(df, 210, sin)
+        t_sin = guardados(sin, args.guardados)
+        historial.ACTIVO = True
+        con = AlmacenSQLite(os.path.join(tmp, "con.db")); save_data(df, 210, con)
+        t_con = guardados(con, args.guardados)
+
+        # Copia completa por versión: una tabla por guardado (lo que se leería para volver atrás)
+        copia = sqlite3.connect(os.path.join(tmp, "copias.db")); base = con.cargar()
+        t0 = time.perf_counter()
+        for v in range(args.guardados + 1): base.assign(_copia=v).to_sql("copias", copia, if_exists='append', index=False)
+        copia.commit(); t_copias = (time.perf_counter() - t0) / (args.guardados + 1); copia.close()
+        tam_copias = os.path.getsize(os.path.join(tmp, "copias.db"))
+
+        hist = abrir_historial(con); ids = hist.instantaneas()['id'].tolist()
+        rnd = random.Random(1); muestra = [rnd.choice(ids) for _ in range(args.consultas)]
+        t0 = time.perf_counter()
+        for sid in muestra: hist.estado(sid)
+        t_estado = (time.perf_counter() - t0) / len(muestra)
+        copia = sqlite3.connect(os.path.join(tmp, "copias.db"))
+        t0 = time.perf_counter()
+        for sid in muestra: copia.execute("SELECT * FROM copias WHERE _copia = ?", (sid % (args.guardados + 1),)).fetchall()
+        t_copia = (time.perf_counter() - t0) / len(muestra); copia.close()
+        n_cp = int(hist.instantaneas()['checkpoint'].sum())
+
+        print(f"{len(df)} filas, {args.guardados} guardados de un mes, {len(ids)} instantáneas ({n_cp} checkpoints)")
+        print(f"{'':<26}{'espacio (KB)':>14}{'guardado p50 (ms)':>20}{'reconstruir (ms)':>18}")
+        print(f"{'historial por celdas':<26}{tam_historial(hist.path) / 1024:>14.0f}{t_con * 1000:>20.1f}{t_estado * 1000:>18.1f}")
+        print(f"{'copia completa/versión':<26}{tam_copias / 1024:>14.0f}{(t_sin + t_copias) * 1000:>20.1f}{t_copia * 1000:>18.1f}")
+        print(f"{'sin historial':<26}{'-':>14}{t_sin * 1000:>20.1f}{'-':>18}")
+
+if __name__ == '__main__':
+    main()
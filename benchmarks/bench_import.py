@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# --- BENCHMARK TIEMPO DE IMPORTACIÓN ---
+# Cada medición corre en un intérprete nuevo. Se miden los puntos de entrada que usan
+# la app, la CLI y los trabajos por lote; cada uno tiene las dependencias pesadas que
+# necesita (procesar_datos: pandas; PDF_SST: fpdf), que se importan antes de medir:
+# el límite aplica al costo propio de sst. Falla (exit 1) si alguno supera el límite
+# o si arrastra dependencias que no le corresponden (streamlit, plotly, matplotlib...).
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ['streamlit', 'plotly', 'matplotlib', 'pandas', 'fpdf']
+
+ENTRADAS = [  # (sentencia, dependencias pesadas permitidas)
+    ("import sst", []),
+    ("from sst import MESES_ORDEN", []),
+    ("import sst.__main__", []),
+    ("from sst import procesar_datos", ['pandas']),
+    ("from sst import resumen_periodo", ['pandas']),
+    ("from sst import load_data, save_data", ['pandas']),
+    ("from sst import PDF_SST", ['fpdf']),
+    ("from sst.pdf import generar_reporte_pdf", ['fpdf']),
+]
+
+SNIPPET = """
+import json, sys, time
+{previos}
+t0 = time.perf_counter()
+{stmt}
+dt = time.perf_counter() - t0
+print(json.dumps({{'ms': dt * 1000, 'cargados': [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+def medir(stmt, repeticiones, previos=()):
+    code = SNIPPET.format(stmt=stmt, previos="\n".join(f"import {m}" for m in previos), pesados=PESADOS)
+    res = [json.loads(subprocess.check_output([sys.executable, '-c', code], cwd=ROOT)) for _ in range(repeticiones)]
+    return statistics.median(r['ms'] for r in res), [m for m in res[-1]['cargados'] if m not in previos]
+
+def main():
+    ap = argparse.ArgumentParser(description="Tiempo de importación del núcleo sst")
+    ap.add_argument('-n', type=int, default=7, help="repeticiones por sentencia")
+    ap.add_argument('--limite-ms', type=float, default=100.0)
+    args = ap.parse_args()
+
+    fallas = []
+    print(f"{'':<42}{'sst (ms)':>10}{'en frío (ms)':>14}  pesados")
+    for stmt, permitidos in ENTRADAS:
+        ms, cargados = medir(stmt, args.n, permitidos)
+        frio = medir(stmt, args.n)[0] if permitidos else ms
+        print(f"{stmt:<42}{ms:>10.1f}{frio:>14.1f}  {permitidos + cargados}")
+        if ms > args.limite_ms or cargados: fallas.append(stmt)
+
+    if fallas:
+        print(f"FALLA: cada entrada debe tardar < {args.limite_ms:.0f} ms (sin contar sus dependencias) "
+              f"sin cargar otras de {PESADOS}: {', '.join(fallas)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
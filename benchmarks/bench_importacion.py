@@ -0,0 +1,72 @@
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst.importacion import importar
+from sst.storage import AlmacenSQLite, load_data
+
+# --- BENCHMARK IMPORTACIÓN MASIVA ---
+# Exportación de remuneraciones/ausentismo sintética (una fila por trabajador y mes, con
+# ';' y coma decimal como las planillas locales) importada por bloques. Cada corrida va en
+# un proceso nuevo para medir su memoria máxima (RSS): debe depender del tamaño del
+# bloque, no del largo del archivo.
+
+def generar(path, filas, centros=4, errores=0.01, semilla=0):
+    rng = np.random.default_rng(semilla)
+    meses = pd.date_range("2020-01-01", periods=max(1, filas // (centros * 2000)), freq="MS")
+    df = pd.DataFrame({
+        'RUT': rng.integers(1_000_000, 1_000_000 + 2000 * centros, filas).astype(str),
+        'Sucursal': np.array([f"Planta {i + 1}" for i in range(centros)])[rng.integers(0, centros, filas)],
+        'Fecha': meses[rng.integers(0, len(meses), filas)].strftime("%d/%m/%Y"),
+        'Horas Extra': np.round(rng.exponential(4, filas), 1),
+        'Horas Licencia': np.where(rng.random(filas) < 0.05, rng.integers(8, 180, filas), 0),
+        'Accidentes': (rng.random(filas) < 0.002).astype(int),
+    })
+    malas = rng.random(filas) < errores
+    df['Horas Extra'] = df['Horas Extra'].astype(str).str.replace('.', ',', regex=False)
+    df.loc[malas, 'Horas Extra'] = "-3"
+    df.to_csv(path, sep=';', index=False)
+
+def correr(archivo, db, bloque, salida):
+    t0 = time.perf_counter()
+    r = importar(archivo, AlmacenSQLite(db), tamano=bloque)
+    dt = time.perf_counter() - t0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB en Linux
+    salida.put((dt, rss, r['filas_validas'], r['filas_con_error'], r['meses']))
+
+def base_rss():
+    # Memoria de un proceso que solo importa las dependencias (referencia)
+    salida = mp.Queue()
+    p = mp.Process(target=lambda q: q.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024), args=(salida,))
+    p.start(); v = salida.get(); p.join()
+    return v
+
+def main():
+    ap = argparse.ArgumentParser(description="Tiempo y memoria máxima de la importación por bloques")
+    ap.add_argument('--filas', type=int, nargs='+', default=[100_000, 500_000])
+    ap.add_argument('--bloques', type=int, nargs='+', default=[10_000, 50_000])
+    args = ap.parse_args()
+    mp.set_start_method('fork')
+    print(f"proceso base: {base_rss():.0f} MB")
+    print(f"{'filas':>8} {'archivo MB':>11} {'bloque':>7} {'seg':>7} {'filas/s':>9} {'RSS máx MB':>11} {'válidas':>8} {'errores':>8} {'meses':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.filas:
+            archivo = os.path.join(tmp, f"rrhh_{n}.csv"); generar(archivo, n)
+            mb = os.path.getsize(archivo) / 2**20
+            for b in args.bloques:
+                db = os.path.join(tmp, f"i_{n}_{b}.db"); salida = mp.Queue()
+                p = mp.Process(target=correr, args=(archivo, db, b, salida)); p.start()
+                dt, rss, validas, errores, meses = salida.get(); p.join()
+                print(f"{n:>8} {mb:>11.1f} {b:>7} {dt:>7.2f} {n / dt:>9.0f} {rss:>11.0f} {validas:>8} {errores:>8} {meses:>6}")
+            assert load_data(AlmacenSQLite(db))['Accidentes CTP'].sum() > 0
+
+if __name__ == '__main__':
+    main()
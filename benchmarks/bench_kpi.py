@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst.kpi import procesar_datos
+
+# --- BENCHMARK MOTOR KPI ---
+# Compara la versión fila a fila original (df.apply) contra el motor vectorizado
+# y verifica que los resultados sean idénticos bit a bit.
+
+COLS_KPI = ['HHT', 'Tasa Acc.', 'Tasa Sin.', 'Indice Frec.', 'Indice Grav.']
+
+def procesar_datos_legacy(df, factor_base=210):
+    cols_exclude = ['Año', 'Mes', 'Observaciones']
+    for col in df.columns:
+        if col not in cols_exclude:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    df['Año'] = df['Año'].fillna(2026).astype(int)
+    if 'Observaciones' not in df.columns: df['Observaciones'] = ""
+    df['Observaciones'] = df['Observaciones'].fillna("").astype(str)
+    df['HHT'] = (df['Masa Laboral'] * factor_base) + df['Horas Extras'] - df['Horas Ausentismo']
+    df['HHT'] = df['HHT'].apply(lambda x: x if x > 0 else 0)
+
+    def calc_row(row):
+        masa = row['Masa Laboral']
+        hht = row['HHT']
+        if masa <= 0 or hht <= 0: return 0, 0, 0, 0
+        ta = (row['Accidentes CTP'] / masa) * 100
+        ts = (row['Días Perdidos'] / masa) * 100
+        if_ = (row['Accidentes CTP'] * 1000000) / hht
+        ig = ((row['Días Perdidos'] + row['Días Cargo']) * 1000000) / hht
+        return ta, ts, if_, ig
+
+    result = df.apply(calc_row, axis=1, result_type='expand')
+    df['Tasa Acc.'] = result[0]
+    df['Tasa Sin.'] = result[1]
+    df['Indice Frec.'] = result[2]
+    df['Indice Grav.'] = result[3]
+    return df
+
+def datos_sinteticos(n, seed=0):
+    rng = np.random.default_rng(seed)
+    masa = rng.integers(0, 400, n).astype(float)
+    masa[rng.random(n) < 0.05] = 0.0  # meses sin masa
+    return pd.DataFrame({
+        'Año': rng.integers(2015, 2027, n), 'Mes': rng.choice(['Enero', 'Julio', 'Diciembre'], n),
+        'Masa Laboral': masa, 'Horas Extras': rng.integers(0, 3000, n).astype(float),
+        'Horas Ausentismo': rng.integers(0, 90000, n).astype(float),
+        'Accidentes CTP': rng.poisson(0.6, n).astype(float), 'Días Perdidos': rng.poisson(6, n).astype(float),
+        'Días Cargo': rng.choice([0.0, 0.0, 0.0, 1500.0], n), 'Observaciones': "",
+        'HHT': 0.0, 'Tasa Acc.': 0.0, 'Tasa Sin.': 0.0, 'Indice Frec.': 0.0, 'Indice Grav.': 0.0,
+    })
+
+def medir(fn, df):
+    t0 = time.perf_counter(); out = fn(df); return time.perf_counter() - t0, out
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark procesar_datos (legacy vs vectorizado)")
+    ap.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = ap.parse_args()
+
+    print(f"{'filas':>10} {'legacy (s)':>12} {'vector (s)':>12} {'speedup':>9}  idéntico")
+    for n in args.sizes:
+        base = datos_sinteticos(n)
+        t_old, old = medir(procesar_datos_legacy, base.copy())
+        t_new, new = medir(procesar_datos, base.copy())
+        igual = all(np.array_equal(old[c].to_numpy(dtype='float64'), new[c].to_numpy(dtype='float64')) for c in COLS_KPI)
+        print(f"{n:>10} {t_old:>12.4f} {t_new:>12.4f} {t_old / t_new:>8.1f}x  {'sí' if igual else 'NO'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from sst import medicion
+from sst.kpi import procesar_datos
+from sst.sintetico import generar_base
+
+# --- BENCHMARK MEDICIÓN ---
+# Costo de la instrumentación (sst.medicion): una función trivial sin decorar, con
+# @medido desactivado y activado, y un tramo() vacío, en ns por llamada. Además
+# procesar_datos real con y sin medición, para ver el sobrecosto sobre una ruta costosa.
+
+def plana(x): return x
+
+@medicion.medido('bench.decorada')
+def decorada(x): return x
+
+def por_llamada(fn, n):
+    t0 = time.perf_counter()
+    for i in range(n): fn(i)
+    return (time.perf_counter() - t0) / n * 1e9
+
+def tramo_vacio(_):
+    with medicion.tramo('bench.tramo'): pass
+
+def mejor(fn, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter(); fn(); tiempos.append((time.perf_counter() - t0) * 1000)
+    return min(tiempos)
+
+def main():
+    ap = argparse.ArgumentParser(description="Sobrecosto de la medición por tramos, desactivada y activada")
+    ap.add_argument('-n', type=int, default=200_000, help="Llamadas por medición")
+    args = ap.parse_args()
+    df = generar_base(5, 10)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'':<22} {'desactivada':>12} {'activada':>12}")
+        filas = {}
+        for activo in (False, True):
+            medicion.activar(os.path.join(tmp, "t.jsonl")) if activo else medicion.desactivar()
+            filas.setdefault('función plana (ns)', []).append(por_llamada(plana, args.n))
+            filas.setdefault('@medido (ns)', []).append(por_llamada(decorada, args.n))
+            filas.setdefault('tramo() vacío (ns)', []).append(por_llamada(tramo_vacio, args.n))
+            filas.setdefault('procesar_datos (ms)', []).append(mejor(lambda: procesar_datos(df.copy(), 210)))
+        medicion.desactivar()
+        for nombre, (off, on) in filas.items(): print(f"{nombre:<22} {off:>12.1f} {on:>12.1f}")
+
+if __name__ == '__main__':
+    main()
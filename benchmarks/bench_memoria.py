@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst.agregados import IndiceAcumulado
+from sst.compacto import compactar
+from sst.incremental import RegistroCambios
+from sst.kpi import preparar_anio, resumen_periodo
+from sst.sintetico import generar_base
+
+# --- BENCHMARK MEMORIA ---
+# Bytes por fila de df_main con los tipos de procesar_datos (float64, textos) y en formato
+# compacto (sst.compacto), y lo que copia una sesión al editar una celda (con
+# Copy-on-Write solo se duplica la columna tocada). Verifica que los indicadores del
+# tablero sean los mismos con ambas tablas.
+
+def mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+def main():
+    ap = argparse.ArgumentParser(description="Memoria de df_main: tipos anchos vs compactos")
+    ap.add_argument('--centros', type=int, nargs='+', default=[5, 50, 200]); ap.add_argument('--anios', type=int, default=20)
+    args = ap.parse_args()
+    print(f"{'filas':>8} {'ancha (MB)':>11} {'compacta (MB)':>14} {'reducción':>10} {'B/fila':>12} {'compactar (ms)':>15} {'KPI iguales':>12}")
+    for centros in args.centros:
+        df = generar_base(centros, args.anios).assign(Version=1)
+        t0 = time.perf_counter(); comp = compactar(df); t = (time.perf_counter() - t0) * 1000
+        year = int(df['Año'].max()); i1, i2 = IndiceAcumulado(df), IndiceAcumulado(comp)
+        a = resumen_periodo(df, year, 'Diciembre', preparar_anio(df, year), i1)
+        b = resumen_periodo(comp, year, 'Diciembre', preparar_anio(comp, year), i2)
+        iguales = all(np.isclose(float(a[1][k]), float(b[1][k])) for k in a[1]) and \
+                  np.allclose(i1.ventanas(12)['ta_acum'], i2.ventanas(12)['ta_acum'])
+        print(f"{len(df):>8} {mb(df):>11.2f} {mb(comp):>14.2f} {mb(df) / mb(comp):>9.1f}x "
+              f"{mb(df) * 1e6 / len(df):>5.0f}->{mb(comp) * 1e6 / len(df):<5.0f} {t:>15.1f} {str(iguales):>12}")
+    # Copia por sesión al editar una celda: una columna de la tabla
+    for nombre, tabla in [("ancha", df), ("compacta", comp)]:
+        vista = tabla.copy(deep=False); RegistroCambios().editar(vista, 0, {'Accidentes CTP': 5})
+        print(f"edición en sesión ({nombre}): copia {vista['Accidentes CTP'].memory_usage(index=False) / 1e3:.0f} KB")
+
+if __name__ == '__main__':
+    main()
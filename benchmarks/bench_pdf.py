@@ -0,0 +1,92 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sst.pdf
+from sst import graficos
+from sst.kpi import procesar_datos, resumen_periodo
+from sst.pdf import PDF_SST, generar_reporte_pdf
+from sst.schema import MESES_ORDEN, get_structure_for_year
+
+# --- BENCHMARK GENERACIÓN DE INFORMES PDF ---
+# legacy:   matplotlib + pyplot -> archivo temporal -> FPDF.image (versión original)
+# memoria:  buffers en memoria, cache de imágenes vacío en cada informe
+# cache:    buffers en memoria con cache caliente (informes repetidos)
+# vectorial: donas dibujadas con trazados PDF, sin matplotlib
+
+class PDFLegacy(PDF_SST):
+    def draw_donut_chart_image(self, val_pct, color_hex, x, y, size=30):
+        import matplotlib.pyplot as plt
+        val_plot = min(val_pct, 100); val_plot = max(val_plot, 0)
+        fig, ax = plt.subplots(figsize=(2, 2))
+        ax.pie([val_plot, 100-val_plot], colors=[color_hex, '#eeeeee'], startangle=90, counterclock=False,
+               wedgeprops=dict(width=0.4, edgecolor='white'))
+        ax.text(0, 0, f"{val_pct:.0f}%", ha='center', va='center', fontsize=12, fontweight='bold', color='#333333')
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
+            plt.savefig(tmp.name, format='png', transparent=True, dpi=100, bbox_inches='tight')
+            tmp_name = tmp.name
+        plt.close(fig)
+        self.image(tmp_name, x=x, y=y, w=size, h=size)
+        os.unlink(tmp_name)
+
+    def draw_kpi_circle_pair(self, title, val_m, val_a, max_scale, meta, unit, x, y):
+        import matplotlib.pyplot as plt
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(4, 2))
+        for ax, val, t in [(ax1, val_m, "MENSUAL"), (ax2, val_a, "ACUMULADO")]:
+            color = '#4CAF50' if val <= meta else '#F44336'
+            val_plot = min(val, max_scale)
+            ax.pie([val_plot, max_scale - val_plot], colors=[color, '#EEEEEE'], startangle=90, counterclock=False, wedgeprops=dict(width=0.3, edgecolor='white'))
+            ax.text(0, 0, f"{val:.1f}\n{unit}", ha='center', va='center', fontsize=10, fontweight='bold')
+            ax.set_title(t, fontsize=8, color='#555555')
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
+            plt.savefig(tmp.name, format='png', bbox_inches='tight', dpi=100)
+            tmp_name = tmp.name
+        plt.close(fig)
+        self.set_xy(x, y); self.set_font('Arial', 'B', 9)
+        self.cell(90, 8, title, 0, 1, 'C')
+        self.image(tmp_name, x=x+5, y=y+8, w=80, h=40)
+        os.unlink(tmp_name)
+
+def datos_demo():
+    import numpy as np
+    rng = np.random.default_rng(7)
+    df = get_structure_for_year(2025)
+    df['Masa Laboral'] = rng.integers(80, 120, 12).astype(float)
+    df['Accidentes CTP'] = rng.poisson(0.8, 12).astype(float); df['Días Perdidos'] = rng.poisson(8, 12).astype(float)
+    for p, e in [('Insp. Programadas', 'Insp. Ejecutadas'), ('Cap. Programadas', 'Cap. Ejecutadas'), ('Medidas Abiertas', 'Medidas Cerradas')]:
+        df[p] = 10.0; df[e] = rng.integers(5, 11, 12).astype(float)
+    return procesar_datos(df)
+
+def correr(df, meses, metas, vectorial=False, limpiar=False):
+    t0 = time.perf_counter()
+    for mes in meses:
+        if limpiar: graficos.limpiar_cache()
+        row_mes, acum, gestion = resumen_periodo(df, 2025, mes)
+        generar_reporte_pdf(row_mes, acum, gestion, metas, mes, 2025, logo_file=None, vectorial=vectorial)
+    return (time.perf_counter() - t0) / len(meses)
+
+def main():
+    ap = argparse.ArgumentParser(description="Tiempo por informe PDF_SST")
+    ap.add_argument('--meses', type=int, default=12)
+    args = ap.parse_args()
+    df = datos_demo(); meses = MESES_ORDEN[:args.meses]
+    metas = {'meta_ta': 3.0, 'meta_gestion': 90}
+
+    original = sst.pdf.PDF_SST
+    sst.pdf.PDF_SST = PDFLegacy
+    try: t_legacy = correr(df, meses, metas)
+    finally: sst.pdf.PDF_SST = original
+
+    t_mem = correr(df, meses, metas, limpiar=True)
+    correr(df, meses, metas)
+    t_cache = correr(df, meses, metas)
+    t_vec = correr(df, meses, metas, vectorial=True)
+    print(f"{'modo':<12}{'ms/informe':>12}{'speedup':>10}")
+    for nombre, t in [('legacy', t_legacy), ('memoria', t_mem), ('cache', t_cache), ('vectorial', t_vec)]:
+        print(f"{nombre:<12}{t * 1000:>12.1f}{t_legacy / t:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from sst.schema import MESES_ORDEN, get_structure_for_year
+from sst.storage import AlmacenSQLite, save_data
+
+# --- BENCHMARK RERUN DEL TABLERO ---
+# Cambio de "Mes de Corte": antes se re-ejecutaba el script completo (barra lateral,
+# logo, factor HHT, todas las pestañas); ahora solo el fragmento panel_periodo. La app
+# registra ambos tiempos en session_state ('t_completo', 't_panel'); AppTest ejecuta
+# siempre el script entero, así que se comparan esos dos tiempos por cada cambio de mes.
+# La segunda vuelta por los meses usa las figuras ya cacheadas.
+
+def main():
+    ap = argparse.ArgumentParser(description="Latencia de un cambio de mes: script completo vs fragmento del tablero")
+    ap.add_argument('--centros', type=int, default=3); ap.add_argument('--anios', type=int, default=10)
+    ap.add_argument('--vueltas', type=int, default=2)
+    args = ap.parse_args()
+    from streamlit.testing.v1 import AppTest
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        df = pd.concat([get_structure_for_year(2020 + a, f"Planta {c + 1}") for c in range(args.centros) for a in range(args.anios)],
+                       ignore_index=True)
+        df['Masa Laboral'] = 100.0; df['Accidentes CTP'] = (df.index % 7 == 0).astype(float)
+        save_data(df, 210, AlmacenSQLite(os.path.join(tmp, "base_datos_galvez.db")))
+        at = AppTest.from_file(os.path.join(RAIZ, "app.py"), default_timeout=300).run()
+        print(f"{len(df)} filas, {args.centros} centros")
+        print(f"{'vuelta':>6} {'script completo (ms)':>21} {'fragmento (ms)':>15} {'reducción':>10}")
+        for v in range(args.vueltas):
+            completo, panel = [], []
+            for mes in MESES_ORDEN:
+                [s for s in at.selectbox if s.label == "Mes de Corte"][0].select(mes).run()
+                completo.append(at.session_state['t_completo']); panel.append(at.session_state['t_panel'])
+            c, p = statistics.median(completo), statistics.median(panel)
+            print(f"{v + 1:>6} {c:>21.1f} {p:>15.1f} {c / p:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst.agregados import IndiceAcumulado
+from sst.kpi import calcular_acumulado
+from sst.schema import MES_IDX
+from sst.sintetico import generar_base
+
+# --- BENCHMARK VENTANAS MÓVILES ---
+# Todas las ventanas de N meses de un centro: filtrando df por cada ventana (como se arma
+# df_acum para el acumulado anual, cuadrático en el largo de la serie) versus las sumas
+# acumuladas de IndiceAcumulado.ventanas (una pasada). En la app el índice ya existe
+# (cacheado por versión de datos); se informa aparte el costo de construirlo.
+
+def filtrando(df, centro, meses):
+    d = df[df['Centro'] == centro]
+    periodo = d['Año'] * 12 + d['Mes'].map(MES_IDX)
+    return [calcular_acumulado(d[(periodo > fin - meses) & (periodo <= fin)]) for fin in sorted(periodo.unique())]
+
+def main():
+    ap = argparse.ArgumentParser(description="Ventanas móviles: filtrado por ventana vs sumas acumuladas")
+    ap.add_argument('--centros', type=int, default=5); ap.add_argument('--anios', type=int, nargs='+', default=[5, 10, 20])
+    ap.add_argument('--meses', type=int, default=12)
+    args = ap.parse_args()
+    print(f"{'años':>5} {'ventanas':>9} {'filtrando (ms)':>15} {'índice (ms)':>12} {'ventanas (ms)':>14} {'mejora':>8}")
+    for anios in args.anios:
+        df = generar_base(args.centros, anios)
+        t0 = time.perf_counter(); n = len(filtrando(df, "Centro 1", args.meses)); t_filtro = time.perf_counter() - t0
+        t0 = time.perf_counter(); indice = IndiceAcumulado(df); t_indice = time.perf_counter() - t0
+        t0 = time.perf_counter(); indice.ventanas(args.meses, "Centro 1"); t_acum = time.perf_counter() - t0
+        print(f"{anios:>5} {n:>9} {t_filtro * 1000:>15.1f} {t_indice * 1000:>12.1f} {t_acum * 1000:>14.2f} {t_filtro / t_acum:>7.0f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import pandas as pd
+
+from sst import graficos
+from sst.agregados import IndiceAcumulado
+from sst.alertas import alertas
+from sst.excel import to_excel
+from sst.incremental import RegistroCambios
+from sst.kpi import preparar_anio, procesar_datos, resumen_periodo
+from sst.pdf import generar_reporte_pdf
+from sst.sintetico import generar_base
+from sst.storage import AlmacenSQLite, load_data, save_data
+
+# --- SUITE DE BENCHMARKS ---
+# Base sintética (sst.sintetico) de N centros x Y años y una medición por etapa del
+# flujo de la app. Resultado en JSON (mediana y mínimo en ms por caso) y comparación
+# contra una línea base guardada: un caso es regresión si su mínimo (lo más estable
+# entre repeticiones) supera la base en más de --tolerancia (relativa) y más de
+# --minimo-ms (absoluto, filtra ruido).
+# La línea base depende de la máquina: regenerarla con --guardar-base al cambiar de equipo.
+#
+#   python benchmarks/suite.py                      # compara contra benchmarks/baseline.json
+#   python benchmarks/suite.py --guardar-base       # actualiza la línea base
+#   python benchmarks/suite.py -o resultados.json --casos procesar_datos pdf
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+METAS = {'meta_ta': 3.0, 'meta_gestion': 90}
+
+def medir(fn, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter(); fn(); tiempos.append((time.perf_counter() - t0) * 1000)
+    return {'mediana_ms': round(statistics.median(tiempos), 3), 'min_ms': round(min(tiempos), 3), 'repeticiones': repeticiones}
+
+def casos(df, tmp):
+    # nombre -> función a medir (sobre la base ya guardada y releída, como en la app)
+    almacen = AlmacenSQLite(os.path.join(tmp, "suite.db")); save_data(df, 210, almacen)
+    cargado = load_data(almacen); indice = IndiceAcumulado(cargado)
+    year = int(df['Año'].max()); centro = df['Centro'].iloc[0]
+    row_mes, acum, gestion = resumen_periodo(cargado, year, 'Diciembre', indice=indice, centro=centro)
+
+    def editar_mes():
+        nonlocal cargado
+        cambios = RegistroCambios(); idx = len(cargado) // 2
+        cambios.editar(cargado, idx, {'Accidentes CTP': cargado.at[idx, 'Accidentes CTP'] + 1})
+        cargado = save_data(cargado, 210, almacen, filas=cambios.filas)
+
+    def guardar_completo():
+        nonlocal cargado
+        cargado = save_data(cargado, 210, almacen)
+
+    def pdf():
+        graficos.limpiar_cache()
+        generar_reporte_pdf(row_mes, acum, gestion, METAS, 'Diciembre', year, centro=centro)
+
+    return {
+        'procesar_datos': lambda: procesar_datos(df.copy(), 210),
+        'save_data_completo': guardar_completo,
+        'save_data_un_mes': editar_mes,
+        'load_data': lambda: load_data(almacen),
+        'indice_acumulado': lambda: IndiceAcumulado(cargado),
+        'acumulado_anual': lambda: resumen_periodo(cargado, year, 'Diciembre', indice=indice, centro=centro),
+        'acumulado_consolidado': lambda: resumen_periodo(cargado, year, 'Diciembre', preparar_anio(cargado, year), indice),
+        'alertas': lambda: alertas(cargado, indice, METAS),
+        'to_excel': lambda: to_excel(cargado),
+        'pdf': pdf,
+    }
+
+def comparar(resultados, base, tolerancia, minimo_ms):
+    filas, regresiones = [], []
+    for nombre, r in resultados['casos'].items():
+        b = base.get('casos', {}).get(nombre)
+        if b is None: filas.append((nombre, r['min_ms'], None, None, "nuevo")); continue
+        delta = r['min_ms'] / b['min_ms'] - 1 if b['min_ms'] else 0.0
+        regresion = delta > tolerancia and r['min_ms'] - b['min_ms'] > minimo_ms
+        if regresion: regresiones.append(nombre)
+        filas.append((nombre, r['min_ms'], b['min_ms'], delta, "REGRESIÓN" if regresion else "mejora" if delta < -tolerancia else "ok"))
+    return filas, regresiones
+
+def main():
+    ap = argparse.ArgumentParser(description="Suite de benchmarks con comparación contra línea base")
+    ap.add_argument('--centros', type=int, default=5); ap.add_argument('--anios', type=int, default=10)
+    ap.add_argument('--repeticiones', type=int, default=7)
+    ap.add_argument('--casos', nargs='+', help="Solo estos casos (por defecto todos)")
+    ap.add_argument('-o', '--output', help="Guarda los resultados en este JSON")
+    ap.add_argument('--base', default=BASELINE, help="Línea base a comparar")
+    ap.add_argument('--guardar-base', action='store_true', help="Escribe los resultados como nueva línea base")
+    ap.add_argument('--tolerancia', type=float, default=0.3, help="Aumento relativo tolerado (0.3 = 30%%)")
+    ap.add_argument('--minimo-ms', type=float, default=2.0, help="Diferencia absoluta mínima para contar como regresión")
+    args = ap.parse_args()
+
+    df = generar_base(args.centros, args.anios)
+    resultados = {'meta': {'filas': len(df), 'centros': args.centros, 'anios': args.anios, 'python': platform.python_version(),
+                           'pandas': pd.__version__, 'maquina': platform.machine(), 'cpus': os.cpu_count(),
+                           'fecha': time.strftime('%Y-%m-%dT%H:%M:%S')},
+                  'casos': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for nombre, fn in casos(df, tmp).items():
+            if args.casos and nombre not in args.casos: continue
+            resultados['casos'][nombre] = r = medir(fn, args.repeticiones)
+            print(f"  {nombre:<24}{r['mediana_ms']:>10.1f} ms", file=sys.stderr, flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: json.dump(resultados, f, indent=2, ensure_ascii=False)
+    if args.guardar_base:
+        with open(args.base, "w", encoding="utf-8") as f: json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {args.base}"); return 0
+    if not os.path.exists(args.base):
+        print("Sin línea base (use --guardar-base)"); return 0
+    with open(args.base, encoding="utf-8") as f: base = json.load(f)
+    if base.get('meta', {}).get('filas') != len(df):
+        print(f"Aviso: la línea base se midió con {base['meta'].get('filas')} filas; ahora {len(df)}")
+    filas, regresiones = comparar(resultados, base, args.tolerancia, args.minimo_ms)
+    print(f"{'caso (mín.)':<24} {'actual ms':>10} {'base ms':>10} {'cambio':>8}  estado")
+    for nombre, actual, b, delta, estado in filas:
+        print(f"{nombre:<24} {actual:>10.1f} {b if b is not None else float('nan'):>10.1f} "
+              f"{(f'{delta:+.0%}' if delta is not None else '-'):>8}  {estado}")
+    if regresiones: print(f"{len(regresiones)} regresión(es): {', '.join(regresiones)}")
+    return 1 if regresiones else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
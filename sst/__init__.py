@@ -0,0 +1,44 @@
+# --- NÚCLEO SST (SIN STREAMLIT) ---
+# Los submódulos se importan al primer uso (PEP 562), así `import sst` no carga
+# pandas, fpdf ni matplotlib y puede usarse desde lotes, CLI o pruebas.
+
+import importlib
+
+_EXPORTS = {
+    'CSV_FILE': 'sst.schema', 'DB_FILE': 'sst.schema', 'LOGO_FILE': 'sst.schema', 'MESES_ORDEN': 'sst.schema',
+    'COLOR_PRIMARY': 'sst.schema', 'COLOR_SECONDARY': 'sst.schema',
+    'get_structure_for_year': 'sst.schema', 'inicializar_db_completa': 'sst.schema', 'mes_idx': 'sst.schema',
+    'version_datos': 'sst.schema', 'version_incremental': 'sst.schema',
+    'procesar_datos': 'sst.kpi', 'calcular_derivados': 'sst.kpi', 'preparar_anio': 'sst.kpi', 'calcular_acumulado': 'sst.kpi',
+    'calcular_gestion': 'sst.kpi', 'resumen_periodo': 'sst.kpi',
+    'IndiceAcumulado': 'sst.agregados', 'ventanas_moviles': 'sst.agregados', 'RegistroCambios': 'sst.incremental',
+    'load_data': 'sst.storage', 'save_data': 'sst.storage', 'abrir_almacen': 'sst.storage',
+    'AlmacenCSV': 'sst.storage', 'AlmacenSQLite': 'sst.storage', 'migrar_csv': 'sst.storage',
+    'cargar_compartido': 'sst.compartido', 'firma_almacen': 'sst.compartido',
+    'to_excel': 'sst.excel', 'excel_cacheado': 'sst.excel',
+    'generar_insight_automatico': 'sst.insights',
+    'PDF_SST': 'sst.pdf', 'generar_reporte_pdf': 'sst.pdf',
+    'generar_lote_zip': 'sst.lote', 'trabajos_lote': 'sst.lote',
+    'CENTRO_DEFECTO': 'sst.schema', 'CONSOLIDADO': 'sst.schema', 'consolidar': 'sst.kpi', 'centros': 'sst.kpi', 'AlmacenParquet': 'sst.storage',
+    'ConflictoVersion': 'sst.storage', 'COL_VERSION': 'sst.schema',
+    'RegistroEventos': 'sst.eventos', 'registrar': 'sst.eventos', 'abrir_registro': 'sst.eventos',
+    'generar_base': 'sst.sintetico',
+    'importar': 'sst.importacion', 'preparar_importacion': 'sst.importacion', 'aplicar_importacion': 'sst.importacion',
+    'tramo': 'sst.medicion', 'medido': 'sst.medicion',
+    'compactar': 'sst.compacto', 'expandir': 'sst.compacto', 'Observaciones': 'sst.compacto',
+    'alertas': 'sst.alertas', 'evaluar': 'sst.alertas', 'REGLAS': 'sst.alertas',
+    'ColaInformes': 'sst.cola', 'cola_informes': 'sst.cola',
+    'Historial': 'sst.historial', 'abrir_historial': 'sst.historial', 'restaurar': 'sst.historial', 'regenerar_informe': 'sst.historial',
+    'ApiKPI': 'sst.api', 'crear_servidor': 'sst.api', 'servir': 'sst.api',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS: raise AttributeError(f"module 'sst' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
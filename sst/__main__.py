@@ -0,0 +1,293 @@
+import argparse
+import sys
+
+from sst.schema import CSV_FILE, DB_FILE, LOGO_FILE, MESES_ORDEN
+
+# --- CLI ---
+# python -m sst kpis --anio 2025 --mes Marzo [--centro Aserradero]
+# python -m sst reporte --anio 2025 --mes Marzo -o reporte.pdf
+# python -m sst lote --anios 2024 2025 -o reportes.zip
+# python -m sst exportar --streaming -o base.xlsx
+# python -m sst ventanas --meses 36 --desde 2023 -o tendencia.csv
+# python -m sst alertas --anio 2025 --nivel critica alta -o alertas.csv
+# python -m sst eventos cargar accidentes.csv --centro Aserradero
+# python -m sst historial estado --fecha 2025-04-01 -o base_abril.csv
+# python -m sst api --puerto 8502   (GET /api/kpi/2025/marzo?centro=Aserradero)
+# SST_PERF=1 python -m sst lote -o reportes.zip && python -m sst tiempos
+
+def _cargar(args):
+    # Con --centro solo se lee ese centro; sin él, todos (consolidado)
+    from sst.kpi import procesar_datos
+    from sst.storage import abrir_almacen, load_data
+    return procesar_datos(load_data(abrir_almacen(args.almacen), getattr(args, 'centro', None)), args.factor)
+
+def cmd_kpis(args):
+    from sst.kpi import resumen_periodo
+    row_mes, acum, gestion = resumen_periodo(_cargar(args), args.anio, args.mes, centro=args.centro)
+    print(f"CENTRO: {row_mes['Centro']}  PERIODO: {args.mes.upper()} {args.anio}")
+    for k in ['Tasa Acc.', 'Tasa Sin.', 'Indice Frec.', 'Indice Grav.', 'HHT']:
+        print(f"  {k + ' (mes)':<24}{row_mes[k]:>14.2f}")
+    for k, v in {**acum, **gestion}.items():
+        print(f"  {k:<24}{float(v):>14.2f}")
+
+def cmd_reporte(args):
+    from sst.historial import registrar_informe
+    from sst.kpi import resumen_periodo
+    from sst.pdf import generar_reporte_pdf
+    from sst.storage import ConflictoVersion, abrir_almacen
+    df = _cargar(args)
+    row_mes, acum, gestion = resumen_periodo(df, args.anio, args.mes, centro=args.centro)
+    metas = {'meta_ta': args.meta_ta, 'meta_gestion': args.meta_gestion}
+    out = generar_reporte_pdf(row_mes, acum, gestion, metas, args.mes, args.anio, logo_file=args.logo, vectorial=args.vectorial,
+                              centro=row_mes['Centro'])
+    # Se registra con el PDF ya generado, verificando que las filas leídas sean las de la última instantánea
+    try: iid = registrar_informe(args.centro, args.anio, args.mes, metas, args.factor, abrir_almacen(args.almacen), datos=df)
+    except ConflictoVersion as e: print(f"Error: {e}; vuelva a generar el informe"); return 1
+    with open(args.output or f"Reporte_SST_{args.mes}.pdf", "wb") as f: f.write(out)
+    if iid is not None: print(f"Informe registrado en el historial (id {iid})")
+
+def cmd_ventanas(args):
+    # Indicadores de todas las ventanas móviles de N meses (cruzan el cambio de año)
+    from sst.agregados import IndiceAcumulado
+    v = IndiceAcumulado(_cargar(args)).ventanas(args.meses, args.centro)
+    if args.desde: v = v[v['Año'] >= args.desde]
+    if args.output: v.to_csv(args.output, index=False); print(f"{len(v)} ventanas en {args.output}"); return
+    cols = ['Año', 'Mes', 'Meses', 'avg_masa', 'sum_acc', 'ta_acum', 'ts_acum', 'if_acum', 'ig_acum']
+    print(v[cols].round(2).to_string(index=False))
+
+def cmd_alertas(args):
+    # Todas las reglas sobre todos los centros y meses (sst.alertas)
+    from sst.agregados import IndiceAcumulado
+    from sst.alertas import alertas
+    df = _cargar(args)
+    a = alertas(df, IndiceAcumulado(df), {'meta_ta': args.meta_ta, 'meta_gestion': args.meta_gestion})
+    if args.anio: a = a[a['Año'] == args.anio]
+    if args.mes: a = a[a['Mes'] == args.mes]
+    if args.nivel: a = a[a['Nivel'].isin(args.nivel)]
+    if args.output: a.to_csv(args.output, index=False); print(f"{len(a)} alertas en {args.output}"); return
+    print(a[['Centro', 'Año', 'Mes', 'Nivel', 'Mensaje']].to_string(index=False) if len(a) else "Sin alertas.")
+
+def cmd_exportar(args):
+    from sst.excel import to_excel, to_excel_streaming
+    df = _cargar(args)
+    if args.output.lower().endswith('.csv'): df.to_csv(args.output, index=False)
+    elif args.streaming: to_excel_streaming(df, args.output)
+    else:
+        with open(args.output, "wb") as f: f.write(to_excel(df))
+
+def cmd_lote(args):
+    from sst.lote import generar_lote_zip, trabajos_lote
+    df = _cargar(args)
+    trabajos = trabajos_lote(df, set(args.anios) if args.anios else None, args.centro)
+    metas = {'meta_ta': args.meta_ta, 'meta_gestion': args.meta_gestion}
+    def progreso(hechos, total, year, month, error):
+        print(f"[{hechos}/{total}] {month} {year}" + (f"  ERROR {error}" if error else ""), flush=True)
+    ok, errores = generar_lote_zip(df, args.output, trabajos, metas, args.logo, args.vectorial, args.procesos, progreso, args.centro)
+    print(f"{ok} informes en {args.output}" + (f", {len(errores)} con error" if errores else ""))
+    return 1 if errores else 0
+
+def cmd_migrar(args):
+    from sst.storage import migrar_csv
+    destino = migrar_csv(args.csv, args.db)
+    print(f"Base SQLite: {destino.path}")
+
+def cmd_importar(args):
+    from sst.importacion import errores_csv, importar
+    from sst.storage import abrir_almacen
+    r = importar(args.archivo, abrir_almacen(args.almacen), centro=args.centro, factor_base=args.factor, tamano=args.bloque)
+    print(f"{r['filas_leidas']} filas leídas | {r['filas_validas']} válidas | {r['filas_con_error']} con error")
+    print(f"{r['meses']} meses importados ({r['filas_escritas']} filas escritas)")
+    for fila, col, msg in r['errores'][:20]: print(f"  fila {fila} [{col}]: {msg}")
+    if args.errores and r['errores']:
+        with open(args.errores, 'wb') as f: f.write(errores_csv(r))
+        print(f"Detalle de errores: {args.errores}")
+    return 1 if r['filas_con_error'] and not r['filas_validas'] else 0
+
+def cmd_eventos(args):
+    import pandas as pd
+    from sst.eventos import abrir_registro, recalcular, registrar
+    from sst.storage import abrir_almacen
+    almacen = abrir_almacen(args.almacen)
+    if args.accion == 'listar':
+        ev = abrir_registro(almacen).cargar(args.anio, centro=args.centro)
+        print(ev.drop(columns=['Año', 'Mes']).to_string(index=False) if not ev.empty else "Sin eventos")
+    elif args.accion == 'cargar':
+        nuevos = pd.read_csv(args.archivo, sep=None, engine='python', dtype=str)
+        if args.centro: nuevos['Centro'] = nuevos['Centro'].fillna(args.centro) if 'Centro' in nuevos else args.centro
+        ids, meses = registrar(almacen, nuevos=nuevos, factor_base=args.factor)
+        print(f"{len(ids)} eventos registrados; {len(meses)} meses recalculados")
+    elif args.accion == 'borrar':
+        _, meses = registrar(almacen, borrar=args.ids, factor_base=args.factor)
+        print(f"{len(args.ids)} eventos borrados; {len(meses)} meses recalculados")
+    else: print(f"{recalcular(almacen, args.factor)} meses recalculados desde el registro de eventos")
+
+def cmd_historial(args):
+    # Instantáneas de la base (sst.historial): auditoría, estado en el pasado, restauración e informes emitidos
+    from sst.historial import abrir_historial, regenerar_informe, restaurar
+    from sst.storage import abrir_almacen
+    almacen = abrir_almacen(args.almacen)
+    hist = abrir_historial(almacen)
+    try:
+        if args.accion == 'listar':
+            df = hist.instantaneas()
+            print(df.to_string(index=False) if not df.empty else "Sin instantáneas")
+        elif args.accion == 'cambios':
+            df = hist.cambios(args.centro, args.anio, args.mes, args.columna)
+            if args.output: df.to_csv(args.output, index=False); print(f"{len(df)} cambios en {args.output}"); return
+            print(df.head(args.limite).to_string(index=False) if not df.empty else "Sin cambios")
+        elif args.accion == 'estado':
+            df = hist.estado(args.instantanea, args.fecha)
+            if args.output: df.to_csv(args.output, index=False, encoding='utf-8-sig'); print(f"{len(df)} filas en {args.output}")
+            else: print(df.to_string(index=False))
+        elif args.accion == 'restaurar':
+            df = restaurar(args.instantanea, almacen, args.factor)
+            print(f"Base restaurada a la instantánea {args.instantanea} ({len(df)} filas; instantánea nueva {hist.ultima()})")
+        elif args.accion == 'informes':
+            df = hist.informes()
+            print(df.to_string(index=False) if not df.empty else "Sin informes emitidos")
+        elif args.accion == 'informe':
+            out = regenerar_informe(args.id, almacen)
+            with open(args.output or f"Reporte_SST_{args.id}.pdf", "wb") as f: f.write(out)
+        else:
+            sid = hist.compactar(args.antes_de)
+            print(f"Checkpoint en la instantánea {sid}" if sid else "Sin instantáneas")
+    except ValueError as e:
+        print(f"Error: {e}"); return 1
+
+def cmd_api(args):
+    # API HTTP/JSON de solo lectura (sst.api)
+    from sst.api import servir
+    from sst.storage import abrir_almacen
+    servir(args.host, args.puerto, abrir_almacen(args.almacen), args.factor, args.verbose)
+
+def cmd_sintetico(args):
+    from sst.sintetico import generar_base
+    from sst.storage import abrir_almacen, save_data
+    almacen = abrir_almacen(args.almacen)
+    if almacen.existe() and not args.reemplazar: print(f"{almacen.path} ya existe (use --reemplazar)"); return 1
+    df = save_data(generar_base(args.centros, args.anios, args.desde, args.semilla, args.factor), args.factor, almacen)
+    print(f"{len(df)} filas sintéticas ({args.centros} centros x {args.anios} años) en {almacen.path}")
+
+def cmd_tiempos(args):
+    # Percentiles por tramo del registro JSON de sst.medicion (app y CLI con SST_PERF=1)
+    import os
+    from sst.medicion import LOG, leer_log, percentiles
+    path = args.archivo or LOG
+    if not os.path.exists(path): print(f"No existe {path} (active la medición con SST_PERF=1)"); return 1
+    df = leer_log(path)
+    if args.tipo: df = df[df['tipo'] == args.tipo]
+    print(f"{len(df)} tramos, {df['ejecucion'].nunique()} ejecuciones en {path}")
+    print(percentiles(df).to_string(index=False))
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="python -m sst", description="Indicadores SST DS67 sin interfaz")
+    ap.add_argument('--almacen', help=f"Base de datos (.db SQLite, carpeta .parquet o .csv); por defecto {DB_FILE}")
+    ap.add_argument('--factor', type=float, default=210, help="Horas base por trabajador (HHT)")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+
+    p = sub.add_parser('kpis', help="Indicadores del mes y acumulados")
+    p.add_argument('--anio', type=int, required=True); p.add_argument('--mes', choices=MESES_ORDEN, required=True)
+    p.add_argument('--centro', help="Centro de trabajo (por defecto, consolidado de todos)")
+    p.set_defaults(func=cmd_kpis)
+
+    p = sub.add_parser('reporte', help="Genera el informe ejecutivo PDF")
+    p.add_argument('--anio', type=int, required=True); p.add_argument('--mes', choices=MESES_ORDEN, required=True)
+    p.add_argument('--meta-ta', type=float, default=3.0); p.add_argument('--meta-gestion', type=float, default=90)
+    p.add_argument('--logo', default=LOGO_FILE); p.add_argument('-o', '--output')
+    p.add_argument('--vectorial', action='store_true', help="Gráficos vectoriales (sin matplotlib)")
+    p.add_argument('--centro', help="Centro de trabajo (por defecto, consolidado de todos)")
+    p.set_defaults(func=cmd_reporte)
+
+    p = sub.add_parser('ventanas', help="TA/TS/IF/IG móviles de N meses para toda la serie (12, 24, 36...)")
+    p.add_argument('--meses', type=int, default=12); p.add_argument('--desde', type=int, help="Primer año a mostrar")
+    p.add_argument('--centro', help="Centro de trabajo (por defecto, consolidado de todos)")
+    p.add_argument('-o', '--output', help="Guarda todas las ventanas en este CSV")
+    p.set_defaults(func=cmd_ventanas)
+
+    p = sub.add_parser('alertas', help="Alertas de todas las reglas para todos los centros y meses")
+    p.add_argument('--anio', type=int); p.add_argument('--mes', choices=MESES_ORDEN)
+    p.add_argument('--centro', help="Solo este centro de trabajo")
+    p.add_argument('--nivel', nargs='+', choices=['critica', 'alta', 'media', 'datos', 'info'])
+    p.add_argument('--meta-ta', type=float, default=3.0); p.add_argument('--meta-gestion', type=float, default=90)
+    p.add_argument('-o', '--output', help="Guarda las alertas en este CSV")
+    p.set_defaults(func=cmd_alertas)
+
+    p = sub.add_parser('lote', help="Genera todos los informes mensuales en un ZIP (en paralelo)")
+    p.add_argument('--anios', type=int, nargs='*', help="Años a incluir (por defecto todos)")
+    p.add_argument('--procesos', type=int, help="Procesos en paralelo (por defecto, núcleos disponibles)")
+    p.add_argument('--meta-ta', type=float, default=3.0); p.add_argument('--meta-gestion', type=float, default=90)
+    p.add_argument('--logo', default=LOGO_FILE); p.add_argument('--vectorial', action='store_true')
+    p.add_argument('-o', '--output', default="Reportes_SST.zip")
+    p.add_argument('--centro', help="Centro de trabajo (por defecto, consolidado de todos)")
+    p.set_defaults(func=cmd_lote)
+
+    p = sub.add_parser('migrar', help="Migración única del CSV histórico a SQLite")
+    p.add_argument('--csv', default=CSV_FILE); p.add_argument('--db', default=DB_FILE)
+    p.set_defaults(func=cmd_migrar)
+
+    p = sub.add_parser('importar', help="Importa una exportación Excel/CSV (mutual, RR.HH.) por bloques, con validación")
+    p.add_argument('archivo')
+    p.add_argument('--centro', help="Centro de trabajo para las filas que no traen uno")
+    p.add_argument('--errores', help="Guarda el detalle de filas rechazadas en este CSV")
+    p.add_argument('--bloque', type=int, default=50_000, help="Filas leídas por bloque (memoria acotada)")
+    p.set_defaults(func=cmd_importar)
+
+    p = sub.add_parser('eventos', help="Registro de accidentes y enfermedades profesionales (un evento por fila)")
+    acc = p.add_subparsers(dest='accion', required=True)
+    q = acc.add_parser('listar'); q.add_argument('--anio', type=int); q.add_argument('--centro')
+    q = acc.add_parser('cargar', help="CSV con Fecha, Tipo, Trabajador, Días Perdidos, Días Cargo, Descripción[, Centro]")
+    q.add_argument('archivo'); q.add_argument('--centro', help="Centro para los eventos que no traen uno")
+    q = acc.add_parser('borrar'); q.add_argument('ids', type=int, nargs='+')
+    acc.add_parser('recalcular', help="Reconstruye las columnas mensuales de todos los meses con eventos")
+    p.set_defaults(func=cmd_eventos)
+
+    p = sub.add_parser('historial', help="Instantáneas de la base: cambios por celda, estado en el pasado, restaurar, informes emitidos")
+    acc = p.add_subparsers(dest='accion', required=True)
+    acc.add_parser('listar', help="Instantáneas registradas (fecha, usuario, motivo, celdas cambiadas)")
+    q = acc.add_parser('cambios', help="Cambios por celda, más recientes primero")
+    q.add_argument('--centro'); q.add_argument('--anio', type=int); q.add_argument('--mes', choices=MESES_ORDEN)
+    q.add_argument('--columna'); q.add_argument('--limite', type=int, default=50); q.add_argument('-o', '--output')
+    q = acc.add_parser('estado', help="Base completa tal como estaba en una instantánea o fecha")
+    g = q.add_mutually_exclusive_group(); g.add_argument('--instantanea', type=int); g.add_argument('--fecha', help="AAAA-MM-DD[ HH:MM]")
+    q.add_argument('-o', '--output', help="CSV de salida")
+    q = acc.add_parser('restaurar', help="Vuelve la base a una instantánea (queda registrado como instantánea nueva)")
+    q.add_argument('instantanea', type=int)
+    acc.add_parser('informes', help="Informes emitidos (período, metas, factor e instantánea)")
+    q = acc.add_parser('informe', help="Regenera un informe emitido tal como se emitió")
+    q.add_argument('id', type=int); q.add_argument('-o', '--output')
+    q = acc.add_parser('compactar', help="Checkpoint en la última instantánea; con --antes-de descarta lo anterior")
+    q.add_argument('--antes-de', type=int)
+    p.set_defaults(func=cmd_historial)
+
+    p = sub.add_parser('api', help="Servidor HTTP/JSON de solo lectura con los indicadores (ERP, pantallas, planillas)")
+    p.add_argument('--host', default="127.0.0.1", help="Interfaz (0.0.0.0 para aceptar conexiones de la red)")
+    p.add_argument('--puerto', type=int, default=8502)
+    p.add_argument('--verbose', action='store_true', help="Registra cada petición en la consola")
+    p.set_defaults(func=cmd_api)
+
+    p = sub.add_parser('sintetico', help="Genera una base de prueba con datos sintéticos (benchmarks, demos)")
+    p.add_argument('--centros', type=int, default=3); p.add_argument('--anios', type=int, default=5)
+    p.add_argument('--desde', type=int, default=2020); p.add_argument('--semilla', type=int, default=0)
+    p.add_argument('--reemplazar', action='store_true', help="Sobrescribe la base si ya existe")
+    p.set_defaults(func=cmd_sintetico)
+
+    p = sub.add_parser('exportar', help="Exporta la base completa a Excel (o CSV si -o termina en .csv)")
+    p.add_argument('-o', '--output', default="Base_SST_Completa.xlsx")
+    p.add_argument('--streaming', action='store_true', help="Escritura fila a fila (bajo consumo de memoria)")
+    p.set_defaults(func=cmd_exportar)
+
+    p = sub.add_parser('tiempos', help="Resumen (p50/p95/p99) del registro de tiempos por tramo")
+    p.add_argument('archivo', nargs='?', help="Registro JSON (por defecto SST_PERF_LOG o sst_tiempos.jsonl)")
+    p.add_argument('--tipo', help="Solo ejecuciones de este tipo (app, fragmento, cli:lote, ...)")
+    p.set_defaults(func=cmd_tiempos)
+    return ap
+
+def main(argv=None):
+    from sst import medicion
+    args = build_parser().parse_args(argv)
+    medicion.iniciar_ejecucion(f"cli:{args.cmd}")
+    try: return args.func(args)
+    finally: medicion.terminar_ejecucion()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+from sst.medicion import medido
+from sst.schema import CENTRO_DEFECTO, MES_IDX as _MES_IDX, MESES_ORDEN
+
+# --- ÍNDICE DE ACUMULADOS ANUALES ---
+# Se construye una vez por versión de datos: sumas acumuladas por (centro, año, mes)
+# y los indicadores derivados ya calculados, así cualquier mes de corte es una
+# sola consulta. Editar un mes solo re-acumula ese año desde ese mes. El
+# consolidado de un año suma los meses de todos los centros antes de acumular
+# (la masa laboral consolidada del mes es la suma de las masas de cada centro).
+
+SUMAS = {
+    'sum_acc': 'Accidentes CTP', 'sum_fatales': 'Accidentes Fatales', 'sum_ep': 'Enf. Profesionales',
+    'sum_dias_acc': 'Días Perdidos', 'sum_dias_ep': 'Días Perdidos EP', 'sum_pensionados': 'Pensionados',
+    'sum_indemnizados': 'Indemnizados', 'sum_hht': 'HHT', 'sum_dias_cargo': 'Días Cargo',
+}
+_MENSUAL = list(SUMAS) + ['masa']
+_CLAVES = list(SUMAS) + ['masa_ok_sum', 'masa_ok_n']
+
+def _valores_mensuales(df):
+    # Matriz (filas, _MENSUAL) con lo que aporta cada fila a su mes
+    return np.column_stack([df[c].to_numpy(dtype='float64') for c in SUMAS.values()] +
+                           [df['Masa Laboral'].to_numpy(dtype='float64')])
+
+def _aportes(mensual):
+    # (meses, _MENSUAL) -> (meses, _CLAVES): el promedio de masa solo cuenta meses con masa > 0
+    masa = mensual[:, -1]
+    return np.column_stack([mensual[:, :-1], np.where(masa > 0, masa, 0.0), (masa > 0).astype('float64')])
+
+def _derivados(acum):
+    # acum: (..., claves) -> indicadores DS67 acumulados, mismas reglas que calcular_acumulado
+    k = {c: acum[..., i] for i, c in enumerate(_CLAVES)}
+    n = k['masa_ok_n']; hht = k['sum_hht']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_masa = np.where(n > 0, k['masa_ok_sum'] / n, 0.0)
+        ok_m = avg_masa > 0; ok_h = hht > 0
+        return {
+            'avg_masa': avg_masa,
+            'ta_acum': np.where(ok_m, k['sum_acc'] / avg_masa * 100, 0.0),
+            'ts_acum': np.where(ok_m, k['sum_dias_acc'] / avg_masa * 100, 0.0),
+            'if_acum': np.where(ok_h, k['sum_acc'] * 1000000 / hht, 0.0),
+            'ig_acum': np.where(ok_h, (k['sum_dias_acc'] + k['sum_dias_cargo']) * 1000000 / hht, 0.0),
+        }
+
+def _tabla_vacia():
+    return {'mensual': np.zeros((12, len(_MENSUAL)))}
+
+class IndiceAcumulado:
+    @medido('agregados.indice')
+    def __init__(self, df):
+        self.anios = {}       # (centro, año) -> tabla
+        self.filas_mes = {}   # (centro, año, idx_mes) -> etiquetas de df, para actualizar sin filtrar la tabla
+        self._consolidado = {}
+        self._ventanas = {}   # (meses, centro) -> DataFrame de ventanas móviles
+        midx = df['Mes'].map(_MES_IDX)
+        validos = midx.notna().to_numpy()
+        if not validos.any(): return
+        vals = _valores_mensuales(df[validos])
+        claves = pd.MultiIndex.from_arrays([self._centros(df).to_numpy()[validos], df['Año'].to_numpy()[validos],
+                                            midx.to_numpy()[validos].astype(int)])
+        self.filas_mes = {(c, int(y), int(m)): list(g) for (c, y, m), g in pd.Series(df.index[validos], index=claves).groupby(level=[0, 1, 2])}
+        mensual = pd.DataFrame(vals, index=claves).groupby(level=[0, 1, 2]).sum()
+        for (centro, year), bloque in mensual.groupby(level=[0, 1]):
+            tabla = _tabla_vacia()
+            tabla['mensual'][bloque.index.get_level_values(2)] = bloque.to_numpy()
+            self.anios[(centro, int(year))] = self._acumular(tabla)
+
+    @staticmethod
+    def _centros(df):
+        return df['Centro'] if 'Centro' in df.columns else pd.Series(CENTRO_DEFECTO, index=df.index)
+
+    def _acumular(self, tabla, desde=0):
+        if 'acum' not in tabla: desde = 0
+        aportes = _aportes(tabla['mensual'][desde:])
+        if desde == 0:
+            tabla['acum'] = np.cumsum(aportes, axis=0)
+        else:
+            tabla['acum'][desde:] = tabla['acum'][desde - 1] + np.cumsum(aportes, axis=0)
+        tabla['derivados'] = _derivados(tabla['acum'])
+        return tabla
+
+    def centros(self):
+        return sorted({c for c, _ in self.anios})
+
+    def tabla(self):
+        # Todos los (centro, año, mes) del índice con sus indicadores acumulados del año, en una tabla
+        claves = list(self.anios)
+        if not claves: return pd.DataFrame(columns=['Centro', 'Año', 'Mes', 'avg_masa', 'ta_acum', 'ts_acum', 'if_acum', 'ig_acum'])
+        out = pd.DataFrame({'Centro': np.repeat([str(c) for c, _ in claves], 12), 'Año': np.repeat([y for _, y in claves], 12),
+                            'Mes': np.tile(MESES_ORDEN, len(claves))})
+        for k in self.anios[claves[0]]['derivados']:
+            out[k] = np.concatenate([self.anios[c]['derivados'][k] for c in claves])
+        return out
+
+    def _tabla(self, year, centro):
+        if centro is not None: return self.anios.get((centro, year))
+        if year not in self._consolidado:
+            tablas = [t['mensual'] for (c, y), t in self.anios.items() if y == year]
+            self._consolidado[year] = self._acumular({'mensual': np.sum(tablas, axis=0)}) if tablas else None
+        return self._consolidado[year]
+
+    def consultar(self, year, month, centro=None):
+        # Mismo diccionario que calcular_acumulado() para el corte year/month (centro=None: consolidado)
+        tabla = self._tabla(int(year), centro)
+        i = _MES_IDX[month]
+        if tabla is None: return {**{k: 0.0 for k in SUMAS}, **{k: 0.0 for k in ['avg_masa', 'ta_acum', 'ts_acum', 'if_acum', 'ig_acum']}}
+        fila = tabla['acum'][i]
+        out = {k: float(fila[j]) for j, k in enumerate(SUMAS)}
+        out.update({k: float(v[i]) for k, v in tabla['derivados'].items()})
+        return out
+
+    def _recalcular_mes(self, df, centro, year, i):
+        tabla = self.anios.setdefault((centro, year), _tabla_vacia())
+        tabla['mensual'][i] = _valores_mensuales(df.loc[self.filas_mes.get((centro, year, i), [])]).sum(axis=0)
+        self._consolidado.pop(year, None); self._ventanas.clear()
+        return tabla
+
+    def actualizar_filas(self, df, filas):
+        # Filas editadas o nuevas: recalcula sus meses y re-acumula cada año desde el primer mes tocado
+        desde = {}; tocados = set()
+        parte = df.loc[list(filas)]
+        for idx, centro, year, month in zip(parte.index, self._centros(parte), parte['Año'], parte['Mes']):
+            if month not in _MES_IDX: continue
+            clave = (centro, int(year), _MES_IDX[month])
+            lista = self.filas_mes.setdefault(clave, [])
+            if idx not in lista: lista.append(idx)
+            desde[clave[:2]] = min(desde.get(clave[:2], 12), clave[2]); tocados.add(clave)
+        for clave in tocados: self._recalcular_mes(df, *clave)
+        for clave, i in desde.items():
+            tabla = self.anios[clave]
+            self._acumular(tabla, i if 'acum' in tabla else 0)
+
+    def actualizar_mes(self, df, year, month, centro=CENTRO_DEFECTO):
+        # Recalcula solo (centro, year, month) y re-acumula ese año desde ese mes
+        year = int(year); i = _MES_IDX[month]
+        if (centro, year, i) not in self.filas_mes:
+            self.filas_mes[(centro, year, i)] = list(df.index[(self._centros(df) == centro) & (df['Año'] == year) & (df['Mes'] == month)])
+        tabla = self._recalcular_mes(df, centro, year, i)
+        self._acumular(tabla, i if 'acum' in tabla else 0)
+
+    # Ventanas móviles: la serie mensual continua (todos los años del centro, o la suma de centros) se
+    # acumula una vez; la suma de cualquier ventana de N meses es la resta de dos
+    # filas del acumulado, así todas las ventanas salen en una sola pasada, crucen o no
+    # el cambio de año. Los indicadores usan las mismas reglas que el acumulado anual.
+
+    def _serie(self, centro=None):
+        # (años, matriz (12 * años, _MENSUAL)); los años sin datos quedan en cero
+        anios = [y for c, y in self.anios if centro is None or c == centro]
+        if not anios: return range(0), np.zeros((0, len(_MENSUAL)))
+        rango = range(min(anios), max(anios) + 1)
+        mensual = np.zeros((len(rango) * 12, len(_MENSUAL)))
+        for (c, y), tabla in self.anios.items():
+            if centro is None or c == centro: mensual[(y - rango.start) * 12:(y - rango.start + 1) * 12] += tabla['mensual']
+        return rango, mensual
+
+    def ventanas(self, meses=12, centro=None):
+        # Una fila por mes de término: sumas e indicadores de los `meses` meses que
+        # terminan ahí. 'Meses' < meses en el arranque de la serie (Completa=False)
+        clave = (meses, centro)
+        if clave not in self._ventanas: self._ventanas[clave] = _ventanas(*self._serie(centro), meses)
+        return self._ventanas[clave]
+
+    def ventana(self, year, month, meses=12, centro=None):
+        # Mismo diccionario que consultar() para la ventana que termina en year/month
+        v = self.ventanas(meses, centro)
+        fila = v[(v['Año'] == int(year)) & (v['Mes'] == month)]
+        claves = list(SUMAS) + ['avg_masa', 'ta_acum', 'ts_acum', 'if_acum', 'ig_acum']
+        return {k: float(fila[k].iloc[0]) if len(fila) else 0.0 for k in claves}
+
+def _ventanas(rango, mensual, meses):
+    n = len(mensual)
+    acum = np.vstack([np.zeros((1, len(_CLAVES))), np.cumsum(_aportes(mensual), axis=0)])
+    fin = np.arange(1, n + 1); inicio = np.maximum(fin - meses, 0)
+    # Redondeo: la resta de acumulados deja residuos de punto flotante en ventanas en cero
+    sumas = np.round(acum[fin] - acum[inicio], 9)
+    out = pd.DataFrame({'Año': np.repeat(np.array(rango, dtype='int64'), 12), 'Mes': np.tile(MESES_ORDEN, len(rango)),
+                        'Meses': fin - inicio, 'Completa': fin - inicio == meses})
+    for j, k in enumerate(SUMAS): out[k] = sumas[:, j]
+    for k, v in _derivados(sumas).items(): out[k] = v
+    return out
+
+def ventanas_moviles(df, meses=12, centro=None):
+    # Ventanas de `meses` meses sobre toda la serie de df (centro=None: consolidado)
+    return IndiceAcumulado(df).ventanas(meses, centro)
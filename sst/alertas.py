@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from sst.medicion import medido
+from sst.schema import MES_IDX, MESES_ORDEN, METAS_DEFECTO
+
+# --- MOTOR DE ALERTAS ---
+# Reglas declarativas evaluadas de una vez sobre todos los (centro, año, mes): cada regla
+# es una condición de DataFrame.eval sobre la tabla de indicadores (columnas del mes,
+# acumulados del año y % de gestión; metas como @variables) y un mensaje con {valor} y
+# {umbral}. El mismo motor arma el análisis del tablero y del PDF (una sola fila) y la
+# tabla de alertas de toda la cartera, cacheada por versión de datos y metas.
+#
+#   si:      condición (columnas con espacios o puntos entre `comillas invertidas`)
+#   valor:   columna que se informa; umbral: meta (clave de metas) del mensaje
+
+NIVELES = {  # orden de gravedad: icono y rótulo
+    'critica': ("⛔", "CRÍTICO"), 'alta': ("⚠️", "ALERTA"), 'media': ("🔸", "PRECAUCIÓN"),
+    'datos': ("🔎", "REVISAR DATOS"), 'info': ("🚑", "INFORMACIÓN"), 'ok': ("✅", "EXCELENTE"),
+}
+
+REGLAS = [
+    {'id': 'ta_meta', 'nivel': 'alta', 'si': "ta_acum > @meta_ta", 'valor': 'ta_acum', 'umbral': 'meta_ta',
+     'mensaje': "Tasa Acumulada ({valor:.2f}%) excede meta ({umbral}%)"},
+    {'id': 'ta_limite', 'nivel': 'media', 'si': "ta_acum > 0.8 * @meta_ta and ta_acum <= @meta_ta", 'valor': 'ta_acum', 'umbral': 'meta_ta',
+     'mensaje': "Tasa Acumulada al límite ({valor:.2f}% de {umbral}%)."},
+    {'id': 'ta_ok', 'nivel': 'ok', 'si': "ta_acum <= 0.8 * @meta_ta", 'valor': 'ta_acum',
+     'mensaje': "Accidentabilidad bajo control."},
+    {'id': 'fatal', 'nivel': 'critica', 'si': "`Accidentes Fatales` > 0", 'valor': 'Accidentes Fatales',
+     'mensaje': "{valor:.0f} accidente(s) fatal(es) en el mes."},
+    {'id': 'ts_umbral', 'nivel': 'media', 'si': "ts_acum > @meta_ts", 'valor': 'ts_acum', 'umbral': 'meta_ts',
+     'mensaje': "Tasa de Siniestralidad acumulada ({valor:.2f}) sobre {umbral}."},
+    {'id': 'if_umbral', 'nivel': 'media', 'si': "if_acum > @meta_if", 'valor': 'if_acum', 'umbral': 'meta_if',
+     'mensaje': "Índice de Frecuencia acumulado ({valor:.2f}) sobre {umbral}."},
+    {'id': 'dias_perdidos', 'nivel': 'info', 'titulo': "DÍAS PERDIDOS", 'si': "`Tasa Sin.` > 0", 'valor': 'Días Perdidos',
+     'mensaje': "{valor:.0f} días perdidos."},
+    {'id': 'ep', 'nivel': 'info', 'si': "`Enf. Profesionales` > 0", 'valor': 'Enf. Profesionales',
+     'mensaje': "{valor:.0f} enfermedad(es) profesional(es) en el mes."},
+    {'id': 'inspecciones', 'nivel': 'media', 'si': "`Insp. Programadas` > 0 and p_insp < @meta_gestion", 'valor': 'p_insp',
+     'umbral': 'meta_gestion', 'mensaje': "Inspecciones ejecutadas al {valor:.0f}% (meta {umbral}%)."},
+    {'id': 'capacitaciones', 'nivel': 'media', 'si': "`Cap. Programadas` > 0 and p_cap < @meta_gestion", 'valor': 'p_cap',
+     'umbral': 'meta_gestion', 'mensaje': "Capacitaciones ejecutadas al {valor:.0f}% (meta {umbral}%)."},
+    {'id': 'hallazgos', 'nivel': 'media', 'si': "p_medidas < @meta_gestion", 'valor': 'p_medidas',
+     'umbral': 'meta_gestion', 'mensaje': "Cierre de hallazgos al {valor:.0f}% (meta {umbral}%)."},
+    {'id': 'salud', 'nivel': 'media', 'si': "p_salud < @meta_gestion", 'valor': 'p_salud',
+     'umbral': 'meta_gestion', 'mensaje': "Vigilancia de salud al {valor:.0f}% de los expuestos (meta {umbral}%)."},
+    {'id': 'sin_masa', 'nivel': 'datos', 'si': "`Masa Laboral` <= 0 and (`Accidentes CTP` > 0 or `Enf. Profesionales` > 0)",
+     'valor': 'Accidentes CTP', 'mensaje': "Accidentes o EP registrados sin masa laboral: revise la dotación del mes."},
+]
+
+COLS_MES = ['Masa Laboral', 'Accidentes CTP', 'Accidentes Fatales', 'Días Perdidos', 'Enf. Profesionales', 'Tasa Sin.',
+            'Insp. Programadas', 'Insp. Ejecutadas', 'Cap. Programadas', 'Cap. Ejecutadas',
+            'Medidas Abiertas', 'Medidas Cerradas', 'Expuestos Silice/Ruido', 'Vig. Salud Vigente']
+COLUMNAS = ['Centro', 'Año', 'Mes', 'Nivel', 'Regla', 'Valor', 'Mensaje']
+CACHE_MAX = 8
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+
+def _pct(a, b, defecto=0.0):
+    # safe_div vectorizado (calcular_gestion): b <= 0 -> defecto
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(b > 0, a / b * 100, defecto)
+
+def gestion(t):
+    # % de gestión del mes, mismas reglas que calcular_gestion
+    n = {c: t[c].to_numpy(dtype='float64') for c in COLS_MES[6:]}
+    return {
+        'p_insp': _pct(n['Insp. Ejecutadas'], n['Insp. Programadas']),
+        'p_cap': _pct(n['Cap. Ejecutadas'], n['Cap. Programadas']),
+        'p_medidas': _pct(n['Medidas Cerradas'], n['Medidas Abiertas'], 100.0),
+        'p_salud': _pct(n['Vig. Salud Vigente'], n['Expuestos Silice/Ruido'], 100.0),
+    }
+
+@medido('alertas.tabla')
+def tabla_indicadores(df, indice):
+    # Una fila por (centro, año, mes) de df: valores del mes, acumulados del año (del índice)
+    # y % de gestión
+    t = pd.DataFrame({'Centro': df['Centro'].astype(str).to_numpy(), 'Año': df['Año'].to_numpy(dtype='int64'),
+                      'Mes': df['Mes'].astype(str).to_numpy(),
+                      **{c: df[c].to_numpy(dtype='float64') for c in COLS_MES}})
+    t = t[t['Mes'].isin(MESES_ORDEN)].reset_index(drop=True)
+    acum = indice.tabla()
+    i = pd.MultiIndex.from_arrays([acum['Centro'], acum['Año'], acum['Mes']]).get_indexer(
+        pd.MultiIndex.from_arrays([t['Centro'], t['Año'], t['Mes']]))
+    for c in ['ta_acum', 'ts_acum', 'if_acum', 'ig_acum']:
+        t[c] = np.where(i >= 0, acum[c].to_numpy()[i], 0.0)
+    return t.assign(**gestion(t))
+
+def evaluar(tabla, metas=None, reglas=REGLAS):
+    # Todas las reglas sobre todas las filas. Reglas con columnas que la tabla no trae se omiten
+    metas = {**METAS_DEFECTO, **(metas or {})}
+    partes = []
+    for r in reglas:
+        try: m = np.asarray(tabla.eval(r['si'], local_dict=metas), dtype=bool)
+        except pd.errors.UndefinedVariableError: continue
+        if not m.any(): continue
+        sel = tabla.loc[m]
+        umbral = metas.get(r.get('umbral'))
+        valores = sel[r['valor']].to_numpy(dtype='float64')
+        partes.append(pd.DataFrame({
+            'Centro': sel['Centro'].to_numpy() if 'Centro' in sel else "", 'Año': sel['Año'].to_numpy() if 'Año' in sel else 0,
+            'Mes': sel['Mes'].to_numpy() if 'Mes' in sel else "", 'Nivel': r['nivel'], 'Regla': r['id'], 'Valor': valores,
+            'Mensaje': [r['mensaje'].format(valor=v, umbral=umbral) for v in valores]}))
+    if not partes: return pd.DataFrame(columns=COLUMNAS)
+    out = pd.concat(partes, ignore_index=True)
+    orden = np.lexsort((out['Mes'].map(MES_IDX).fillna(99).to_numpy(), -out['Año'].to_numpy(dtype='int64'),
+                        out['Nivel'].map(list(NIVELES).index).to_numpy()))
+    return out.iloc[orden].reset_index(drop=True)
+
+def alertas(df, indice, metas=None, version=None):
+    # Alertas de toda la cartera (sin el nivel 'ok'); con version, cacheadas por (versión, metas)
+    clave = None if version is None else (version, tuple(sorted({**METAS_DEFECTO, **(metas or {})}.items())))
+    if clave is not None:
+        with _lock:
+            if clave in _cache:
+                _cache.move_to_end(clave); return _cache[clave]
+    out = evaluar(tabla_indicadores(df, indice), metas)
+    out = out[out['Nivel'] != 'ok'].reset_index(drop=True)
+    if clave is not None:
+        with _lock:
+            _cache[clave] = out
+            while len(_cache) > CACHE_MAX: _cache.popitem(last=False)
+    return out
+
+def alertas_fila(row_mes, acum, gestion_mes, metas=None):
+    # Reglas sobre un solo mes (tablero y PDF, también consolidado), en el orden de REGLAS
+    fila = {**{k: v for k, v in dict(row_mes).items() if k not in ('Centro', 'Año', 'Mes')}, **acum, **gestion_mes}
+    return evaluar(pd.DataFrame([fila]), metas, REGLAS).sort_values('Regla', key=lambda s: s.map([r['id'] for r in REGLAS].index), kind='stable')
@@ -0,0 +1,220 @@
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from sst.agregados import IndiceAcumulado
+from sst.alertas import METAS_DEFECTO, NIVELES, alertas, gestion
+from sst.compartido import cargar_compartido, firma_archivo
+from sst.kpi import calcular_derivados, centros, preparar_anio, resumen_periodo
+from sst.medicion import medido
+from sst.schema import COL_VERSION, CONSOLIDADO, MESES_ORDEN, version_datos
+
+# --- API HTTP/JSON DE INDICADORES (SOLO LECTURA) ---
+# Los mismos números del tablero para otros sistemas (ERP, planilla de la mutual,
+# pantallas de faena), sin Streamlit:
+#   GET /api/estado                                 versión de datos, centros y años
+#   GET /api/kpi/<año>/<mes>[?centro=]              mes de corte: valores del mes, acumulado anual y gestión
+#   GET /api/serie[?centro=&desde=&hasta=]          serie mensual con acumulados del año
+#   GET /api/ventanas[?meses=12&centro=&desde=]     TA/TS/IF/IG móviles de N meses
+#   GET /api/alertas[?anio=&mes=&centro=&nivel=]    alertas de la cartera (metas: ?meta_ta=...)
+# Sin centro: consolidado de todos. El mes va por nombre o número (marzo, Marzo, 3).
+# La base se lee una vez por versión del archivo (sst.compartido) y el índice de
+# acumulados se arma una vez; cada respuesta se guarda ya serializada por (versión,
+# ruta, parámetros). El ETag es la versión de datos: con If-None-Match igual se
+# responde 304 sin cuerpo. La firma del archivo se revisa como mucho cada REVISAR segundos.
+
+REVISAR = 1.0
+CACHE_MAX = 2048
+SERIE_MES = ['Masa Laboral', 'HHT', 'Accidentes CTP', 'Accidentes Fatales', 'Días Perdidos', 'Enf. Profesionales',
+             'Días Perdidos EP', 'Tasa Acc.', 'Tasa Sin.', 'Indice Frec.', 'Indice Grav.']
+ACUMULADOS = ['avg_masa', 'ta_acum', 'ts_acum', 'if_acum', 'ig_acum']
+_MES_TXT = {m.lower(): m for m in MESES_ORDEN}
+
+class ErrorApi(Exception):
+    def __init__(self, status, mensaje):
+        super().__init__(mensaje); self.status = status
+
+def _limpiar(v):
+    # Escalares de numpy a Python y NaN/inf a null (JSON estricto)
+    if isinstance(v, dict): return {str(k): _limpiar(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)): return [_limpiar(x) for x in v]
+    if isinstance(v, np.generic): v = v.item()
+    if isinstance(v, float) and not math.isfinite(v): return None
+    return v
+
+def _registros(df):
+    return _limpiar(df.to_dict('records'))
+
+def _mes(txt):
+    if txt is None: return None
+    if txt.strip().isdigit() and 1 <= int(txt) <= 12: return MESES_ORDEN[int(txt) - 1]
+    if txt.strip().lower() in _MES_TXT: return _MES_TXT[txt.strip().lower()]
+    raise ErrorApi(400, f"Mes no válido: {txt}")
+
+def _entero(q, clave, defecto=None):
+    if q.get(clave) in (None, ""): return defecto
+    try: return int(q[clave])
+    except ValueError: raise ErrorApi(400, f"{clave} debe ser un número entero")
+
+class ApiKPI:
+    # Datos y respuestas cacheadas, independiente del servidor HTTP: responder() devuelve
+    # (status, encabezados, cuerpo) y se puede usar directo (pruebas, otros servidores)
+    def __init__(self, almacen=None, factor_base=210, revisar=REVISAR, cache_max=CACHE_MAX):
+        from sst.storage import abrir_almacen
+        self.almacen = almacen or abrir_almacen()
+        self.factor_base = factor_base; self.revisar = revisar; self.cache_max = cache_max
+        self._lock = threading.Lock()
+        self._datos = None        # (firma, df, índice, versión, hora de carga)
+        self._revisado = 0.0
+        self._respuestas = OrderedDict()
+
+    def datos(self):
+        # (df, índice, versión) vigentes; se recargan solo si cambió la firma del archivo
+        with self._lock:
+            ahora = time.monotonic()
+            if self._datos is not None and ahora - self._revisado < self.revisar: return self._datos[1:4]
+            self._revisado = ahora
+            firma = firma_archivo(self.almacen.path)
+            if self._datos is None or self._datos[0] != firma:
+                df, firma = cargar_compartido(self.almacen)
+                if self.factor_base != 210: df = calcular_derivados(df, self.factor_base)
+                self._datos = (firma, df, IndiceAcumulado(df), version_datos(df), time.time())
+            return self._datos[1:4]
+
+    def responder(self, ruta, query="", if_none_match=None):
+        try: df, indice, version = self.datos()
+        except Exception as e: return self._json(503, {'error': f"No se pudo leer la base de datos: {e}"})
+        q = dict(parse_qsl(query, keep_blank_values=True))
+        niveles = [v for k, v in parse_qsl(query) if k == 'nivel']
+        clave = (version, ruta.rstrip('/'), tuple(sorted(q.items())), tuple(niveles))
+        with self._lock:
+            r = self._respuestas.get(clave)
+            if r is not None: self._respuestas.move_to_end(clave)
+        if r is None:
+            try: r = self._json(200, self._calcular(ruta, q, niveles, df, indice, version), version)
+            except ErrorApi as e: r = self._json(e.status, {'error': str(e)})
+            with self._lock:
+                self._respuestas[clave] = r
+                while len(self._respuestas) > self.cache_max: self._respuestas.popitem(last=False)
+        status, encabezados, cuerpo = r
+        if status == 200 and if_none_match and _coincide(if_none_match, encabezados['ETag']):
+            return 304, {'ETag': encabezados['ETag'], 'Cache-Control': encabezados['Cache-Control']}, b""
+        return r
+
+    @staticmethod
+    def _json(status, obj, version=None):
+        cuerpo = json.dumps(_limpiar(obj), ensure_ascii=False, allow_nan=False).encode('utf-8')
+        encabezados = {'Content-Type': 'application/json; charset=utf-8', 'Cache-Control': 'no-cache'}
+        if version is not None: encabezados['ETag'] = f'"{version}"'
+        return status, encabezados, cuerpo
+
+    @medido('api.calcular')
+    def _calcular(self, ruta, q, niveles, df, indice, version):
+        partes = [unquote(p) for p in ruta.strip('/').split('/') if p]
+        if partes[:1] == ['api']: partes = partes[1:]
+        centro = q.get('centro') or None
+        if centro == CONSOLIDADO: centro = None
+        if centro is not None and centro not in centros(df): raise ErrorApi(404, f"No existe el centro {centro}")
+        nombre = centro or CONSOLIDADO
+        if not partes:
+            return {'endpoints': ['/api/estado', '/api/kpi/<año>/<mes>?centro=', '/api/serie?centro=&desde=&hasta=',
+                                  '/api/ventanas?meses=12&centro=&desde=', '/api/alertas?anio=&mes=&centro=&nivel=']}
+        if partes == ['estado']:
+            return {'version': version, 'filas': len(df), 'centros': centros(df), 'anios': sorted(int(y) for y in df['Año'].unique()),
+                    'factor_hht': self.factor_base, 'cargado': pd.Timestamp(self._datos[4], unit='s').isoformat(timespec='seconds')}
+        if partes[0] == 'kpi' and len(partes) == 3:
+            try: year = int(partes[1])
+            except ValueError: raise ErrorApi(400, f"Año no válido: {partes[1]}")
+            month = _mes(partes[2])
+            df_year = preparar_anio(df, year, centro)
+            if not (df_year['Mes'] == month).any(): raise ErrorApi(404, f"Sin datos para {month} {year} ({nombre})")
+            row_mes, acum, gest = resumen_periodo(df, year, month, df_year, indice, centro)
+            mes_actual = {k: v for k, v in row_mes.items() if k not in ('Centro', 'Año', 'Mes', 'Mes_Idx', COL_VERSION, 'Observaciones')}
+            return {'centro': nombre, 'anio': year, 'mes': month, 'version': version,
+                    'mes_actual': mes_actual, 'acumulado': acum, 'gestion': gest}
+        if partes == ['serie']:
+            desde = _entero(q, 'desde', 0); hasta = _entero(q, 'hasta', 9999)
+            return {'centro': nombre, 'version': version, 'serie': self._serie(df, indice, centro, desde, hasta)}
+        if partes == ['ventanas']:
+            meses = _entero(q, 'meses', 12)
+            if meses < 1: raise ErrorApi(400, "meses debe ser mayor que 0")
+            v = indice.ventanas(meses, centro)
+            desde = _entero(q, 'desde')
+            if desde is not None: v = v[v['Año'] >= desde]
+            return {'centro': nombre, 'meses': meses, 'version': version, 'ventanas': _registros(v)}
+        if partes == ['alertas']:
+            try: metas = {**METAS_DEFECTO, **{k: float(q[k]) for k in METAS_DEFECTO if q.get(k)}}
+            except ValueError: raise ErrorApi(400, "Las metas deben ser numéricas")
+            a = alertas(df, indice, metas, version)
+            if centro is not None: a = a[a['Centro'] == str(centro)]
+            if _entero(q, 'anio') is not None: a = a[a['Año'] == _entero(q, 'anio')]
+            if q.get('mes'): a = a[a['Mes'] == _mes(q['mes'])]
+            if niveles:
+                invalidos = set(niveles) - set(NIVELES)
+                if invalidos: raise ErrorApi(400, f"Nivel no válido: {', '.join(sorted(invalidos))}")
+                a = a[a['Nivel'].isin(niveles)]
+            return {'version': version, 'metas': metas, 'alertas': _registros(a)}
+        raise ErrorApi(404, f"Ruta desconocida: {ruta}")
+
+    @staticmethod
+    def _serie(df, indice, centro, desde, hasta):
+        # Un registro por mes: valores del mes (consolidados si centro es None), acumulado del año y gestión
+        out = []
+        for year in sorted(int(y) for y in df['Año'].unique() if desde <= y <= hasta):
+            d = preparar_anio(df, year, centro)
+            d = d[d['Mes'].isin(MESES_ORDEN)]
+            if d.empty: continue
+            t = pd.DataFrame({'anio': year, 'mes': d['Mes'].astype(str).to_numpy(),
+                              **{c: d[c].to_numpy(dtype='float64') for c in SERIE_MES}})
+            acum = [indice.consultar(year, m, centro) for m in t['mes']]
+            for k in ACUMULADOS: t[k] = [a[k] for a in acum]
+            out += _registros(t.assign(**gestion(d)))
+        return out
+
+def _coincide(if_none_match, etag):
+    # If-None-Match: lista de ETags (débiles o no) o '*'
+    valores = [v.strip() for v in if_none_match.split(',')]
+    return '*' in valores or etag in valores or f"W/{etag}" in valores
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # conexiones persistentes: los clientes reutilizan el socket
+    disable_nagle_algorithm = True  # encabezados y cuerpo salen en dos escrituras: sin esto, ~40 ms por respuesta (ACK retardado)
+    server_version = "sst-api"
+
+    def _responder(self, cuerpo=True):
+        partes = urlsplit(self.path)
+        status, encabezados, datos = self.server.api.responder(partes.path, partes.query, self.headers.get('If-None-Match'))
+        self.send_response(status)
+        for k, v in encabezados.items(): self.send_header(k, v)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        if cuerpo and datos: self.wfile.write(datos)
+
+    def do_GET(self): self._responder()
+    def do_HEAD(self): self._responder(cuerpo=False)
+
+    def log_message(self, formato, *args):
+        if self.server.verbose: super().log_message(formato, *args)
+
+def crear_servidor(host="127.0.0.1", puerto=8502, almacen=None, factor_base=210, verbose=False, **kwargs):
+    # Servidor con un hilo por conexión; serve_forever() para atender
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    servidor.daemon_threads = True
+    servidor.api = ApiKPI(almacen, factor_base, **kwargs); servidor.verbose = verbose
+    return servidor
+
+def servir(host="127.0.0.1", puerto=8502, almacen=None, factor_base=210, verbose=False):
+    servidor = crear_servidor(host, puerto, almacen, factor_base, verbose)
+    servidor.api.datos()  # la primera petición no paga la carga
+    print(f"API SST en http://{host}:{servidor.server_address[1]}/api (Ctrl+C para detener)", flush=True)
+    try: servidor.serve_forever()
+    except KeyboardInterrupt: pass
+    finally: servidor.server_close()
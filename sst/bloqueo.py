@@ -0,0 +1,46 @@
+import os
+import time
+from contextlib import contextmanager
+
+# --- CERROJO DE ESCRITURA ENTRE PROCESOS ---
+# Archivo <ruta>.lock con bloqueo exclusivo del sistema operativo (flock en Unix,
+# msvcrt en Windows). Lo toman solo los escritores de los almacenes CSV y Parquet;
+# los lectores no esperan porque cada archivo se reemplaza de forma atómica.
+# SQLite no lo necesita: su propio cerrojo (BEGIN IMMEDIATE) cumple el mismo papel.
+
+ESPERA = 0.01
+
+def _tomar(f, timeout):
+    limite = time.monotonic() + timeout
+    while True:
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except OSError:
+            if time.monotonic() > limite: raise TimeoutError(f"Base ocupada por otro proceso: {f.name}")
+            time.sleep(ESPERA)
+
+def _soltar(f):
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def ruta_cerrojo(path):
+    return os.path.abspath(path).rstrip('/\\') + '.lock'
+
+@contextmanager
+def bloqueo_escritura(path, timeout=30):
+    f = open(ruta_cerrojo(path), 'a+b')
+    try:
+        _tomar(f, timeout)
+        try: yield
+        finally: _soltar(f)
+    finally: f.close()
@@ -0,0 +1,137 @@
+import atexit
+import hashlib
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from sst.schema import LOGO_FILE
+
+# --- COLA DE INFORMES EN SEGUNDO PLANO ---
+# El informe ejecutivo PDF se genera en un pool de procesos compartido por todas las
+# sesiones del servidor: la sesión envía los parámetros (fila del mes, acumulados,
+# gestión, metas: unos pocos KB) y recibe un id de trabajo al instante; el tablero
+# consulta el estado y ofrece la descarga cuando está listo.
+#   - Parámetros idénticos (misma versión de datos, período, centro, metas y textos)
+#     se unen al mismo trabajo, esté en cola, generándose o ya listo.
+#   - Los PDF terminados quedan en memoria (los últimos CACHE_MAX); los errores no se
+#     cachean: reenviar los mismos parámetros vuelve a intentarlo.
+# Cada proceso del pool importa fpdf/matplotlib una vez y conserva su cache de gráficos
+# (sst.graficos) entre informes. Los procesos se inician con 'spawn': el servidor de
+# Streamlit tiene hilos, y hacer fork de un proceso con hilos no es seguro. Si un proceso
+# del pool muere de golpe el pool queda roto: se descarta y el siguiente envío crea otro.
+# Procesos: SST_INFORMES_PROCESOS o la mitad de las CPU.
+
+CACHE_MAX = 64
+PROCESOS = int(os.environ.get('SST_INFORMES_PROCESOS', 0)) or max(1, (os.cpu_count() or 2) // 2)
+
+def _init_worker():
+    import sst.pdf  # noqa: F401  (fpdf, matplotlib y sst.graficos cargados antes del primer informe)
+
+def _generar(params):
+    from sst.pdf import generar_reporte_pdf
+    return generar_reporte_pdf(**params)
+
+def clave_informe(params, version=None):
+    # Huella de los parámetros (y de la versión de datos): dos envíos iguales, un solo trabajo
+    def plano(v):
+        if hasattr(v, 'items'): return sorted((str(k), plano(x)) for k, x in v.items())
+        return repr(v)
+    return hashlib.sha1(repr((version, plano(params))).encode('utf-8')).hexdigest()
+
+class ColaInformes:
+    def __init__(self, procesos=PROCESOS, cache_max=CACHE_MAX):
+        self.procesos = procesos; self.cache_max = cache_max
+        self._pool = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._trabajos = OrderedDict()  # id -> dict del trabajo
+        self._por_clave = {}            # clave -> id vigente
+
+    def _pool_activo(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.procesos, mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_worker)
+        return self._pool
+
+    def _descartar_pool(self, pool):
+        if pool is not None and self._pool is pool: pool.shutdown(wait=False, cancel_futures=True); self._pool = None
+
+    def _someter(self, params):
+        # Un pool roto rechaza el envío: se reemplaza y se reintenta una vez
+        pool = self._pool_activo()
+        try: return pool, pool.submit(_generar, params)
+        except BrokenProcessPool:
+            self._descartar_pool(pool); pool = self._pool_activo()
+            return pool, pool.submit(_generar, params)
+
+    def enviar(self, row_mes, acum, gestion, metas, sel_month, sel_year, insight_text=None, logo_file=LOGO_FILE,
+               vectorial=False, centro=None, version=None):
+        # Mismos argumentos que generar_reporte_pdf (+ versión de datos). Devuelve el id del trabajo
+        params = {'row_mes': row_mes, 'acum': dict(acum), 'gestion': dict(gestion), 'metas': dict(metas), 'sel_month': sel_month,
+                  'sel_year': sel_year, 'insight_text': insight_text, 'logo_file': logo_file, 'vectorial': vectorial, 'centro': centro}
+        clave = clave_informe(params, version)
+        with self._lock:
+            previo = self._por_clave.get(clave)
+            if previo is not None and self._trabajos[previo]['estado'] != 'error':
+                self._trabajos[previo]['envios'] += 1
+                return previo
+            tid = f"inf-{next(self._ids)}"
+            t = {'id': tid, 'clave': clave, 'estado': 'en cola', 'centro': centro, 'year': sel_year, 'month': sel_month,
+                 'enviado': time.time(), 'terminado': None, 'pdf': None, 'error': None, 'envios': 1}
+            # Solo queda registrado si el pool lo aceptó (si no, un envío igual se uniría a un trabajo sin futuro)
+            t['pool'], t['futuro'] = self._someter(params)
+            self._trabajos[tid] = t; self._por_clave[clave] = tid
+        t['futuro'].add_done_callback(lambda f, tid=tid: self._terminar(tid, f))
+        return tid
+
+    def _terminar(self, tid, futuro):
+        with self._lock:
+            t = self._trabajos.get(tid)
+            if t is None: return
+            try: t['pdf'] = futuro.result(); t['estado'] = 'listo'
+            except Exception as e:
+                t['error'] = f"{type(e).__name__}: {e}"; t['estado'] = 'error'
+                if isinstance(e, BrokenProcessPool): self._descartar_pool(t['pool'])
+            t['terminado'] = time.time(); t['futuro'] = None; t['pool'] = None
+            self._recortar()
+
+    def _recortar(self):
+        # Solo se descartan trabajos terminados, los más antiguos primero
+        terminados = [tid for tid, t in self._trabajos.items() if t['estado'] in ('listo', 'error')]
+        for tid in terminados[:max(0, len(terminados) - self.cache_max)]:
+            t = self._trabajos.pop(tid)
+            if self._por_clave.get(t['clave']) == tid: del self._por_clave[t['clave']]
+
+    def estado(self, tid):
+        # dict con estado ('en cola', 'generando', 'listo', 'error', 'desconocido'), pdf, error y segundos
+        with self._lock:
+            t = self._trabajos.get(tid)
+            if t is None: return {'id': tid, 'estado': 'desconocido', 'pdf': None, 'error': None, 'segundos': 0.0}
+            estado = t['estado']
+            if estado == 'en cola' and t['futuro'] is not None and t['futuro'].running(): estado = 'generando'
+            return {'id': tid, 'estado': estado, 'pdf': t['pdf'], 'error': t['error'],
+                    'segundos': (t['terminado'] or time.time()) - t['enviado'], 'envios': t['envios']}
+
+    def pendientes(self):
+        with self._lock:
+            return sum(t['estado'] == 'en cola' for t in self._trabajos.values())
+
+    def cerrar(self):
+        with self._lock:
+            if self._pool is not None: self._pool.shutdown(wait=False, cancel_futures=True); self._pool = None
+
+_cola = None
+_cola_lock = threading.Lock()
+
+def cola_informes():
+    # Cola única por proceso (compartida por todas las sesiones de Streamlit)
+    global _cola
+    with _cola_lock:
+        if _cola is None:
+            _cola = ColaInformes(); atexit.register(_cola.cerrar)
+        return _cola
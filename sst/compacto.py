@@ -0,0 +1,119 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sst.schema import COL_VERSION, MESES_ORDEN, get_structure_for_year
+
+# --- REPRESENTACIÓN COMPACTA EN MEMORIA ---
+# df_main (compartido por las sesiones del proceso, ver sst.compartido) se guarda con
+# tipos angostos: Mes categórico ordenado, Centro categórico, Año int16, conteos en
+# int16/int32 y los índices mensuales en float32 (solo se muestran: los acumulados se
+# recalculan en float64 desde las sumas, y load_data los recalcula al leer). Masa,
+# horas extras, ausentismo y HHT quedan en float64 porque alimentan las sumas de HHT y
+# el promedio de masa de los indicadores.
+# Una columna solo se angosta si todos sus valores caben exactos; si una edición no cabe
+# (p. ej. 1,5 en un conteo) asignar() ensancha esa columna. Observaciones no va en
+# df_main: se lee del almacén por centro/año al pedirla (clase Observaciones).
+
+ENTEROS_16 = ['Accidentes CTP', 'Accidentes Fatales', 'Enf. Profesionales', 'Pensionados', 'Indemnizados',
+              'Insp. Programadas', 'Insp. Ejecutadas', 'Cap. Programadas', 'Cap. Ejecutadas',
+              'Medidas Abiertas', 'Medidas Cerradas', 'Año']
+ENTEROS_32 = ['Días Perdidos', 'Días Perdidos EP', 'Días Cargo', 'Expuestos Silice/Ruido', 'Vig. Salud Vigente', COL_VERSION]
+FLOTANTES_32 = ['Tasa Acc.', 'Tasa Sin.', 'Indice Frec.', 'Indice Grav.']
+TIPO_MES = pd.CategoricalDtype(MESES_ORDEN, ordered=True)
+
+def _entero(s, dtype):
+    # Enteros angostos solo si todos los valores son enteros finitos dentro del rango
+    if s.dtype == dtype or not pd.api.types.is_numeric_dtype(s): return s
+    v = s.to_numpy(dtype='float64', na_value=np.nan)
+    info = np.iinfo(dtype)
+    if len(v) and not (np.isfinite(v).all() and (v == np.round(v)).all() and v.min() >= info.min and v.max() <= info.max): return s
+    return s.astype(dtype)
+
+def compactar(df):
+    # Misma tabla (sin Observaciones) con los tipos angostos; las columnas ya compactas no se copian
+    nuevas = {}
+    for c in df.columns:
+        s = df[c]
+        if c in ENTEROS_16: nuevas[c] = _entero(s, 'int16')
+        elif c in ENTEROS_32: nuevas[c] = _entero(s, 'int32')
+        elif c in FLOTANTES_32 and s.dtype == 'float64': nuevas[c] = s.astype('float32')
+        elif c == 'Centro' and not isinstance(s.dtype, pd.CategoricalDtype): nuevas[c] = s.astype('category')
+        elif c == 'Mes' and s.dtype != TIPO_MES and s.isin(MESES_ORDEN).all(): nuevas[c] = s.astype(TIPO_MES)
+    nuevas = {c: s for c, s in nuevas.items() if s is not df[c]}
+    out = df.drop(columns='Observaciones', errors='ignore')
+    return out.assign(**nuevas) if nuevas else out
+
+def asignar(df, idx, col, v):
+    # df.at con ensanchamiento: un valor que no cabe en la columna angosta la pasa a float64 (u object)
+    try: df.at[idx, col] = v
+    except (TypeError, ValueError):
+        df[col] = df[col].astype('float64' if pd.api.types.is_numeric_dtype(df[col]) else object)
+        df.at[idx, col] = v
+
+def ensanchar(df):
+    # Tipos de procesar_datos (float64, textos): para escribir o exportar. Los float32 se
+    # redondean a 6 decimales para no arrastrar el ruido de la conversión
+    tipos = {c: 'float64' for c in df.columns if df[c].dtype == 'float32'}
+    tipos.update({c: 'float64' for c in ENTEROS_16 + ENTEROS_32 if c in df.columns and c not in ('Año', COL_VERSION)})
+    tipos.update({c: str for c in ('Centro', 'Mes') if c in df.columns and isinstance(df[c].dtype, pd.CategoricalDtype)})
+    out = df.astype(tipos)
+    f32 = [c for c in df.columns if df[c].dtype == 'float32']
+    if f32: out[f32] = out[f32].round(6)
+    if 'Año' in out: out['Año'] = out['Año'].astype('int64')
+    return out
+
+def expandir(df, observaciones):
+    # Tabla completa (tipos de procesar_datos y columna Observaciones): Excel, informes en lote
+    out = ensanchar(df).assign(Observaciones=observaciones.columna(df).to_numpy())
+    orden = [c for c in get_structure_for_year(2026).columns if c in out.columns]
+    return out[orden + [c for c in out.columns if c not in orden]]
+
+class Observaciones:
+    # Textos por (centro, año, mes), fuera de df_main. Un centro/año se lee del almacén la
+    # primera vez que se pide (editor, grilla, PDF); varios a la vez, en una sola lectura.
+    # Solo se guardan los textos no vacíos
+    def __init__(self, almacen):
+        self.almacen = almacen
+        self._anios = {}  # (centro, año) -> {mes: texto}
+        self._lock = threading.Lock()
+
+    def _leer(self, pares):
+        faltan = [p for p in pares if p not in self._anios]
+        if not faltan: return
+        if not self.almacen.existe(): df = pd.DataFrame()
+        elif len(faltan) == 1: df = self.almacen.cargar(year=faltan[0][1], centro=faltan[0][0])
+        else: df = self.almacen.cargar()
+        for p in faltan: self._anios[p] = {}
+        if df.empty or 'Observaciones' not in df.columns: return
+        con = df[df['Observaciones'].fillna("").astype(str).str.strip() != ""]
+        for c, y, m, t in zip(con['Centro'], con['Año'], con['Mes'], con['Observaciones']):
+            if (str(c), int(y)) in faltan: self._anios[(str(c), int(y))][m] = str(t)
+
+    def texto(self, centro, year, month):
+        clave = (str(centro), int(year))
+        with self._lock:
+            self._leer([clave])
+            return self._anios[clave].get(month, "")
+
+    def consolidado(self, centros, year, month):
+        # Textos de todos los centros del mes, como consolidar(): "Centro: texto" por línea
+        with self._lock:
+            self._leer([(str(c), int(year)) for c in centros])
+            return "\n".join(f"{c}: {t}" for c in centros if (t := self._anios[(str(c), int(year))].get(month, "")))
+
+    def columna(self, df):
+        # Observaciones alineadas con las filas de df (Centro, Año, Mes)
+        claves = list(zip(df['Centro'].astype(str), df['Año'].astype(int), df['Mes'].astype(str)))
+        with self._lock:
+            self._leer(list(dict.fromkeys((c, y) for c, y, _ in claves)))
+            return pd.Series([self._anios[(c, y)].get(m, "") for c, y, m in claves], index=df.index, dtype=object)
+
+    def actualizar(self, centro, year, month, texto):
+        # Después de guardar: el texto nuevo queda en memoria sin releer el almacén
+        clave = (str(centro), int(year))
+        with self._lock:
+            self._leer([clave])
+            if texto: self._anios[clave][month] = texto
+            else: self._anios[clave].pop(month, None)
@@ -0,0 +1,69 @@
+import os
+import threading
+
+from sst.medicion import medido
+
+# --- CACHE DE DATOS COMPARTIDO POR PROCESO ---
+# Una sola lectura de la base por versión del archivo (mtime + tamaño, incluido el
+# -wal de SQLite), compartida por todas las sesiones del proceso. Cada sesión
+# recibe una vista copy-on-write: sus ediciones no tocan la copia compartida.
+# Para una carpeta (Parquet particionado) la firma cubre cada archivo. La copia
+# compartida está en formato compacto (sst.compacto: tipos angostos, sin Observaciones).
+
+_lock = threading.Lock()
+_cache = {}
+
+def _pandas_mayor():
+    import pandas as pd
+    return int(pd.__version__.split('.')[0])
+
+def activar_cow():
+    # pandas 2.x: Copy-on-Write es opcional; en pandas >= 3 siempre está activo
+    import pandas as pd
+    if _pandas_mayor() == 2: pd.set_option('mode.copy_on_write', True)
+
+def _cow_activo():
+    import pandas as pd
+    mayor = _pandas_mayor()
+    return mayor >= 3 or (mayor == 2 and pd.get_option('mode.copy_on_write') is True)
+
+def vista(df):
+    # Copia superficial si hay CoW (las columnas se duplican recién al escribir); si no, copia completa
+    return df.copy(deep=not _cow_activo())
+
+def firma_archivo(path):
+    if os.path.isdir(path):
+        # Carpeta particionada (Parquet): una entrada por archivo
+        return tuple(sorted((os.path.join(r, f), *firma_archivo(os.path.join(r, f))[0])
+                            for r, _, fs in os.walk(path) for f in fs))
+    partes = []
+    for p in (path, path + '-wal'):
+        try:
+            st = os.stat(p); partes.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            partes.append(None)
+    return tuple(partes)
+
+def firma_almacen(almacen=None):
+    from sst.storage import abrir_almacen
+    return firma_archivo((almacen or abrir_almacen()).path)
+
+@medido('compartido.cargar')
+def cargar_compartido(almacen=None):
+    # Devuelve (vista de df, firma). Lecturas concurrentes esperan a una sola carga
+    from sst.compacto import compactar
+    from sst.storage import abrir_almacen, load_data
+    almacen = almacen or abrir_almacen()
+    clave = os.path.abspath(almacen.path)
+    with _lock:
+        firma = firma_archivo(almacen.path)
+        entrada = _cache.get(clave)
+        if entrada is None or entrada[0] != firma:
+            entrada = (firma, compactar(load_data(almacen)))
+            _cache[clave] = entrada
+    return vista(entrada[1]), entrada[0]
+
+def invalidar(path=None):
+    with _lock:
+        if path is None: _cache.clear()
+        else: _cache.pop(os.path.abspath(path), None)
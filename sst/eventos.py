@@ -0,0 +1,185 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+from sst.schema import CENTRO_DEFECTO, MESES_ORDEN
+
+# --- REGISTRO DE EVENTOS (ACCIDENTES Y ENFERMEDADES PROFESIONALES) ---
+# Un registro por evento: fecha, trabajador, tipo, días perdidos y días cargo. Las
+# columnas DS67 del mes (COLS_EVENTOS) se derivan con un GROUP BY sobre el índice
+# (Centro, Año, Mes): al crear, modificar o borrar eventos solo se recalculan sus meses
+# (el de antes y el de después si cambió la fecha o el centro). Los meses que nunca
+# tuvieron eventos conservan lo digitado en el editor.
+#
+# Tabla 'eventos' en SQLite: en la misma base si el almacén es SQLite; si no, en
+# <almacén>_eventos.db al lado.
+
+TIPOS = ['Accidente CTP', 'Accidente Fatal', 'Enf. Profesional']
+COLS_EVENTOS = ['Accidentes CTP', 'Accidentes Fatales', 'Enf. Profesionales', 'Días Perdidos', 'Días Perdidos EP', 'Días Cargo']
+COLUMNAS = ['ID', 'Centro', 'Fecha', 'Trabajador', 'Tipo', 'Días Perdidos', 'Días Cargo', 'Descripción']
+CLAVE = ['Centro', 'Año', 'Mes']
+
+# Conteo y días de cada columna mensual (los días de un accidente fatal son días perdidos)
+_ROLLUP = '''
+    COALESCE(SUM(e."Tipo" = 'Accidente CTP'), 0), COALESCE(SUM(e."Tipo" = 'Accidente Fatal'), 0),
+    COALESCE(SUM(e."Tipo" = 'Enf. Profesional'), 0),
+    COALESCE(SUM(CASE WHEN e."Tipo" != 'Enf. Profesional' THEN e."Días Perdidos" END), 0),
+    COALESCE(SUM(CASE WHEN e."Tipo" = 'Enf. Profesional' THEN e."Días Perdidos" END), 0),
+    COALESCE(SUM(e."Días Cargo"), 0)'''
+
+def validar_eventos(df):
+    # Normaliza y valida (vectorizado). Devuelve df con Fecha ISO, Año y Mes; ValueError
+    # con las filas inválidas
+    df = df.reindex(columns=[c for c in COLUMNAS if c != 'ID'] + (['ID'] if 'ID' in df.columns else [])).copy()
+    df['Centro'] = df['Centro'].fillna("").astype(str).str.strip().replace("", CENTRO_DEFECTO)
+    # ISO (AAAA-MM-DD) o formato local (DD/MM/AAAA); los formatos fijos se convierten en bloque
+    fecha = pd.to_datetime(df['Fecha'], errors='coerce', format='ISO8601')
+    for formato in ['%d/%m/%Y', 'mixed']:
+        faltan = fecha.isna() & df['Fecha'].notna()
+        if not faltan.any(): break
+        fecha[faltan] = pd.to_datetime(df.loc[faltan, 'Fecha'], errors='coerce', dayfirst=True, format=formato)
+    for c in ['Días Perdidos', 'Días Cargo']: df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0.0)
+    df['Trabajador'] = df['Trabajador'].fillna("").astype(str).str.strip()
+    df['Descripción'] = df['Descripción'].fillna("").astype(str)
+    errores = []
+    for mask, msg in [(fecha.isna(), "fecha inválida"), (~df['Tipo'].isin(TIPOS), f"tipo debe ser uno de {TIPOS}"),
+                      ((df['Días Perdidos'] < 0) | (df['Días Cargo'] < 0), "días negativos")]:
+        errores += [f"fila {i + 1}: {msg}" for i in mask.to_numpy().nonzero()[0]]
+    if errores: raise ValueError("Eventos inválidos: " + "; ".join(errores[:10]) + (" ..." if len(errores) > 10 else ""))
+    df['Fecha'] = fecha.dt.strftime('%Y-%m-%d')
+    df['Año'] = fecha.dt.year.astype('int64')
+    df['Mes'] = [MESES_ORDEN[m - 1] for m in fecha.dt.month]
+    return df
+
+class RegistroEventos:
+    TABLA = 'eventos'
+
+    def __init__(self, path):
+        self.path = path
+
+    def existe(self):
+        return os.path.exists(self.path)
+
+    def _conectar(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def crear(self):
+        with self._conectar() as conn:
+            conn.execute(f'''CREATE TABLE IF NOT EXISTS {self.TABLA} ("ID" INTEGER PRIMARY KEY AUTOINCREMENT,
+                             "Centro" TEXT NOT NULL, "Fecha" TEXT NOT NULL, "Año" INTEGER NOT NULL, "Mes" TEXT NOT NULL,
+                             "Trabajador" TEXT NOT NULL DEFAULT '', "Tipo" TEXT NOT NULL,
+                             "Días Perdidos" REAL NOT NULL DEFAULT 0, "Días Cargo" REAL NOT NULL DEFAULT 0,
+                             "Descripción" TEXT NOT NULL DEFAULT '')''')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS ix_{self.TABLA}_mes ON {self.TABLA} ("Centro", "Año", "Mes")')
+        conn.close()
+
+    def cargar(self, year=None, month=None, centro=None):
+        if not self.existe(): return pd.DataFrame(columns=COLUMNAS + ['Año', 'Mes'])
+        filtros, params = [], []
+        for col, val in [('Centro', centro), ('Año', year), ('Mes', month)]:
+            if val is not None: filtros.append(f'"{col}" = ?'); params.append(int(val) if col == 'Año' else str(val))
+        where = f" WHERE {' AND '.join(filtros)}" if filtros else ""
+        conn = self._conectar()
+        try: return pd.read_sql(f'SELECT * FROM {self.TABLA}{where} ORDER BY "Fecha", "ID"', conn, params=params)
+        except pd.errors.DatabaseError: return pd.DataFrame(columns=COLUMNAS + ['Año', 'Mes'])
+        finally: conn.close()
+
+    def aplicar(self, nuevos=None, cambios=None, borrar=None):
+        # En una transacción: nuevos (DataFrame sin ID), cambios {ID: {columna: valor}} y
+        # borrar [ID]. Devuelve (IDs creados, meses afectados {(centro, año, mes)})
+        self.crear()
+        conn = self._conectar(); conn.isolation_level = None
+        cols = [c for c in COLUMNAS if c != 'ID'] + ['Año', 'Mes']
+        cols_sql = ", ".join(f'"{c}"' for c in cols); sets = ", ".join(f'"{c}" = ?' for c in cols)
+        meses, ids = set(), []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            previos = list(cambios or {}) + list(borrar or [])
+            actuales = pd.read_sql(f'SELECT * FROM {self.TABLA} WHERE "ID" IN ({", ".join("?" for _ in previos)})',
+                                   conn, params=[int(i) for i in previos]).set_index('ID') if previos else pd.DataFrame()
+            faltan = [i for i in previos if int(i) not in actuales.index]
+            if faltan: raise KeyError(f"Eventos inexistentes: {faltan[:10]}")
+            if previos: meses.update(actuales[CLAVE].itertuples(index=False, name=None))
+            if borrar: conn.executemany(f'DELETE FROM {self.TABLA} WHERE "ID" = ?', [(int(i),) for i in borrar])
+            if cambios:
+                editados = actuales.loc[[int(i) for i in cambios]].reset_index()
+                for i, (id_, valores) in enumerate(cambios.items()):
+                    for c, v in valores.items(): editados.loc[i, c] = v
+                editados = validar_eventos(editados)
+                conn.executemany(f'UPDATE {self.TABLA} SET {sets} WHERE "ID" = ?',
+                                 _tuplas(editados, cols + ['ID']))
+                meses.update(map(tuple, editados[CLAVE].itertuples(index=False, name=None)))
+            if nuevos is not None and len(nuevos):
+                nuevos = validar_eventos(pd.DataFrame(nuevos))
+                conn.executemany(f'INSERT INTO {self.TABLA} ({cols_sql}) VALUES ({", ".join("?" for _ in cols)})',
+                                 _tuplas(nuevos, cols))
+                # Con el cerrojo tomado (BEGIN IMMEDIATE) los IDs de AUTOINCREMENT son consecutivos
+                ultimo = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                ids = list(range(ultimo - len(nuevos) + 1, ultimo + 1))
+                meses.update(map(tuple, nuevos[CLAVE].drop_duplicates().itertuples(index=False, name=None)))
+            conn.execute("COMMIT")
+        except:
+            conn.execute("ROLLBACK"); raise
+        finally: conn.close()
+        return ids, {(str(c), int(a), str(m)) for c, a, m in meses}
+
+    def resumen(self, meses=None):
+        # Columnas DS67 por mes desde los eventos (GROUP BY por el índice). Con `meses`, solo
+        # esos (en cero si ya no tienen eventos); sin ellos, todos los meses con eventos
+        self.crear()
+        conn = self._conectar()
+        try:
+            if meses is None:
+                sql = f'SELECT e."Centro", e."Año", e."Mes", {_ROLLUP} FROM {self.TABLA} e GROUP BY e."Centro", e."Año", e."Mes"'
+            else:
+                conn.execute('CREATE TEMP TABLE _meses ("Centro" TEXT, "Año" INTEGER, "Mes" TEXT)')
+                conn.executemany('INSERT INTO _meses VALUES (?, ?, ?)', [(str(c), int(a), str(m)) for c, a, m in meses])
+                sql = (f'SELECT m."Centro", m."Año", m."Mes", {_ROLLUP} FROM _meses m LEFT JOIN {self.TABLA} e '
+                       f'ON e."Centro" = m."Centro" AND e."Año" = m."Año" AND e."Mes" = m."Mes" GROUP BY m."Centro", m."Año", m."Mes"')
+            filas = conn.execute(sql).fetchall()
+        finally: conn.close()
+        df = pd.DataFrame(filas, columns=CLAVE + COLS_EVENTOS)
+        df[COLS_EVENTOS] = df[COLS_EVENTOS].astype('float64')
+        return df
+
+def _tuplas(df, cols):
+    # Filas como tuplas de escalares de Python (tolist por columna: sin conversión celda a celda)
+    return list(zip(*(df[c].tolist() for c in cols)))
+
+def abrir_registro(almacen=None):
+    from sst.storage import AlmacenSQLite, abrir_almacen
+    almacen = almacen or abrir_almacen()
+    if isinstance(almacen, AlmacenSQLite): return RegistroEventos(almacen.path)
+    return RegistroEventos(os.path.splitext(os.path.abspath(almacen.path).rstrip('/\\'))[0] + '_eventos.db')
+
+def actualizar_meses(registro, almacen, meses, factor_base=210):
+    # Lleva el resumen de esos meses a la base mensual. Las versiones de los meses se leen
+    # antes de agrupar los eventos: si otro proceso registra un evento del mismo mes entre
+    # medio, su escritura cambia la versión y el reintento agrupa de nuevo
+    from sst.storage import fusionar_meses
+    meses = sorted(meses)
+    if not meses: return 0
+    pares = sorted({(c, a) for c, a, _ in meses})
+    return fusionar_meses(almacen, pares, lambda: registro.resumen(meses), factor_base, motivo="eventos")
+
+def registrar(almacen=None, nuevos=None, cambios=None, borrar=None, factor_base=210):
+    # Aplica altas, cambios y bajas de eventos y recalcula solo los meses afectados.
+    # Devuelve (IDs creados, meses recalculados)
+    from sst.storage import abrir_almacen
+    almacen = almacen or abrir_almacen()
+    registro = abrir_registro(almacen)
+    ids, meses = registro.aplicar(nuevos, cambios, borrar)
+    actualizar_meses(registro, almacen, meses, factor_base)
+    return ids, meses
+
+def recalcular(almacen=None, factor_base=210):
+    # Reconstruye todos los meses con eventos (p. ej. tras cargar el registro por fuera de la app)
+    from sst.storage import abrir_almacen
+    almacen = almacen or abrir_almacen()
+    registro = abrir_registro(almacen)
+    meses = list(registro.resumen()[CLAVE].itertuples(index=False, name=None))
+    return actualizar_meses(registro, almacen, meses, factor_base)
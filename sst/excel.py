@@ -0,0 +1,59 @@
+import math
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from sst.medicion import medido
+
+# --- EXPORTACIÓN EXCEL ---
+# El libro se arma solo cuando alguien lo pide y se guarda por versión de datos.
+# Sobre UMBRAL_STREAMING filas se usa el modo write-only de openpyxl, que escribe
+# fila a fila sin mantener el árbol de celdas en memoria.
+
+UMBRAL_STREAMING = 50_000
+CACHE_MAX = 4
+HOJA = 'SST_Data'
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+@medido('excel.to_excel')
+def to_excel(df):
+    import pandas as pd
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name=HOJA)
+    return output.getvalue()
+
+def _celda(v):
+    if isinstance(v, float) and math.isnan(v): return None
+    return v.item() if hasattr(v, 'item') else v
+
+@medido('excel.to_excel_streaming')
+def to_excel_streaming(df, destino=None):
+    # destino: ruta o archivo; sin destino devuelve los bytes
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(HOJA)
+    ws.append([str(c) for c in df.columns])
+    for fila in df.itertuples(index=False, name=None):
+        ws.append([_celda(v) for v in fila])
+    if destino is not None:
+        wb.save(destino); return destino
+    output = BytesIO(); wb.save(output)
+    return output.getvalue()
+
+def excel_cacheado(df, version, streaming=None, preparar=None):
+    # Reutiliza los bytes mientras la versión de datos no cambie.
+    # preparar(df): transformación que no cambia las filas (p. ej. expandir), solo si no está en cache
+    if streaming is None: streaming = len(df) > UMBRAL_STREAMING
+    clave = (version, bool(streaming))
+    with _lock:
+        if clave in _cache:
+            _cache.move_to_end(clave); return _cache[clave]
+    if preparar is not None: df = preparar(df)
+    data = to_excel_streaming(df) if streaming else to_excel(df)
+    with _lock:
+        _cache[clave] = data
+        while len(_cache) > CACHE_MAX: _cache.popitem(last=False)
+    return data
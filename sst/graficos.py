@@ -0,0 +1,69 @@
+import zlib
+from functools import lru_cache
+from io import BytesIO
+
+import numpy as np
+
+from sst.medicion import medido
+
+# --- GRÁFICOS DEL INFORME EN MEMORIA ---
+# Cada gráfico se rasteriza con matplotlib (sin pyplot, apto para hilos) a un
+# buffer PNG y se convierte directo a la estructura de imagen que usa FPDF,
+# sin archivos temporales. Los resultados quedan en un LRU por parámetros, así
+# informes repetidos reutilizan las imágenes ya rasterizadas.
+
+CACHE_MAX = 256
+
+def _figura(figsize):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+def _rgba(fig, transparent):
+    from PIL import Image
+    buf = BytesIO()
+    fig.savefig(buf, format='png', transparent=transparent, dpi=100, bbox_inches='tight')
+    buf.seek(0)
+    return np.asarray(Image.open(buf).convert('RGBA'))
+
+def imagen_fpdf(rgba):
+    # Equivalente a FPDF._parsepng: filas con byte de filtro PNG (0) + FlateDecode
+    h, w = rgba.shape[:2]
+    filtro = np.zeros((h, 1), dtype=np.uint8)
+    color = np.hstack([filtro, np.ascontiguousarray(rgba[:, :, :3]).reshape(h, w * 3)])
+    info = {'w': w, 'h': h, 'cs': 'DeviceRGB', 'bpc': 8, 'f': 'FlateDecode',
+            'dp': f'/Predictor 15 /Colors 3 /BitsPerComponent 8 /Columns {w}', 'pal': '', 'trns': '',
+            'data': zlib.compress(color.tobytes())}
+    alpha = rgba[:, :, 3]
+    if (alpha != 255).any(): info['smask'] = zlib.compress(np.hstack([filtro, alpha]).tobytes())
+    return info
+
+@lru_cache(maxsize=CACHE_MAX)
+@medido('graficos.donut_gestion')
+def donut_gestion(val_pct, color_hex):
+    fig = _figura((2, 2)); ax = fig.add_subplot()
+    val_plot = min(val_pct, 100); val_plot = max(val_plot, 0)
+    ax.pie([val_plot, 100-val_plot], colors=[color_hex, '#eeeeee'], startangle=90, counterclock=False,
+           wedgeprops=dict(width=0.4, edgecolor='white'))
+    ax.text(0, 0, f"{val_pct:.0f}%", ha='center', va='center', fontsize=12, fontweight='bold', color='#333333')
+    return imagen_fpdf(_rgba(fig, True))
+
+@lru_cache(maxsize=CACHE_MAX)
+@medido('graficos.kpi_par')
+def kpi_par(val_m, val_a, max_scale, color_m, color_a, unit):
+    fig = _figura((4, 2)); ax1, ax2 = fig.subplots(1, 2)
+    for ax, val, color, titulo in [(ax1, val_m, color_m, "MENSUAL"), (ax2, val_a, color_a, "ACUMULADO")]:
+        val_plot = min(val, max_scale); rem = max_scale - val_plot
+        ax.pie([val_plot, rem], colors=[color, '#EEEEEE'], startangle=90, counterclock=False, wedgeprops=dict(width=0.3, edgecolor='white'))
+        ax.text(0, 0, f"{val:.1f}\n{unit}", ha='center', va='center', fontsize=10, fontweight='bold')
+        ax.set_title(titulo, fontsize=8, color='#555555')
+    return imagen_fpdf(_rgba(fig, False))
+
+def limpiar_cache():
+    donut_gestion.cache_clear(); kpi_par.cache_clear()
+
+def hex_a_rgb(color_hex):
+    c = color_hex.lstrip('#')
+    return tuple(int(c[i:i+2], 16) for i in (0, 2, 4))
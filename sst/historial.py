@@ -0,0 +1,454 @@
+import contextvars
+import getpass
+import json
+import math
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from sst.bloqueo import bloqueo_escritura
+from sst.kpi import COLS_DERIVADAS
+from sst.medicion import medido
+from sst.schema import MES_IDX, get_structure_for_year
+
+# --- HISTORIAL DE VERSIONES ---
+# Cada guardado (save_data, fusionar_meses) registra una instantánea con solo las celdas
+# que cambiaron: (centro, año, mes, columna, valor anterior, valor nuevo), quién y por
+# qué. Cada cierto volumen de cambios se escribe un punto de control (checkpoint) con la
+# tabla completa: reconstruir cualquier instantánea es leer el checkpoint anterior y
+# aplicar los cambios que siguen, y el espacio crece con lo cambiado (los checkpoints
+# se escriben cuando las celdas cambiadas desde el último igualan COMPACTAR veces la tabla).
+#
+# Los cambios se calculan contra el estado que reconstruye el propio historial, bajo un
+# cerrojo que envuelve también la escritura en el almacén: el orden de las instantáneas
+# es el de las escrituras, y si un guardado no quedara registrado el siguiente que toque
+# esas filas registra la diferencia acumulada.
+#
+# Tablas hist_* en <almacén>_historial.db al lado de la base, con cualquier motor: registrar
+# instantáneas o informes no cambia la firma del archivo de datos (sst.compartido), así las
+# sesiones y la API no recargan la base por una escritura del historial. Las bases SQLite
+# anteriores (tablas hist_* en la misma base) se mudan al abrirlo. SST_HISTORIAL=0 lo desactiva.
+
+ACTIVO = os.environ.get('SST_HISTORIAL', '1') not in ('', '0')
+CLAVE = ['Centro', 'Año', 'Mes']
+COMPACTAR = 1.0
+FILA = '*'  # columna marcador: valor 1 = fila creada, NULL = fila eliminada
+
+_vigente = {}  # path -> ((id, ts) de la última instantánea, estado): evita reconstruir en cada guardado de este proceso
+_mudados = set()  # bases SQLite ya revisadas por _mudar_tablas en este proceso
+
+_usuario = contextvars.ContextVar('sst_usuario', default=None)
+
+def fijar_usuario(nombre):
+    # Autor de los guardados del contexto actual (la app lo fija por sesión)
+    _usuario.set(nombre or None)
+
+def usuario_actual():
+    if _usuario.get(): return _usuario.get()
+    try: return os.environ.get('SST_USUARIO') or getpass.getuser()
+    except Exception: return ""
+
+def _columnas():
+    return [c for c in get_structure_for_year(2026).columns if c not in CLAVE]
+
+def _igual(col, a, b):
+    if a is None or b is None: return a is None and b is None
+    if col in COLS_DERIVADAS and isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        # Solo las calculadas: los índices de la tabla compacta (float32) vuelven redondeados a
+        # 6 decimales. Las columnas de entrada se comparan exactas (90000 -> 90000.05 es un cambio)
+        return math.isclose(a, b, rel_tol=1e-6, abs_tol=1e-9)
+    return a == b
+
+def _filas(df, cols):
+    # {(centro, año, mes): {columna: valor}}
+    # Por columna con tolist() (escalares de Python; faltantes -> None), no celda a celda
+    df = df.reindex(columns=CLAVE + cols)
+    valores = []
+    for c in cols:
+        vals = df[c].tolist()
+        for i in np.flatnonzero(df[c].isna().to_numpy()): vals[i] = None
+        valores.append(vals)
+    claves = zip(df['Centro'].astype(str).tolist(), df['Año'].astype('int64').tolist(), df['Mes'].astype(str).tolist())
+    return {k: dict(zip(cols, fila)) for k, fila in zip(claves, zip(*valores))}
+
+def _fecha(fecha):
+    # datetime, texto ISO o timestamp -> segundos epoch
+    if isinstance(fecha, (int, float)): return float(fecha)
+    return pd.Timestamp(fecha).timestamp()
+
+class Historial:
+    def __init__(self, path):
+        self.path = path
+
+    def existe(self):
+        if not os.path.exists(self.path): return False
+        conn = self._conectar()
+        try: return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hist_instantaneas'").fetchone() is not None
+        finally: conn.close()
+
+    def _conectar(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def crear(self):
+        with self._conectar() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS hist_instantaneas ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "ts" REAL NOT NULL,
+                            "usuario" TEXT NOT NULL DEFAULT '', "motivo" TEXT NOT NULL DEFAULT '', "filas" INTEGER NOT NULL DEFAULT 0,
+                            "celdas" INTEGER NOT NULL DEFAULT 0, "checkpoint" INTEGER NOT NULL DEFAULT 0)''')
+            conn.execute('''CREATE TABLE IF NOT EXISTS hist_deltas ("instantanea" INTEGER NOT NULL, "Centro" TEXT NOT NULL,
+                            "Año" INTEGER NOT NULL, "Mes" TEXT NOT NULL, "columna" TEXT NOT NULL, "anterior" TEXT, "valor" TEXT)''')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_hist_deltas_clave ON hist_deltas ("Centro", "Año", "instantanea")')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_hist_deltas_inst ON hist_deltas ("instantanea")')
+            conn.execute('''CREATE TABLE IF NOT EXISTS hist_filas ("checkpoint" INTEGER NOT NULL, "Centro" TEXT NOT NULL,
+                            "Año" INTEGER NOT NULL, "Mes" TEXT NOT NULL, "datos" TEXT NOT NULL,
+                            PRIMARY KEY ("checkpoint", "Centro", "Año", "Mes"))''')
+            conn.execute('''CREATE TABLE IF NOT EXISTS hist_informes ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "ts" REAL NOT NULL,
+                            "instantanea" INTEGER NOT NULL, "usuario" TEXT NOT NULL DEFAULT '', "Centro" TEXT, "Año" INTEGER NOT NULL,
+                            "Mes" TEXT NOT NULL, "metas" TEXT NOT NULL, "factor" REAL NOT NULL)''')
+        conn.close()
+
+    def _transaccion(self):
+        conn = self._conectar()
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    # Reconstrucción: checkpoint anterior + cambios posteriores, en orden
+
+    def _checkpoint(self, conn, hasta=None):
+        sql = "SELECT MAX(id) FROM hist_instantaneas WHERE checkpoint = 1" + (" AND id <= ?" if hasta is not None else "")
+        return conn.execute(sql, [int(hasta)] if hasta is not None else []).fetchone()[0]
+
+    def _reconstruir(self, conn, hasta=None, pares=None):
+        # {(centro, año, mes): {columna: valor}} en la instantánea `hasta` (None: la última).
+        # pares [(centro, año)]: solo esas particiones
+        cp = self._checkpoint(conn, hasta)
+        if cp is None:
+            # Sin checkpoint previo: desde el comienzo, salvo que esa parte se haya compactado
+            primera = conn.execute("SELECT MIN(id) FROM hist_instantaneas WHERE checkpoint = 1").fetchone()[0]
+            if hasta is not None and primera is not None and conn.execute("SELECT MIN(id) FROM hist_instantaneas").fetchone()[0] == primera > 1:
+                raise ValueError(f"La instantánea {hasta} es anterior al historial conservado (compactado)")
+            cp = 0
+        filtro, params = "", []
+        if pares is not None:
+            if not pares: return {}
+            filtro = " AND (" + " OR ".join('("Centro" = ? AND "Año" = ?)' for _ in pares) + ")"
+            params = [v for c, y in pares for v in (str(c), int(y))]
+        estado = {}
+        for c, y, m, datos in conn.execute(f'SELECT "Centro", "Año", "Mes", datos FROM hist_filas WHERE checkpoint = ?{filtro}', [cp] + params):
+            estado[(c, y, m)] = json.loads(datos)
+        hasta_sql = " AND instantanea <= ?" if hasta is not None else ""
+        sql = (f'SELECT "Centro", "Año", "Mes", columna, valor FROM hist_deltas WHERE instantanea > ?{hasta_sql}{filtro} '
+               'ORDER BY instantanea, rowid')
+        for c, y, m, col, valor in conn.execute(sql, [cp] + ([int(hasta)] if hasta is not None else []) + params):
+            if col == FILA:
+                if valor is None: estado.pop((c, y, m), None)
+                else: estado[(c, y, m)] = {}
+            else: estado.setdefault((c, y, m), {})[col] = json.loads(valor)
+        return estado
+
+    @staticmethod
+    def _aplicar(estado, cambios):
+        # Estado nuevo con los cambios aplicados; las filas sin cambios se comparten con `estado`
+        nuevo = dict(estado)
+        for c, y, m, col, _, valor in cambios:
+            k = (c, y, m)
+            if col == FILA:
+                if valor is None: nuevo.pop(k, None)
+                else: nuevo[k] = {}
+            else:
+                if nuevo.get(k) is estado.get(k): nuevo[k] = dict(estado.get(k) or {})
+                nuevo[k][col] = json.loads(valor)
+        return nuevo
+
+    def _escribir_checkpoint(self, conn, sid, estado):
+        conn.executemany('INSERT INTO hist_filas VALUES (?, ?, ?, ?, ?)',
+                         [(sid, c, y, m, json.dumps(fila, ensure_ascii=False)) for (c, y, m), fila in estado.items()])
+        conn.execute("UPDATE hist_instantaneas SET checkpoint = 1 WHERE id = ?", (sid,))
+
+    def _quizas_checkpoint(self, conn, sid):
+        cp = self._checkpoint(conn) or 0
+        celdas = conn.execute("SELECT COALESCE(SUM(celdas), 0) FROM hist_instantaneas WHERE id > ?", (cp,)).fetchone()[0]
+        filas = conn.execute("SELECT COUNT(*) FROM hist_filas WHERE checkpoint = ?", (cp,)).fetchone()[0]
+        if celdas >= COMPACTAR * max(filas, 1) * len(_columnas()): self._escribir_checkpoint(conn, sid, self._reconstruir(conn))
+
+    # Registro
+
+    def iniciar(self, almacen):
+        # Primera vez: la base vigente queda como instantánea inicial (checkpoint), sin cambios
+        self.crear()
+        conn = self._transaccion()
+        try:
+            if conn.execute("SELECT COUNT(*) FROM hist_instantaneas").fetchone()[0] == 0 and almacen.existe():
+                df = almacen.cargar()
+                cur = conn.execute("INSERT INTO hist_instantaneas (ts, usuario, motivo, filas) VALUES (?, ?, ?, ?)",
+                                   (time.time(), usuario_actual(), "estado inicial", len(df)))
+                self._escribir_checkpoint(conn, cur.lastrowid, _filas(df, [c for c in _columnas() if c in df.columns]))
+            conn.execute("COMMIT")
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        finally: conn.close()
+
+    @medido('historial.registrar')
+    def registrar(self, df, completo=False, motivo="", usuario=None):
+        # df: lo escrito en el almacén. completo: reemplazo total (las filas que faltan se
+        # registran como eliminadas). Observaciones None en una escritura parcial = sin cambio.
+        # Devuelve el id de la instantánea (None si nada cambió)
+        cols = [c for c in _columnas() if c in df.columns]
+        nuevas = _filas(df, cols)
+        conn = self._transaccion()
+        try:
+            ultima = conn.execute("SELECT id, ts FROM hist_instantaneas ORDER BY id DESC LIMIT 1").fetchone()
+            vigente = _vigente.get(self.path)
+            if vigente is None or ultima is None or vigente[0] != ultima: vigente = None
+            if vigente is not None: previo = vigente[1]
+            else: previo = self._reconstruir(conn, pares=None if completo else sorted({(c, y) for c, y, _ in nuevas}))
+            if completo and not previo and nuevas:
+                # Base nueva: un checkpoint en vez de una creación por celda
+                ts = time.time()
+                cur = conn.execute("INSERT INTO hist_instantaneas (ts, usuario, motivo, filas) VALUES (?, ?, ?, ?)",
+                                   (ts, usuario or usuario_actual(), motivo, len(nuevas)))
+                self._escribir_checkpoint(conn, cur.lastrowid, nuevas)
+                conn.execute("COMMIT")
+                _vigente[self.path] = ((cur.lastrowid, ts), nuevas)
+                return cur.lastrowid
+            cambios = []
+            for k, fila in nuevas.items():
+                antes = previo.get(k)
+                if antes is None: cambios.append((*k, FILA, None, "1")); antes = {}
+                elif antes == fila: continue
+                for col, v in fila.items():
+                    if col == 'Observaciones' and v is None and not completo: continue
+                    if not _igual(col, antes.get(col), v):
+                        cambios.append((*k, col, json.dumps(antes.get(col), ensure_ascii=False), json.dumps(v, ensure_ascii=False)))
+            if completo: cambios += [(*k, FILA, "1", None) for k in previo.keys() - nuevas.keys()]
+            sid = None
+            if cambios:
+                ts = time.time()
+                cur = conn.execute("INSERT INTO hist_instantaneas (ts, usuario, motivo, filas, celdas) VALUES (?, ?, ?, ?, ?)",
+                                   (ts, usuario or usuario_actual(), motivo, len({c[:3] for c in cambios}), len(cambios)))
+                sid = cur.lastrowid; ultima = (sid, ts)
+                conn.executemany("INSERT INTO hist_deltas VALUES (?, ?, ?, ?, ?, ?, ?)", [(sid, *c) for c in cambios])
+                self._quizas_checkpoint(conn, sid)
+            conn.execute("COMMIT")
+            # Estado completo conocido (reemplazo total o estado cacheado): queda para el próximo guardado
+            if (completo or vigente is not None) and ultima is not None: _vigente[self.path] = (ultima, self._aplicar(previo, cambios))
+            return sid
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        finally: conn.close()
+
+    # Consultas
+
+    def _leer(self, sql, params=()):
+        if not self.existe(): return pd.DataFrame()
+        conn = self._conectar()
+        try: return pd.read_sql(sql, conn, params=list(params))
+        finally: conn.close()
+
+    def instantaneas(self):
+        df = self._leer("SELECT id, ts, usuario, motivo, filas, celdas, checkpoint FROM hist_instantaneas ORDER BY id")
+        if not df.empty: df.insert(1, 'Fecha', pd.to_datetime(df.pop('ts'), unit='s', utc=True).dt.tz_convert(None).dt.round('s'))
+        return df
+
+    def ultima(self):
+        if not self.existe(): return None
+        conn = self._conectar()
+        try: return conn.execute("SELECT MAX(id) FROM hist_instantaneas").fetchone()[0]
+        finally: conn.close()
+
+    def instantanea_en(self, fecha):
+        # Última instantánea registrada hasta `fecha` (None si no hay)
+        if not self.existe(): return None
+        conn = self._conectar()
+        try: return conn.execute("SELECT MAX(id) FROM hist_instantaneas WHERE ts <= ?", (_fecha(fecha),)).fetchone()[0]
+        finally: conn.close()
+
+    def cambios(self, centro=None, year=None, month=None, columna=None):
+        # Auditoría: cambios por celda con fecha, usuario y motivo (más recientes primero)
+        filtros, params = [], []
+        for col, val in [('d."Centro"', centro), ('d."Año"', year), ('d."Mes"', month), ('d.columna', columna)]:
+            if val is not None: filtros.append(f"{col} = ?"); params.append(val.item() if hasattr(val, 'item') else val)
+        where = f" WHERE {' AND '.join(filtros)}" if filtros else ""
+        df = self._leer(f'''SELECT d.instantanea AS "Instantánea", i.ts, i.usuario AS "Usuario", i.motivo AS "Motivo", d."Centro", d."Año",
+                               d."Mes", d.columna AS "Columna", d.anterior AS "Anterior", d.valor AS "Valor"
+                            FROM hist_deltas d JOIN hist_instantaneas i ON i.id = d.instantanea{where}
+                            ORDER BY d.instantanea DESC, d.rowid''', params)
+        if df.empty: return df
+        df.insert(1, 'Fecha', pd.to_datetime(df.pop('ts'), unit='s', utc=True).dt.tz_convert(None).dt.round('s'))
+        for c in ['Anterior', 'Valor']: df[c] = [json.loads(v) if isinstance(v, str) else None for v in df[c]]
+        df.loc[df['Columna'] == FILA, 'Columna'] = "(fila)"
+        return df
+
+    @medido('historial.estado')
+    def estado(self, instantanea=None, fecha=None):
+        # Base completa tal como quedó en esa instantánea (o en la fecha), con las columnas del almacén
+        if fecha is not None:
+            instantanea = self.instantanea_en(fecha)
+            if instantanea is None: raise ValueError(f"Sin instantáneas hasta {fecha}")
+        if not self.existe(): return pd.DataFrame(columns=CLAVE + _columnas())
+        conn = self._conectar()
+        try: estado = self._reconstruir(conn, instantanea)
+        finally: conn.close()
+        df = pd.DataFrame([{'Centro': c, 'Año': y, 'Mes': m, **fila} for (c, y, m), fila in estado.items()],
+                          columns=CLAVE + _columnas())
+        if df.empty: return df
+        orden = df.assign(_m=df['Mes'].map(MES_IDX).fillna(99)).sort_values(['Centro', 'Año', '_m'], kind='stable').index
+        return df.loc[orden].reset_index(drop=True)
+
+    def compactar(self, antes_de=None):
+        # Checkpoint en la última instantánea (o en `antes_de`, descartando lo anterior: los
+        # cambios previos dejan de poder auditarse o reconstruirse). Devuelve el id del checkpoint
+        conn = self._transaccion()
+        try:
+            sid = int(antes_de) if antes_de is not None else conn.execute("SELECT MAX(id) FROM hist_instantaneas").fetchone()[0]
+            if sid is None: conn.execute("COMMIT"); return None
+            if self._checkpoint(conn, sid) != sid: self._escribir_checkpoint(conn, sid, self._reconstruir(conn, sid))
+            if antes_de is not None:
+                conn.execute("DELETE FROM hist_deltas WHERE instantanea <= ?", (sid,))
+                conn.execute("DELETE FROM hist_filas WHERE checkpoint < ?", (sid,))
+                conn.execute("DELETE FROM hist_instantaneas WHERE id < ?", (sid,))
+            conn.execute("COMMIT")
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        finally: conn.close()
+        if antes_de is not None:
+            conn = self._conectar(); conn.execute("VACUUM"); conn.close()
+        return sid
+
+    # Informes emitidos: período, metas y factor HHT con la instantánea vigente al emitirlos
+
+    def registrar_informe(self, centro, year, month, metas, factor_base=210, instantanea=None, datos=None):
+        # datos: filas con las que se generó el informe (su año; las del centro o todas si es
+        # consolidado). Se comparan con la última instantánea en la misma transacción: si otro
+        # usuario guardó esas filas entre medio, ConflictoVersion (el informe no se regeneraría igual)
+        self.crear()
+        conn = self._transaccion()
+        try:
+            if instantanea is None: instantanea = conn.execute("SELECT COALESCE(MAX(id), 0) FROM hist_instantaneas").fetchone()[0]
+            if datos is not None: self._verificar(conn, datos, centro, int(year))
+            cur = conn.execute('INSERT INTO hist_informes (ts, instantanea, usuario, "Centro", "Año", "Mes", metas, factor) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                               (time.time(), int(instantanea), usuario_actual(), None if centro is None else str(centro), int(year), month,
+                                json.dumps(dict(metas)), float(factor_base)))
+            conn.execute("COMMIT")
+            return cur.lastrowid
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        finally: conn.close()
+
+    def _verificar(self, conn, datos, centro, year):
+        # Columnas de entrada (los índices dependen del factor, que se guarda aparte)
+        from sst.storage import ConflictoVersion
+        cols = [c for c in _columnas() if c in datos.columns and c not in COLS_DERIVADAS]
+        datos = datos[datos['Año'] == year]
+        if centro is not None: datos = datos[datos['Centro'] == centro]
+        sesion = _filas(datos, cols)
+        vigente = self._reconstruir(conn, pares=None if centro is None else [(str(centro), year)])
+        vigente = {k: v for k, v in vigente.items() if k[1] == year and (centro is None or k[0] == str(centro))}
+        def igual(c, a, b): return (a or "") == (b or "") if c == 'Observaciones' else _igual(c, a, b)
+        distintas = [k for k in sesion.keys() | vigente.keys()
+                     if k not in sesion or k not in vigente or not all(igual(c, vigente[k].get(c), sesion[k][c]) for c in cols)]
+        if distintas: raise ConflictoVersion(sorted(distintas, key=lambda k: (k[0], MES_IDX.get(k[2], 99))))
+
+    def informes(self):
+        df = self._leer('SELECT id, ts, instantanea, usuario, "Centro", "Año", "Mes", metas, factor FROM hist_informes ORDER BY id DESC')
+        if not df.empty: df.insert(1, 'Fecha', pd.to_datetime(df.pop('ts'), unit='s', utc=True).dt.tz_convert(None).dt.round('s'))
+        return df
+
+    def parametros_informe(self, informe_id):
+        # Argumentos de generar_reporte_pdf con la base reconstruida en la instantánea del informe
+        from sst.agregados import IndiceAcumulado
+        from sst.kpi import procesar_datos, resumen_periodo
+        from sst.storage import reparar_estructura
+        fila = self._leer('SELECT instantanea, "Centro", "Año", "Mes", metas, factor FROM hist_informes WHERE id = ?', (int(informe_id),))
+        if fila.empty: raise ValueError(f"No existe el informe {informe_id}")
+        sid, centro, year, month, metas, factor = fila.iloc[0]
+        centro = None if pd.isna(centro) else centro
+        df = procesar_datos(reparar_estructura(self.estado(int(sid))), float(factor))
+        row_mes, acum, gestion = resumen_periodo(df, int(year), month, indice=IndiceAcumulado(df), centro=centro)
+        return {'row_mes': row_mes, 'acum': acum, 'gestion': gestion, 'metas': json.loads(metas), 'sel_month': month,
+                'sel_year': int(year), 'centro': row_mes.get('Centro', centro)}
+
+def _mudar_tablas(origen, destino):
+    # Tablas hist_* que versiones anteriores dejaban dentro de la base SQLite: se copian al
+    # archivo del historial y se eliminan de la base (una revisión por ruta y proceso)
+    if origen in _mudados or not os.path.exists(origen): return
+    with bloqueo_escritura(destino):
+        conn = sqlite3.connect(origen, timeout=30)
+        try:
+            tablas = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'hist!_%' ESCAPE '!'")]
+            if tablas:
+                Historial(destino).crear()
+                conn.isolation_level = None
+                conn.execute("ATTACH DATABASE ? AS destino", (destino,))
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for t in tablas:
+                        conn.execute(f"INSERT OR IGNORE INTO destino.{t} SELECT * FROM main.{t}")
+                        conn.execute(f"DROP TABLE main.{t}")
+                    conn.execute("COMMIT")
+                except:
+                    conn.execute("ROLLBACK")
+                    raise
+        finally: conn.close()
+    _mudados.add(origen)
+
+def abrir_historial(almacen=None):
+    from sst.storage import AlmacenSQLite, abrir_almacen
+    almacen = almacen or abrir_almacen()
+    path = os.path.splitext(os.path.abspath(almacen.path).rstrip('/\\'))[0] + '_historial.db'
+    if isinstance(almacen, AlmacenSQLite): _mudar_tablas(os.path.abspath(almacen.path), path)
+    return Historial(path)
+
+@contextmanager
+def escritura(almacen):
+    # Envuelve una escritura en el almacén: cerrojo del historial (orden de instantáneas =
+    # orden de escrituras) y estado inicial la primera vez. Entrega el Historial (None si está desactivado)
+    if not ACTIVO: yield None; return
+    hist = abrir_historial(almacen)
+    with bloqueo_escritura(hist.path):
+        hist.iniciar(almacen)
+        yield hist
+
+def registrar_informe(centro, year, month, metas, factor_base=210, almacen=None, datos=None):
+    # Informe emitido sobre la base vigente (si el historial aún no existe, parte con su estado).
+    # Con `datos` (las filas impresas) verifica que coincidan con la instantánea registrada.
+    # Devuelve el id del informe (None con el historial desactivado o sin base)
+    from sst.storage import abrir_almacen
+    almacen = almacen or abrir_almacen()
+    if not ACTIVO or not almacen.existe(): return None
+    with escritura(almacen) as hist: return hist.registrar_informe(centro, year, month, metas, factor_base, datos=datos)
+
+def regenerar_informe(informe_id, almacen=None, **kwargs):
+    # PDF del informe tal como se emitió (datos de su instantánea, mismas metas y factor)
+    from sst.pdf import generar_reporte_pdf
+    return generar_reporte_pdf(**abrir_historial(almacen).parametros_informe(informe_id), **kwargs)
+
+def restaurar(instantanea, almacen=None, factor_base=210, intentos=3):
+    # Vuelve la base al estado de esa instantánea (queda registrado como una instantánea nueva).
+    # Cada fila lleva la versión leída, y las que se eliminan (no estaban en la instantánea) también:
+    # save_data las verifica en su misma sección crítica; si otro usuario escribió entre la
+    # lectura y el guardado se relee y reintenta.
+    # Las versiones por fila siguen subiendo: las sesiones con datos anteriores reciben conflicto
+    from sst.schema import COL_VERSION
+    from sst.storage import ConflictoVersion, abrir_almacen, reparar_estructura, save_data
+    almacen = almacen or abrir_almacen()
+    df = reparar_estructura(abrir_historial(almacen).estado(int(instantanea)))
+    claves = list(zip(df['Centro'].astype(str), df['Año'].astype(int), df['Mes'])); en_df = set(claves)
+    for intento in range(intentos):
+        vigentes = almacen.versiones()
+        df[COL_VERSION] = [int(vigentes.get(k, 0)) for k in claves]
+        eliminadas = {k: v for k, v in vigentes.items() if k not in en_df}
+        try: return save_data(df, factor_base, almacen, motivo=f"restaurar instantánea {int(instantanea)}", eliminadas=eliminadas)
+        except ConflictoVersion:
+            if intento == intentos - 1: raise
@@ -0,0 +1,262 @@
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from sst.schema import CENTRO_DEFECTO, MESES_ORDEN, get_structure_for_year
+
+# --- IMPORTACIÓN MASIVA (EXCEL / CSV) ---
+# Lee exportaciones de la mutual o de RR.HH. por bloques (memoria acotada al tamaño
+# del bloque), reconoce sus columnas por nombre, valida cada fila con chequeos
+# vectorizados y agrega por (centro, año, mes). Las filas con error se informan
+# y se descartan sin detener el lote. Las válidas se escriben con un solo upsert.
+#
+# Archivos de detalle (una fila por trabajador, p. ej. remuneraciones/ausentismo):
+# las horas se suman y, si no viene 'Masa Laboral' pero sí un identificador de
+# trabajador (RUT), la masa del mes es la cantidad de trabajadores distintos.
+
+BLOQUE = 50_000
+MAX_ERRORES = 10_000  # detalle guardado; el conteo de filas con error es siempre completo
+COLS_CLAVE = ['Centro', 'Año', 'Mes']
+TRABAJADOR = '_trabajador'
+FECHA = '_fecha'
+
+def _normalizar(txt):
+    txt = unicodedata.normalize('NFKD', str(txt)).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', ' ', txt.lower()).strip()
+
+# Nombres alternativos frecuentes en planillas de mutualidades y remuneraciones
+ALIAS = {
+    'Centro': ['centro', 'centro de trabajo', 'faena', 'sucursal', 'planta', 'obra', 'sede'],
+    'Año': ['ano', 'anio', 'year', 'periodo ano'],
+    'Mes': ['mes', 'month', 'periodo mes'],
+    FECHA: ['fecha', 'periodo', 'fecha periodo', 'mes ano'],
+    TRABAJADOR: ['rut', 'rut trabajador', 'trabajador', 'id trabajador', 'empleado', 'ficha'],
+    'Masa Laboral': ['trabajadores', 'n trabajadores', 'no trabajadores', 'numero de trabajadores', 'dotacion', 'masa'],
+    'Horas Extras': ['horas extra', 'hh extras', 'he', 'sobretiempo', 'horas sobretiempo'],
+    'Horas Ausentismo': ['ausentismo', 'horas ausencia', 'hh ausentismo', 'horas licencia', 'horas ausentes'],
+    'Accidentes CTP': ['accidentes', 'accidentes con tiempo perdido', 'n accidentes', 'accidentes ctp'],
+    'Días Perdidos': ['dias perdidos accidentes', 'dias perdidos acc', 'dias perdidos at'],
+    'Días Perdidos EP': ['dias perdidos enfermedad', 'dias perdidos ep'],
+    'Enf. Profesionales': ['enfermedades profesionales', 'ep', 'n enfermedades profesionales'],
+}
+
+_MESES = {**{_normalizar(m): m for m in MESES_ORDEN}, **{_normalizar(m)[:3]: m for m in MESES_ORDEN},
+          **{str(i + 1): m for i, m in enumerate(MESES_ORDEN)}, **{f"{i + 1:02d}": m for i, m in enumerate(MESES_ORDEN)},
+          'setiembre': 'Septiembre', 'set': 'Septiembre'}
+
+# Pares (ejecutadas, programadas): lo ejecutado no puede superar lo programado
+PARES = [('Insp. Ejecutadas', 'Insp. Programadas'), ('Cap. Ejecutadas', 'Cap. Programadas'),
+         ('Medidas Cerradas', 'Medidas Abiertas'), ('Vig. Salud Vigente', 'Expuestos Silice/Ruido')]
+
+def columnas_numericas():
+    from sst.kpi import COLS_DERIVADAS, COLS_NO_NUMERICAS
+    return [c for c in get_structure_for_year(2026).columns if c not in COLS_NO_NUMERICAS + COLS_DERIVADAS]
+
+def mapear_columnas(columnas):
+    # {columna del archivo: columna del esquema}; primero el nombre exacto del esquema, luego los alias.
+    # Columnas no reconocidas (y las calculadas: HHT, tasas) se ignoran
+    destino = {_normalizar(c): c for c in columnas_numericas() + ['Centro', 'Año', 'Mes', 'Observaciones']}
+    for col, alias in ALIAS.items():
+        for a in alias: destino.setdefault(a, col)
+    mapa, usadas = {}, set()
+    for c in columnas:
+        d = destino.get(_normalizar(c))
+        if d and d not in usadas: mapa[c] = d; usadas.add(d)
+    return mapa
+
+# --- LECTURA POR BLOQUES ---
+
+def _es_excel(nombre):
+    return str(nombre).lower().endswith(('.xlsx', '.xlsm'))
+
+def _bloques_excel(origen, tamano):
+    from openpyxl import load_workbook
+    wb = load_workbook(origen, read_only=True, data_only=True)
+    try:
+        filas = wb.worksheets[0].iter_rows(values_only=True)
+        encabezado = [str(c) if c is not None else f"col_{i}" for i, c in enumerate(next(filas, []))]
+        lote = []
+        for fila in filas:
+            lote.append(fila)
+            if len(lote) == tamano:
+                yield pd.DataFrame(lote, columns=encabezado); lote = []
+        if lote: yield pd.DataFrame(lote, columns=encabezado)
+    finally: wb.close()
+
+def _separador(origen):
+    # ';' en planillas exportadas con configuración regional en español, ',' en el resto
+    if hasattr(origen, 'read'):
+        pos = origen.tell(); muestra = origen.read(65536); origen.seek(pos)
+    else:
+        with open(origen, 'rb') as f: muestra = f.read(65536)
+    if isinstance(muestra, bytes): muestra = muestra.decode('utf-8', 'replace')
+    linea = muestra.splitlines()[0] if muestra else ""
+    return max([',', ';', '\t', '|'], key=linea.count)
+
+def _bloques_csv(origen, tamano):
+    # Todo se lee como texto y se convierte de forma vectorizada en validar_bloque
+    with pd.read_csv(origen, sep=_separador(origen), dtype=str, chunksize=tamano,
+                     encoding_errors='replace', skipinitialspace=True) as lector:
+        yield from lector
+
+def leer_bloques(origen, nombre=None, tamano=BLOQUE):
+    # origen: ruta o archivo binario (p. ej. el de st.file_uploader); nombre decide el formato
+    nombre = nombre or getattr(origen, 'name', None) or str(origen)
+    return _bloques_excel(origen, tamano) if _es_excel(nombre) else _bloques_csv(origen, tamano)
+
+# --- VALIDACIÓN VECTORIZADA ---
+
+def _numero(s):
+    # Acepta '1.234,5' (formato local) y '1234.5'; vacío = 0. Devuelve (valores, inválidos)
+    if pd.api.types.is_numeric_dtype(s):
+        return s.fillna(0).astype('float64'), pd.Series(False, index=s.index)
+    txt = s.astype('string').str.strip()
+    vacio = txt.isna() | (txt == "")
+    coma = txt.str.contains(',', regex=False).fillna(False).astype(bool)
+    txt = txt.where(~coma, txt.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    num = pd.to_numeric(txt, errors='coerce').astype('float64')
+    return num.fillna(0.0), (num.isna() & ~vacio).astype(bool)
+
+def _fecha(s):
+    # Formato por valor ('mixed'): la primera fila no fija el de las demás. Día primero
+    # (05/03/2025), salvo las ISO (2025-03-10, también celdas fecha de Excel), que con
+    # dayfirst se leerían como 3 de octubre
+    txt = s.astype('string').str.strip()
+    iso = txt.str.match(r'\d{4}-\d{1,2}-\d{1,2}').fillna(False).astype(bool)
+    fecha = pd.to_datetime(txt.where(~iso), errors='coerce', dayfirst=True, format='mixed')
+    if iso.any(): fecha[iso] = pd.to_datetime(txt[iso], errors='coerce', format='ISO8601')
+    return fecha
+
+def validar_bloque(bloque, mapa, centro=None, inicio=0, factor_base=210):
+    # Devuelve (filas válidas con columnas del esquema, lista de errores (fila, columna, mensaje)).
+    # `inicio`: filas del archivo ya leídas (para numerar errores como en la planilla)
+    n = len(bloque)
+    df = pd.DataFrame(index=pd.RangeIndex(n))
+    errores = []; malas = np.zeros(n, dtype=bool)
+
+    def marcar(mask, columna, mensaje):
+        mask = np.asarray(mask, dtype=bool)
+        if not mask.any(): return
+        nonlocal malas
+        malas |= mask
+        errores.extend((inicio + int(i) + 2, columna, mensaje) for i in np.flatnonzero(mask))  # +2: encabezado y base 1
+
+    datos = {d: bloque[c].reset_index(drop=True) for c, d in mapa.items()}
+
+    # Centro
+    if 'Centro' in datos:
+        cen = datos['Centro'].astype('string').str.strip()
+        df['Centro'] = cen.fillna("").replace("", centro or CENTRO_DEFECTO).astype(str)
+    else: df['Centro'] = centro or CENTRO_DEFECTO
+
+    # Período: Año + Mes, o una fecha
+    if 'Año' in datos or 'Mes' in datos:
+        anio, anio_malo = _numero(datos.get('Año', pd.Series(np.nan, index=df.index)))
+        mes_txt = datos.get('Mes', pd.Series("", index=df.index)).astype('string').str.replace(r'\.0$', '', regex=True)
+        mes = mes_txt.map({m: _MESES.get(_normalizar(m)) for m in mes_txt.dropna().unique()})  # solo valores distintos
+    elif FECHA in datos:
+        fecha = _fecha(datos[FECHA])
+        anio = fecha.dt.year.astype('float64').fillna(0.0); anio_malo = fecha.isna()
+        mes = fecha.dt.month.map(lambda m: MESES_ORDEN[int(m) - 1] if m == m else None)
+    else:
+        raise ValueError("El archivo no trae columnas de período (Año y Mes, o Fecha)")
+    marcar(anio_malo | (anio < 2000) | (anio > 2100) | (anio != np.floor(anio)), 'Año', "Año inválido")
+    marcar(mes.isna(), 'Mes', "Mes no reconocido")
+    df['Año'] = anio.astype('int64'); df['Mes'] = mes.astype(object)
+
+    # Cantidades: numéricas y no negativas
+    for col in columnas_numericas():
+        if col not in datos: continue
+        valores, invalidos = _numero(datos[col])
+        marcar(invalidos, col, "No es un número")
+        marcar(valores < 0, col, "Valor negativo")
+        df[col] = valores.to_numpy()
+
+    # Coherencia entre columnas
+    for ejecutadas, programadas in PARES:
+        if ejecutadas in df and programadas in df:
+            marcar(df[ejecutadas] > df[programadas], ejecutadas, f"{ejecutadas} > {programadas}")
+    if 'Horas Ausentismo' in df and 'Masa Laboral' in df:
+        # Solo si el archivo trae la masa: sin ella (totales por centro, detalle por trabajador)
+        # la masa del mes es la ya guardada o la de trabajadores distintos, no la de la fila
+        masa = df['Masa Laboral']
+        extras = df['Horas Extras'] if 'Horas Extras' in df else 0.0
+        hht = (masa * factor_base) + extras - df['Horas Ausentismo']
+        marcar(hht < 0, 'Horas Ausentismo', "HHT negativa: ausentismo mayor que las horas disponibles")
+    if 'Observaciones' in datos: df['Observaciones'] = datos['Observaciones'].astype('string').fillna("").astype(str)
+    if TRABAJADOR in datos: df[TRABAJADOR] = datos[TRABAJADOR].astype('string').str.strip().fillna("").astype(str)
+    return df[~malas].reset_index(drop=True), errores
+
+# --- AGREGACIÓN POR MES ---
+
+class _Acumulador:
+    # Sumas parciales por (centro, año, mes) de cada bloque; trabajadores distintos
+    # como hashes de 64 bits (no se guardan los RUT)
+    def __init__(self):
+        self.partes = []; self.trabajadores = []; self.obs = []
+
+    def agregar(self, df):
+        if df.empty: return
+        nums = [c for c in df.columns if c not in COLS_CLAVE + ['Observaciones', TRABAJADOR]]
+        if nums: self.partes.append(df.groupby(COLS_CLAVE, sort=False)[nums].sum())
+        if TRABAJADOR in df:
+            k = pd.util.hash_pandas_object(df[COLS_CLAVE], index=False).to_numpy()
+            h = pd.DataFrame({'k': k, 't': pd.util.hash_pandas_object(df[TRABAJADOR], index=False).to_numpy()}).drop_duplicates()
+            claves = df[COLS_CLAVE].assign(k=k).drop_duplicates('k')
+            self.trabajadores.append((h, claves))
+        if 'Observaciones' in df:
+            con = df[df['Observaciones'] != ""]
+            if not con.empty: self.obs.append(con.groupby(COLS_CLAVE, sort=False)['Observaciones'].agg("; ".join))
+
+    def resultado(self):
+        partes = [pd.concat(self.partes).groupby(level=[0, 1, 2], sort=False).sum()] if self.partes else []
+        if self.trabajadores:
+            h = pd.concat([x for x, _ in self.trabajadores]).drop_duplicates()
+            claves = pd.concat([c for _, c in self.trabajadores]).drop_duplicates('k').set_index('k')
+            masa = claves.assign(**{'Masa Laboral': h.groupby('k').size()}).set_index(COLS_CLAVE)['Masa Laboral'].astype('float64')
+            if not partes or 'Masa Laboral' not in partes[0]: partes = [p.join(masa, how='outer') for p in partes] or [masa.to_frame()]
+        if not partes: return pd.DataFrame(columns=COLS_CLAVE)
+        out = partes[0]
+        if self.obs:
+            obs = pd.concat(self.obs).groupby(level=[0, 1, 2], sort=False).agg("; ".join)
+            out = out.join(obs.rename('Observaciones'), how='outer')
+        return out.reset_index()
+
+def preparar_importacion(origen, nombre=None, centro=None, tamano=BLOQUE, factor_base=210):
+    # Lee, valida y agrega sin escribir. Devuelve (filas por mes, resumen)
+    acumulador = _Acumulador(); errores = []
+    resumen = {'filas_leidas': 0, 'filas_validas': 0, 'filas_con_error': 0, 'columnas': {}}
+    mapa = None
+    for bloque in leer_bloques(origen, nombre, tamano):
+        if mapa is None:
+            mapa = mapear_columnas(bloque.columns); resumen['columnas'] = dict(mapa)
+        validas, errs = validar_bloque(bloque, mapa, centro, resumen['filas_leidas'], factor_base)
+        resumen['filas_leidas'] += len(bloque); resumen['filas_validas'] += len(validas)
+        resumen['filas_con_error'] += len(bloque) - len(validas)
+        if len(errores) < MAX_ERRORES: errores.extend(errs[:MAX_ERRORES - len(errores)])
+        acumulador.agregar(validas)
+    agregado = acumulador.resultado()
+    resumen['meses'] = len(agregado); resumen['errores'] = errores
+    return agregado, resumen
+
+def errores_csv(resumen):
+    return pd.DataFrame(resumen['errores'], columns=['Fila', 'Columna', 'Error']).to_csv(index=False).encode('utf-8')
+
+# --- ESCRITURA ---
+
+def aplicar_importacion(agregado, almacen, factor_base=210, intentos=3):
+    # Fusiona los meses importados con lo vigente (las columnas no importadas se conservan)
+    # y los escribe en un único upsert con verificación de versión
+    from sst.storage import fusionar_meses
+    if agregado.empty: return 0
+    pares = agregado[['Centro', 'Año']].drop_duplicates().itertuples(index=False, name=None)
+    return fusionar_meses(almacen, pares, agregado, factor_base, intentos, motivo="importación")
+
+def importar(origen, almacen=None, nombre=None, centro=None, factor_base=210, tamano=BLOQUE):
+    from sst.storage import abrir_almacen
+    almacen = almacen or abrir_almacen()
+    agregado, resumen = preparar_importacion(origen, nombre, centro, tamano, factor_base)
+    resumen['filas_escritas'] = aplicar_importacion(agregado, almacen, factor_base)
+    return resumen
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from sst.compacto import asignar
+
+# --- SEGUIMIENTO DE FILAS MODIFICADAS ---
+# Las ediciones se registran por fila; al guardar solo esas filas recalculan HHT e
+# índices (calcular_derivados), se escriben (upsert) y actualizan el índice de
+# acumulados de su año. El costo de guardar no depende del tamaño del histórico.
+
+def diferencias(df, editado, cols=None):
+    # {etiqueta: {columna: valor}} solo con las celdas de `editado` (filas de df con sus
+    # mismas etiquetas) que difieren de df. Comparación vectorizada por columna; vacíos
+    # numéricos cuentan como 0 (igual que limpiar_tipos)
+    cols = [c for c in (cols or editado.columns) if c in df.columns]
+    antes = df.loc[editado.index, cols]
+    cambios = {}
+    for c in cols:
+        if pd.api.types.is_numeric_dtype(antes[c]):
+            nuevo = pd.to_numeric(editado[c], errors='coerce').fillna(0.0)
+            distinto = ~np.isclose(antes[c].to_numpy(dtype='float64'), nuevo.to_numpy(dtype='float64'), rtol=0, atol=1e-9)
+        else:
+            nuevo = editado[c].fillna("").astype(str)
+            distinto = antes[c].fillna("").astype(str).to_numpy() != nuevo.to_numpy()
+        for idx, v in zip(editado.index[distinto], nuevo[distinto]):
+            cambios.setdefault(idx, {})[c] = v.item() if hasattr(v, 'item') else v
+    return cambios
+
+class RegistroCambios:
+    def __init__(self):
+        self.filas = []
+        self.textos = {}  # {etiqueta: {columna: valor}} de columnas que df no lleva (Observaciones)
+
+    def editar(self, df, idx, valores):
+        # Escribe solo las celdas que cambian y marca la fila. Las columnas que df no lleva
+        # (tabla compacta: Observaciones se guarda aparte) quedan en self.textos; quien
+        # llama solo las incluye si cambiaron
+        cambios = {col: v for col, v in valores.items() if col not in df.columns or df.at[idx, col] != v}
+        for col, v in cambios.items():
+            if col in df.columns: asignar(df, idx, col, v)
+            else: self.textos.setdefault(idx, {})[col] = v
+        if cambios: self.marcar(idx)
+        return cambios
+
+    def editar_tabla(self, df, editado, cols=None, referencia=None):
+        # Aplica una grilla editada: solo las filas con alguna celda distinta se escriben y
+        # se marcan; el resto no se toca. referencia: la vista mostrada, si trae columnas
+        # que df no lleva. Devuelve el número de celdas cambiadas
+        cambios = diferencias(df if referencia is None else referencia, editado, cols)
+        return sum(len(self.editar(df, idx, valores)) for idx, valores in cambios.items())
+
+    def marcar(self, *filas):
+        for idx in filas:
+            if idx not in self.filas: self.filas.append(idx)
+
+    def meses(self, df):
+        return sorted({(int(y), m) for y, m in zip(df.loc[self.filas, 'Año'], df.loc[self.filas, 'Mes'])})
+
+    def __bool__(self):
+        return bool(self.filas)
+
+    def limpiar(self):
+        self.filas = []; self.textos = {}
@@ -0,0 +1,20 @@
+# --- ANÁLISIS AUTOMÁTICO ---
+# Las reglas están en sst.alertas (las mismas de la tabla de alertas de la cartera);
+# acum y gestion, si se pasan, suman las reglas de TS/IF acumulados y de gestión.
+# sst.alertas (pandas) se importa al usarse: importar sst.pdf no carga pandas
+
+def generar_insight_automatico(row_mes, ta_acum, metas, acum=None, gestion=None):
+    from sst.alertas import NIVELES, REGLAS, alertas_fila
+    reglas = {r['id']: r for r in REGLAS}
+    alertas = alertas_fila(row_mes, {**(acum or {}), 'ta_acum': ta_acum}, gestion or {}, metas)
+    insights = [f"{NIVELES[n][0]} <b>{reglas[r].get('titulo', NIVELES[n][1])}:</b> {m}"
+                for n, r, m in zip(alertas['Nivel'], alertas['Regla'], alertas['Mensaje'])]
+    if not insights: return "Sin desviaciones."
+    return "<br>".join(insights)
+
+def insight_a_texto(insight_text):
+    # Versión texto plano (PDF) del análisis HTML
+    from sst.alertas import NIVELES
+    texto = insight_text.replace("<b>","").replace("</b>","").replace("<br>","\n")
+    for icono, _ in NIVELES.values(): texto = texto.replace(icono + " ", "").replace(icono, "")
+    return texto
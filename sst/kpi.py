@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+from sst.medicion import medido
+
+# --- MOTOR KPI VECTORIZADO ---
+# Calcula HHT y los 4 indicadores DS67 columna a columna (una sola pasada),
+# con división enmascarada: filas con masa <= 0 o HHT <= 0 quedan en 0.
+
+COLS_NO_NUMERICAS = ['Centro', 'Año', 'Mes', 'Observaciones']
+
+def limpiar_tipos(df):
+    # Solo se convierten las columnas que no son numéricas; las numéricas solo rellenan NaN
+    for col in df.columns:
+        if col in COLS_NO_NUMERICAS: continue
+        s = df[col]
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            if s.hasnans: df[col] = s.fillna(0)
+        else:
+            df[col] = pd.to_numeric(s, errors='coerce').fillna(0)
+    return df
+
+def calcular_hht(masa, extras, ausentismo, factor_base=210):
+    # Fórmula Mutual: (Trabajadores * factor) + Extras - Ausentismo, sin negativos
+    hht = (masa * factor_base) + extras - ausentismo
+    return np.where(hht > 0, hht, 0.0)
+
+def calcular_indices(masa, hht, acc, dias, dias_cargo):
+    masa = np.asarray(masa, dtype='float64'); hht = np.asarray(hht, dtype='float64')
+    acc = np.asarray(acc, dtype='float64'); dias = np.asarray(dias, dtype='float64')
+    dias_cargo = np.asarray(dias_cargo, dtype='float64')
+    ok = (masa > 0) & (hht > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ta = np.where(ok, (acc / masa) * 100, 0.0)
+        ts = np.where(ok, (dias / masa) * 100, 0.0)
+        if_ = np.where(ok, (acc * 1000000) / hht, 0.0)
+        ig = np.where(ok, ((dias + dias_cargo) * 1000000) / hht, 0.0)
+    return ta, ts, if_, ig
+
+@medido('kpi.procesar_datos')
+def procesar_datos(df, factor_base=210):
+    from sst.schema import CENTRO_DEFECTO
+    # Limpieza de tipos
+    limpiar_tipos(df)
+    if 'Centro' not in df.columns: df.insert(0, 'Centro', CENTRO_DEFECTO)
+    df['Centro'] = df['Centro'].fillna("").astype(str).replace("", CENTRO_DEFECTO)
+    df['Año'] = df['Año'].fillna(2026).astype(int)
+    # Sin columna Observaciones (tabla compacta, sst.compacto) no se agrega
+    if 'Observaciones' in df.columns: df['Observaciones'] = df['Observaciones'].fillna("").astype(str)
+
+    # CÁLCULOS CRÍTICOS (HHT BASE 210)
+    return calcular_derivados(df, factor_base)
+
+COLS_DERIVADAS = ['HHT', 'Tasa Acc.', 'Tasa Sin.', 'Indice Frec.', 'Indice Grav.']
+
+def columnas_entrada(df):
+    # Columnas que carga el usuario: ni claves, ni calculadas, ni la versión de fila
+    from sst.schema import COL_VERSION
+    return [c for c in df.columns if c not in COLS_NO_NUMERICAS + COLS_DERIVADAS + [COL_VERSION]] + ['Observaciones']
+
+@medido('kpi.calcular_derivados')
+def calcular_derivados(df, factor_base=210, filas=None):
+    # HHT + 4 índices. Con `filas` (etiquetas del índice) solo se recalculan esas filas;
+    # asume tipos ya limpios (procesar_datos) en el resto de la tabla
+    base = df if filas is None else df.loc[list(filas), ['Masa Laboral', 'Horas Extras', 'Horas Ausentismo',
+                                                         'Accidentes CTP', 'Días Perdidos', 'Días Cargo']].astype('float64')
+    hht = calcular_hht(base['Masa Laboral'].to_numpy(), base['Horas Extras'].to_numpy(),
+                       base['Horas Ausentismo'].to_numpy(), factor_base)
+    ta, ts, if_, ig = calcular_indices(base['Masa Laboral'].to_numpy(), hht,
+                                       base['Accidentes CTP'].to_numpy(), base['Días Perdidos'].to_numpy(),
+                                       base['Días Cargo'].to_numpy())
+    if filas is None:
+        df['HHT'] = hht
+        df['Tasa Acc.'] = ta
+        df['Tasa Sin.'] = ts
+        df['Indice Frec.'] = if_
+        df['Indice Grav.'] = ig
+    else:
+        # Columna a columna, al tipo de cada una (en la tabla compacta los índices son float32)
+        for c, v in zip(COLS_DERIVADAS, [hht, ta, ts, if_, ig]): df.loc[base.index, c] = v.astype(df[c].dtype, copy=False)
+    return df
+
+# --- CONSOLIDADO MULTI-CENTRO ---
+
+def consolidar(df):
+    # Una fila por (año, mes) con todos los centros: se suman las cantidades (la masa
+    # laboral del mes es la suma de las masas de cada centro, no su promedio) y los
+    # índices se recalculan sobre los totales, no se promedian. Se suma en float64 (los
+    # conteos de la tabla compacta son int16)
+    from sst.schema import COL_VERSION, CONSOLIDADO
+    cols = [c for c in df.columns if c not in COLS_NO_NUMERICAS and c != COL_VERSION]
+    out = df[cols].astype('float64').groupby([df['Año'], df['Mes']], sort=False, observed=True).sum().reset_index()
+    if 'Observaciones' in df.columns:
+        con_obs = df[df['Observaciones'].str.strip() != ""]
+        obs = (con_obs['Centro'].astype(str) + ": " + con_obs['Observaciones']).groupby([con_obs['Año'], con_obs['Mes']], observed=True).agg("\n".join)
+        out['Observaciones'] = [obs.get((y, m), "") for y, m in zip(out['Año'], out['Mes'])]
+    out['Centro'] = CONSOLIDADO
+    ta, ts, if_, ig = calcular_indices(out['Masa Laboral'], out['HHT'], out['Accidentes CTP'],
+                                       out['Días Perdidos'], out['Días Cargo'])
+    out['Tasa Acc.'] = ta; out['Tasa Sin.'] = ts; out['Indice Frec.'] = if_; out['Indice Grav.'] = ig
+    return out.reindex(columns=df.columns)
+
+def centros(df):
+    return sorted(df['Centro'].unique()) if 'Centro' in df.columns else []
+
+# --- ACUMULADO ANUAL (MISMOS CÁLCULOS DEL DASHBOARD Y DEL PDF) ---
+
+@medido('kpi.preparar_anio')
+def preparar_anio(df, year, centro=None):
+    # centro=None: consolidado de todos los centros (con un solo centro, sus propias filas)
+    from sst.schema import MES_IDX
+    df_year = df[df['Año'] == year]
+    if centro is not None: df_year = df_year[df_year['Centro'] == centro]
+    elif 'Centro' in df_year.columns and df_year['Centro'].nunique() > 1: df_year = consolidar(df_year)
+    df_year = df_year.copy()
+    df_year['Mes_Idx'] = df_year['Mes'].map(MES_IDX).fillna(99).astype(int)
+    return df_year.sort_values('Mes_Idx')
+
+def calcular_acumulado(df_acum):
+    sum_acc = df_acum['Accidentes CTP'].sum()
+    sum_dias_acc = df_acum['Días Perdidos'].sum()
+    sum_dias_cargo = df_acum['Días Cargo'].sum()
+    sum_hht = df_acum['HHT'].sum()
+
+    df_masa_ok = df_acum[df_acum['Masa Laboral'] > 0]
+    avg_masa = df_masa_ok['Masa Laboral'].mean() if not df_masa_ok.empty else 0
+
+    return {
+        'sum_acc': sum_acc, 'sum_fatales': df_acum['Accidentes Fatales'].sum(),
+        'sum_ep': df_acum['Enf. Profesionales'].sum(),
+        'sum_dias_acc': sum_dias_acc, 'sum_dias_ep': df_acum['Días Perdidos EP'].sum(),
+        'sum_pensionados': df_acum['Pensionados'].sum(), 'sum_indemnizados': df_acum['Indemnizados'].sum(),
+        'sum_hht': sum_hht, 'sum_dias_cargo': sum_dias_cargo, 'avg_masa': avg_masa,
+        'ta_acum': (sum_acc / avg_masa * 100) if avg_masa > 0 else 0,
+        'ts_acum': (sum_dias_acc / avg_masa * 100) if avg_masa > 0 else 0,
+        'if_acum': (sum_acc * 1000000 / sum_hht) if sum_hht > 0 else 0,
+        'ig_acum': ((sum_dias_acc + sum_dias_cargo) * 1000000 / sum_hht) if sum_hht > 0 else 0,
+    }
+
+def safe_div(a, b): return (a/b*100) if b > 0 else 0
+
+def calcular_gestion(row_mes):
+    return {
+        'p_insp': safe_div(row_mes['Insp. Ejecutadas'], row_mes['Insp. Programadas']),
+        'p_cap': safe_div(row_mes['Cap. Ejecutadas'], row_mes['Cap. Programadas']),
+        'p_medidas': safe_div(row_mes['Medidas Cerradas'], row_mes['Medidas Abiertas']) if row_mes['Medidas Abiertas']>0 else 100,
+        'p_salud': safe_div(row_mes['Vig. Salud Vigente'], row_mes['Expuestos Silice/Ruido']) if row_mes['Expuestos Silice/Ruido']>0 else 100,
+    }
+
+@medido('kpi.resumen_periodo')
+def resumen_periodo(df, year, month, df_year=None, indice=None, centro=None):
+    # Devuelve (row_mes, acum, gestion) para un mes de corte de un centro (None: consolidado);
+    # con `indice` (IndiceAcumulado) el acumulado es una consulta en vez de filtrar y sumar
+    from sst.schema import MESES_ORDEN
+    if df_year is None: df_year = preparar_anio(df, year, centro)
+    row_mes = df_year[df_year['Mes'] == month].iloc[0]
+    if indice is not None: return row_mes, indice.consultar(year, month, centro), calcular_gestion(row_mes)
+    df_acum = df_year[df_year['Mes_Idx'] <= MESES_ORDEN.index(month)]
+    return row_mes, calcular_acumulado(df_acum), calcular_gestion(row_mes)
@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from sst.schema import LOGO_FILE, MES_IDX
+
+# --- INFORMES EN LOTE ---
+# Genera un PDF por (año, mes) en un pool de procesos y los va escribiendo en un
+# único ZIP a medida que terminan. Solo hay en memoria los informes en curso
+# (ventana de 2 x procesos), no el lote completo. Los procesos se inician con 'spawn'
+# (como sst.cola): el lote también se lanza desde el servidor de Streamlit, que tiene hilos.
+
+_DF = None
+_INDICE = None
+
+def _init_worker(df):
+    # Cada proceso recibe la base una sola vez y arma su propio índice de acumulados
+    global _DF, _INDICE
+    from sst.agregados import IndiceAcumulado
+    _DF = df; _INDICE = IndiceAcumulado(df)
+
+def _generar(year, month, metas, logo_file, vectorial, centro=None):
+    from sst.kpi import resumen_periodo
+    from sst.pdf import generar_reporte_pdf
+    try:
+        row_mes, acum, gestion = resumen_periodo(_DF, year, month, indice=_INDICE, centro=centro)
+        return year, month, generar_reporte_pdf(row_mes, acum, gestion, metas, month, year, logo_file=logo_file, vectorial=vectorial,
+                                                centro=row_mes.get('Centro')), None
+    except Exception as e:
+        return year, month, None, f"{type(e).__name__}: {e}"
+
+def trabajos_lote(df, years=None, centro=None):
+    # (año, mes) presentes en la base (o en un centro), en orden cronológico
+    if centro is not None: df = df[df['Centro'] == centro]
+    pares = {(int(y), m) for y, m in zip(df['Año'], df['Mes']) if m in MES_IDX and (years is None or int(y) in years)}
+    return sorted(pares, key=lambda p: (p[0], MES_IDX[p[1]]))
+
+def nombre_archivo(year, month):
+    return f"{year}/Reporte_SST_{year}_{MES_IDX[month] + 1:02d}_{month}.pdf"
+
+def generar_lote_zip(df, destino, trabajos=None, metas=None, logo_file=LOGO_FILE, vectorial=False, procesos=None, progreso=None, centro=None):
+    # destino: ruta o archivo binario. progreso(hechos, total, year, month, error) por cada informe terminado.
+    # centro: informes de ese centro; None, consolidado de todos los centros
+    if trabajos is None: trabajos = trabajos_lote(df, centro=centro)
+    if metas is None: metas = {'meta_ta': 3.0, 'meta_gestion': 90}
+    procesos = procesos or os.cpu_count() or 1
+    pendientes = list(reversed(trabajos)); total = len(trabajos); hechos = 0; errores = []
+
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as zf, \
+         ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(df,)) as pool:
+        en_curso = set()
+        while pendientes or en_curso:
+            while pendientes and len(en_curso) < 2 * procesos:
+                year, month = pendientes.pop()
+                en_curso.add(pool.submit(_generar, year, month, metas, logo_file, vectorial, centro))
+            listos, en_curso = wait(en_curso, return_when=FIRST_COMPLETED)
+            for fut in listos:
+                year, month, data, error = fut.result()
+                if error: errores.append(f"{year} {month}: {error}")
+                else: zf.writestr(nombre_archivo(year, month), data)
+                hechos += 1
+                if progreso: progreso(hechos, total, year, month, error)
+        if errores: zf.writestr("errores.txt", "\n".join(errores))
+    return hechos - len(errores), errores
@@ -0,0 +1,145 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+# --- MEDICIÓN DE TIEMPOS ---
+# Tramos (spans) alrededor de las rutas costosas: lectura de la base, procesar_datos,
+# Excel, figuras plotly, gráficos matplotlib del PDF. Cada tramo queda asociado a la
+# ejecución del script (o del fragmento) que lo contiene, se guarda en memoria para el
+# panel de rendimiento y se escribe como una línea JSON para análisis posterior:
+#   {"ts", "ejecucion", "tipo", "sesion", "tramo", "ms", "nivel", "pid"}
+#
+# Desactivado por defecto: tramo() devuelve un contexto nulo compartido y las funciones
+# con @medido solo consultan un booleano. Se activa con SST_PERF=1 (archivo en
+# SST_PERF_LOG, por defecto sst_tiempos.jsonl) o con activar().
+
+ACTIVO = os.environ.get('SST_PERF', '') not in ('', '0')
+LOG = os.environ.get('SST_PERF_LOG', 'sst_tiempos.jsonl')
+RECIENTES = deque(maxlen=20_000)
+
+_lock = threading.Lock()
+_archivo = None
+_ids = itertools.count(1)
+_ejecucion = contextvars.ContextVar('sst_ejecucion', default=None)
+_nivel = contextvars.ContextVar('sst_nivel', default=0)
+
+class _Nulo:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULO = _Nulo()
+
+def activar(log=LOG):
+    # log=None: solo en memoria (panel), sin archivo
+    global ACTIVO, LOG
+    with _lock:
+        _cerrar(); LOG = log; ACTIVO = True
+
+def desactivar():
+    global ACTIVO
+    with _lock:
+        ACTIVO = False; _cerrar()
+
+def _cerrar():
+    global _archivo
+    if _archivo is not None: _archivo.close(); _archivo = None
+
+def _registrar(nombre, ms, nivel):
+    global _archivo
+    e = _ejecucion.get()
+    r = {'ts': round(time.time(), 3), 'ejecucion': e and e['id'], 'tipo': e and e['tipo'], 'sesion': e and e['sesion'],
+         'tramo': nombre, 'ms': round(ms, 3), 'nivel': nivel, 'pid': os.getpid()}
+    with _lock:
+        RECIENTES.append(r)
+        if LOG:
+            if _archivo is None: _archivo = open(LOG, 'a', encoding='utf-8', buffering=1)
+            _archivo.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+class _Tramo:
+    __slots__ = ('nombre', 't0', 'token')
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.token = _nivel.set(_nivel.get() + 1); self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.t0) * 1000
+        nivel = _nivel.get(); _nivel.reset(self.token)
+        _registrar(self.nombre, ms, nivel)
+        return False
+
+def tramo(nombre):
+    return _Tramo(nombre) if ACTIVO else _NULO
+
+def medido(nombre):
+    # Decorador: la función completa como un tramo
+    def decorador(fn):
+        @wraps(fn)
+        def envoltura(*args, **kwargs):
+            if not ACTIVO: return fn(*args, **kwargs)
+            with _Tramo(nombre): return fn(*args, **kwargs)
+        return envoltura
+    return decorador
+
+# --- EJECUCIONES ---
+# Una ejecución agrupa los tramos de un rerun completo ('app') o de un fragmento
+# ('fragmento'); su duración total se registra como tramo de nivel 0 con el nombre del tipo
+
+def iniciar_ejecucion(tipo='app', sesion=None):
+    if not ACTIVO: return None
+    _ejecucion.set({'id': f"{os.getpid()}-{next(_ids)}", 'tipo': tipo, 'sesion': sesion, 't0': time.perf_counter()})
+    _nivel.set(0)
+    return _ejecucion.get()['id']
+
+def en_ejecucion():
+    return _ejecucion.get() is not None
+
+def terminar_ejecucion():
+    e = _ejecucion.get()
+    if e is None: return None
+    if ACTIVO: _registrar(e['tipo'], (time.perf_counter() - e['t0']) * 1000, 0)
+    _ejecucion.set(None)
+    return e['id']
+
+# --- ANÁLISIS ---
+
+def leer_log(path=None):
+    import pandas as pd
+    return pd.read_json(path or LOG, lines=True)
+
+def percentiles(registros=None):
+    # Por tramo: cantidad, total y percentiles (ms). registros: lista de dicts o DataFrame
+    import pandas as pd
+    df = pd.DataFrame(list(RECIENTES) if registros is None else registros)
+    if df.empty: return pd.DataFrame(columns=['tramo', 'n', 'total_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'])
+    g = df.groupby('tramo')['ms']
+    out = pd.DataFrame({'n': g.size(), 'total_ms': g.sum(), 'p50_ms': g.quantile(0.5), 'p95_ms': g.quantile(0.95),
+                        'p99_ms': g.quantile(0.99), 'max_ms': g.max()})
+    return out.sort_values('total_ms', ascending=False).round(2).reset_index()
+
+def ejecuciones(sesion=None, n=20):
+    # Últimas n ejecuciones (de una sesión): id, tipo, total y tramo más costoso
+    import pandas as pd
+    df = pd.DataFrame(list(RECIENTES))
+    if df.empty: return df
+    df = df[df['ejecucion'].notna() & ((df['sesion'] == sesion) if sesion is not None else True)]
+    totales = df[df['nivel'] == 0][['ejecucion', 'tipo', 'ts', 'ms']].tail(n)
+    internos = df[df['nivel'] == 1].sort_values('ms').groupby('ejecucion').tail(1).set_index('ejecucion')['tramo']
+    return totales.assign(mayor=totales['ejecucion'].map(internos)).iloc[::-1].reset_index(drop=True)
+
+def desglose(ejecucion):
+    # Tramos de una ejecución en orden de término, con % del total
+    import pandas as pd
+    df = pd.DataFrame([r for r in list(RECIENTES) if r['ejecucion'] == ejecucion])
+    if df.empty: return df
+    total = df.loc[df['nivel'] == 0, 'ms'].max() if (df['nivel'] == 0).any() else df['ms'].sum()
+    return df[['tramo', 'nivel', 'ms']].assign(pct=(df['ms'] / total * 100).round(1))
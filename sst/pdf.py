@@ -0,0 +1,214 @@
+import math
+import os
+
+from fpdf import FPDF
+
+from sst import graficos
+from sst.graficos import hex_a_rgb
+from sst.insights import generar_insight_automatico, insight_a_texto
+from sst.medicion import medido
+from sst.schema import COLOR_PRIMARY, COLOR_SECONDARY, LOGO_FILE, METAS_DEFECTO
+
+# --- MOTOR PDF EJECUTIVO ---
+
+class PDF_SST(FPDF):
+    logo_file = LOGO_FILE
+    vectorial = False
+
+    def header(self):
+        self.set_fill_color(245, 245, 245)
+        self.rect(0, 0, 210, 40, 'F')
+        if self.logo_file and os.path.exists(self.logo_file): self.image(self.logo_file, 10, 8, 35)
+
+        self.set_xy(50, 10); self.set_font('Arial', 'B', 16); self.set_text_color(*COLOR_PRIMARY)
+        self.cell(0, 8, 'SOCIEDAD MADERERA GALVEZ Y DI GENOVA LTDA', 0, 1, 'L')
+        self.set_xy(50, 18); self.set_font('Arial', 'B', 11); self.set_text_color(*COLOR_SECONDARY)
+        self.cell(0, 6, 'INFORME EJECUTIVO DE GESTIÓN SST (DS 44)', 0, 1, 'L')
+
+        self.set_draw_color(*COLOR_PRIMARY); self.set_line_width(1)
+        self.line(10, 38, 200, 38); self.ln(30)
+
+    def footer(self):
+        self.set_y(-15); self.set_font('Arial', 'I', 8); self.set_text_color(150)
+        self.cell(0, 10, f'Documento Oficial SGSST - Pagina {self.page_no()}', 0, 0, 'C')
+
+    def section_title(self, title):
+        self.set_font('Arial', 'B', 12); self.set_fill_color(*COLOR_SECONDARY); self.set_text_color(255, 255, 255)
+        self.cell(0, 8, f"  {title}", 0, 1, 'L', 1)
+        self.set_text_color(0, 0, 0); self.ln(4)
+
+    def _imagen_memoria(self, nombre, info, x, y, w, h):
+        # FPDF solo abre rutas: se registra la imagen ya decodificada y se dibuja por nombre
+        if nombre not in self.images: self.images[nombre] = dict(info, i=len(self.images)+1)
+        self.image(nombre, x=x, y=y, w=w, h=h)
+
+    def _anillo(self, cx, cy, r_ext, r_int, frac, rgb):
+        # Sector de anillo en trazado vectorial PDF (curvas Bézier), desde las 12 en sentido horario
+        frac = min(frac, 1.0)
+        if frac <= 0: return
+        k = self.k; px = lambda a, r: (cx + r * math.cos(a)) * k; py = lambda a, r: (self.h - cy + r * math.sin(a)) * k
+        a0 = math.pi / 2; a1 = a0 - 2 * math.pi * frac
+        n = max(1, math.ceil(frac * 4)); paso = (a1 - a0) / n
+        def arco(r, ini, delta):
+            t = 4 / 3 * math.tan(delta / 4); ops = []
+            for i in range(n):
+                a = ini + i * delta; b = a + delta
+                ops.append('%.3f %.3f %.3f %.3f %.3f %.3f c' % (
+                    px(a, r) - t * r * k * math.sin(a), py(a, r) + t * r * k * math.cos(a),
+                    px(b, r) + t * r * k * math.sin(b), py(b, r) - t * r * k * math.cos(b), px(b, r), py(b, r)))
+            return ops
+        self.set_fill_color(*rgb)
+        ops = ['%.3f %.3f m' % (px(a0, r_ext), py(a0, r_ext))] + arco(r_ext, a0, paso)
+        ops += ['%.3f %.3f l' % (px(a1, r_int), py(a1, r_int))] + arco(r_int, a1, -paso) + ['h f']
+        self._out(' '.join(ops))
+
+    def draw_donut_vector(self, val_pct, color_hex, x, y, size=30):
+        # Dona de gestión sin matplotlib
+        r = size / 2 * 0.72; cx = x + size / 2; cy = y + size / 2
+        self._anillo(cx, cy, r, r * 0.6, 1.0, (238, 238, 238))
+        self._anillo(cx, cy, r, r * 0.6, max(min(val_pct, 100), 0) / 100, hex_a_rgb(color_hex))
+        self.set_font('Arial', 'B', 8); self.set_text_color(51, 51, 51)
+        self.set_xy(x, cy - 3); self.cell(size, 6, f"{val_pct:.0f}%", 0, 0, 'C')
+
+    def draw_donut_chart_image(self, val_pct, color_hex, x, y, size=30):
+        try:
+            if self.vectorial: return self.draw_donut_vector(val_pct, color_hex, x, y, size)
+            info = graficos.donut_gestion(float(val_pct), color_hex)
+            self._imagen_memoria(f"donut:{float(val_pct)!r}:{color_hex}", info, x, y, size, size)
+        except: pass
+
+    def draw_kpi_circle_pair(self, title, val_m, val_a, max_scale, meta, unit, x, y):
+        try:
+            color_m = '#4CAF50' if val_m <= meta else '#F44336'
+            if "Gest" in title: color_m = '#4CAF50' if val_m >= meta else '#F44336'
+            color_a = '#4CAF50' if val_a <= meta else '#F44336'
+            if "Gest" in title: color_a = '#4CAF50' if val_a >= meta else '#F44336'
+
+            self.set_xy(x, y); self.set_font('Arial', 'B', 9)
+            self.cell(90, 8, title, 0, 1, 'C')
+            if self.vectorial: return self._kpi_pair_vector(val_m, val_a, max_scale, color_m, color_a, unit, x, y)
+            clave = (float(val_m), float(val_a), float(max_scale), color_m, color_a, unit)
+            info = graficos.kpi_par(*clave)
+            self._imagen_memoria("kpi:" + ":".join(map(repr, clave)), info, x+5, y+8, 80, 40)
+        except: pass
+
+    def _kpi_pair_vector(self, val_m, val_a, max_scale, color_m, color_a, unit, x, y):
+        for i, (val, color, titulo) in enumerate([(val_m, color_m, "MENSUAL"), (val_a, color_a, "ACUMULADO")]):
+            cx = x + 25 + i * 40; cy = y + 30; r = 14
+            self.set_font('Arial', '', 7); self.set_text_color(85, 85, 85)
+            self.set_xy(cx - 20, y + 10); self.cell(40, 4, titulo, 0, 0, 'C')
+            self._anillo(cx, cy, r, r * 0.7, 1.0, (238, 238, 238))
+            if max_scale > 0: self._anillo(cx, cy, r, r * 0.7, min(val, max_scale) / max_scale, hex_a_rgb(color))
+            self.set_font('Arial', 'B', 9); self.set_text_color(0, 0, 0)
+            self.set_xy(cx - 15, cy - 4.5); self.cell(30, 4.5, f"{val:.1f}", 0, 0, 'C')
+            self.set_xy(cx - 15, cy); self.cell(30, 4.5, unit, 0, 0, 'C')
+
+    def clean_text(self, text):
+        replacements = {'\u2013': '-', '\u2014': '-', '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"', '\u2022': '*', '€': 'EUR'}
+        for k, v in replacements.items(): text = text.replace(k, v)
+        return text.encode('latin-1', 'replace').decode('latin-1')
+
+    def footer_signatures(self):
+        y_pos = self.get_y() + 10
+        if y_pos > 250:
+            self.add_page(); y_pos = self.get_y() + 20
+        self.set_y(y_pos)
+        self.line(20, y_pos, 90, y_pos)
+        self.set_xy(20, y_pos + 2); self.set_font('Arial', 'B', 9); self.set_text_color(0,0,0)
+        self.cell(70, 5, "RODRIGO GALVEZ REBOLLEDO", 0, 1, 'C')
+        self.set_xy(20, y_pos + 7); self.set_font('Arial', '', 8)
+        self.cell(70, 5, "Gerente General / Rep. Legal", 0, 1, 'C')
+        self.line(120, y_pos, 190, y_pos)
+        self.set_xy(120, y_pos + 2); self.set_font('Arial', 'B', 9)
+        self.cell(70, 5, "ALAN GARCIA VIDAL", 0, 1, 'C')
+        self.set_xy(120, y_pos + 7); self.set_font('Arial', '', 8)
+        self.cell(70, 5, "Ingeniero en Prevención de Riesgos", 0, 1, 'C')
+        self.ln(15); self.set_font('Arial', 'I', 7); self.set_text_color(128)
+        self.multi_cell(0, 4, "Este documento es parte integrante del SGSST. Confidencial.", 0, 'C')
+
+    def draw_detailed_stats_table(self, data_list):
+        self.set_font('Arial', 'B', 9)
+        self.set_fill_color(230, 230, 230); self.set_text_color(0, 0, 0)
+        self.cell(100, 8, "INDICADOR (DS 67 / DS 40)", 1, 0, 'L', 1)
+        self.cell(45, 8, "MES ACTUAL", 1, 0, 'C', 1)
+        self.cell(45, 8, "ACUMULADO ANUAL", 1, 1, 'C', 1)
+        self.set_font('Arial', '', 9)
+        for label, val_m, val_a, is_bold in data_list:
+            if is_bold: self.set_font('Arial', 'B', 9)
+            else: self.set_font('Arial', '', 9)
+            self.ln()
+            self.cell(100, 7, f" {label}", 1, 0, 'L')
+            self.cell(45, 7, str(val_m), 1, 0, 'C')
+            self.cell(45, 7, str(val_a), 1, 1, 'C')
+
+@medido('pdf.generar_reporte_pdf')
+def generar_reporte_pdf(row_mes, acum, gestion, metas, sel_month, sel_year, insight_text=None, logo_file=LOGO_FILE, vectorial=False, centro=None):
+    # Construye el informe ejecutivo completo y devuelve los bytes del PDF
+    if insight_text is None: insight_text = generar_insight_automatico(row_mes, acum['ta_acum'], metas, acum, gestion)
+
+    pdf = PDF_SST(orientation='P', format='A4')
+    pdf.logo_file = logo_file; pdf.vectorial = vectorial
+    pdf.add_page(); pdf.set_font('Arial', 'B', 12)
+    centro_txt = f"CENTRO: {pdf.clean_text(str(centro)).upper()}   |   " if centro else ""
+    pdf.cell(0, 10, f"{centro_txt}PERIODO: {sel_month.upper()} {sel_year}", 0, 1, 'R')
+
+    pdf.section_title("1. INDICADORES VISUALES (MES vs ACUMULADO)")
+    y_start = pdf.get_y()
+    pdf.draw_kpi_circle_pair("TASA ACCIDENTABILIDAD", row_mes['Tasa Acc.'], acum['ta_acum'], 8, metas['meta_ta'], "%", 10, y_start)
+    pdf.draw_kpi_circle_pair("TASA SINIESTRALIDAD", row_mes['Tasa Sin.'], acum['ts_acum'], 50, metas.get('meta_ts', METAS_DEFECTO['meta_ts']), "Dias", 110, y_start)
+    y_start += 55
+    pdf.draw_kpi_circle_pair("TASA FRECUENCIA", row_mes['Indice Frec.'], acum['if_acum'], 50, metas.get('meta_if', METAS_DEFECTO['meta_if']), "IF", 10, y_start)
+    pdf.draw_kpi_circle_pair("TASA GRAVEDAD", row_mes['Indice Grav.'], acum['ig_acum'], 200, 50, "IG", 110, y_start)
+    pdf.set_y(y_start + 60)
+
+    pdf.section_title("2. ESTADÍSTICA DE SINIESTRALIDAD (DS 67)")
+    pdf.ln(2)
+    table_rows = [
+        ("Nro de Accidentes CTP", int(row_mes['Accidentes CTP']), int(acum['sum_acc']), False),
+        ("Nro de Enfermedades Profesionales", int(row_mes['Enf. Profesionales']), int(acum['sum_ep']), False),
+        ("Dias Perdidos (Acc. Trabajo)", int(row_mes['Días Perdidos']), int(acum['sum_dias_acc']), False),
+        ("Dias Perdidos (Enf. Profesional)", int(row_mes['Días Perdidos EP']), int(acum['sum_dias_ep']), False),
+        ("Promedio de Trabajadores", f"{row_mes['Masa Laboral']:.1f}", f"{acum['avg_masa']:.1f}", False),
+        ("Nro Accidentes Fatales", int(row_mes['Accidentes Fatales']), int(acum['sum_fatales']), False),
+        ("Nro Pensionados (Invalidez)", int(row_mes['Pensionados']), int(acum['sum_pensionados']), False),
+        ("Nro Indemnizados", int(row_mes['Indemnizados']), int(acum['sum_indemnizados']), False),
+        ("Tasa Siniestralidad (Inc. Temporal)", f"{row_mes['Tasa Sin.']:.2f}", f"{acum['ts_acum']:.2f}", False),
+        ("Dias Cargo (Inv. y Muerte)", int(row_mes['Días Cargo']), int(acum['sum_dias_cargo']), False),
+        ("Tasa de Accidentabilidad (%)", f"{row_mes['Tasa Acc.']:.2f}", f"{acum['ta_acum']:.2f}", True),
+        ("Tasa de Frecuencia", f"{row_mes['Indice Frec.']:.2f}", f"{acum['if_acum']:.2f}", True),
+        ("Tasa de Gravedad", f"{row_mes['Indice Grav.']:.0f}", f"{acum['ig_acum']:.0f}", True),
+        ("Horas Hombre (HHT)", int(row_mes['HHT']), int(acum['sum_hht']), False)
+    ]
+    pdf.draw_detailed_stats_table(table_rows)
+
+    pdf.add_page()
+    pdf.section_title("3. CUMPLIMIENTO PROGRAMA GESTIÓN")
+    insp_txt = f"{int(row_mes['Insp. Ejecutadas'])} de {int(row_mes['Insp. Programadas'])}"
+    cap_txt = f"{int(row_mes['Cap. Ejecutadas'])} de {int(row_mes['Cap. Programadas'])}"
+    med_txt = f"{int(row_mes['Medidas Cerradas'])} de {int(row_mes['Medidas Abiertas'])}"
+    salud_txt = f"{int(row_mes['Vig. Salud Vigente'])} de {int(row_mes['Expuestos Silice/Ruido'])}"
+
+    data_gest = [("Inspecciones", gestion['p_insp'], insp_txt), ("Capacitaciones", gestion['p_cap'], cap_txt),
+                 ("Hallazgos", gestion['p_medidas'], med_txt), ("Salud Ocup.", gestion['p_salud'], salud_txt)]
+
+    y_circles = pdf.get_y()
+    for i, (label, val, txt) in enumerate(data_gest):
+        x_pos = 15 + (i * 48)
+        color_hex = '#4CAF50' if val >= metas['meta_gestion'] else '#F44336'
+        pdf.draw_donut_chart_image(val, color_hex, x_pos, y_circles, size=30)
+        pdf.set_text_color(0,0,0)
+        pdf.set_xy(x_pos - 5, y_circles + 32); pdf.set_font('Arial', 'B', 8); pdf.cell(40, 4, label, 0, 1, 'C')
+        pdf.set_xy(x_pos - 5, y_circles + 36); pdf.set_font('Arial', '', 7); pdf.set_text_color(100); pdf.cell(40, 4, txt, 0, 1, 'C'); pdf.set_text_color(0)
+
+    pdf.set_y(y_circles + 45)
+    pdf.section_title("4. OBSERVACIONES DEL EXPERTO")
+    pdf.set_font('Arial', '', 10); pdf.set_text_color(0,0,0)
+    clean_insight = pdf.clean_text(insight_a_texto(insight_text))
+    obs_raw = str(row_mes.get('Observaciones', ""))
+    if obs_raw.lower() in ["nan", "none", "0", "0.0", ""]: obs_raw = "Sin observaciones registradas."
+    clean_obs = pdf.clean_text(obs_raw)
+    pdf.multi_cell(0, 6, f"ANALISIS SISTEMA:\n{clean_insight}\n\nCOMENTARIOS EXPERTO:\n{clean_obs}", 1, 'L')
+
+    pdf.ln(20); pdf.footer_signatures()
+
+    return pdf.output(dest='S').encode('latin-1')
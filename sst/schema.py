@@ -0,0 +1,71 @@
+# --- ESTRUCTURA DE DATOS ---
+# Sin dependencias pesadas al importar: pandas se carga solo al construir tablas.
+
+CSV_FILE = "base_datos_galvez_v26.csv"
+DB_FILE = "base_datos_galvez.db"
+LOGO_FILE = "logo_empresa_persistente.png"
+CENTRO_DEFECTO = "Principal"
+CONSOLIDADO = "Consolidado"
+COL_VERSION = "Version"  # versión por fila para guardado optimista (la pone el almacén, no es parte del esquema)
+MESES_ORDEN = ['Enero','Febrero','Marzo','Abril','Mayo','Junio','Julio','Agosto','Septiembre','Octubre','Noviembre','Diciembre']
+
+# COLORES
+COLOR_PRIMARY = (183, 28, 28)
+COLOR_SECONDARY = (50, 50, 50)
+
+# METAS POR DEFECTO (alertas, informe PDF y API)
+METAS_DEFECTO = {'meta_ta': 3.0, 'meta_gestion': 90, 'meta_ts': 10.0, 'meta_if': 10.0}
+
+MES_IDX = {m: i for i, m in enumerate(MESES_ORDEN)}
+
+def mes_idx(mes):
+    return MES_IDX.get(mes, 99)
+
+def get_structure_for_year(year, centro=CENTRO_DEFECTO):
+    import pandas as pd
+    data = []
+    for m in MESES_ORDEN:
+        data.append({
+            'Centro': centro, 'Año': int(year), 'Mes': m,
+            # DATOS BASE
+            'Masa Laboral': 0.0, 'Horas Extras': 0.0, 'Horas Ausentismo': 0.0,
+            # ACCIDENTABILIDAD
+            'Accidentes CTP': 0.0, 'Accidentes Fatales': 0.0,
+            'Días Perdidos': 0.0, 'Días Cargo': 0.0,
+            # ENFERMEDADES PROFESIONALES
+            'Enf. Profesionales': 0.0, 'Días Perdidos EP': 0.0,
+            # SINIESTRALIDAD DS67
+            'Pensionados': 0.0, 'Indemnizados': 0.0,
+            # GESTIÓN
+            'Insp. Programadas': 0.0, 'Insp. Ejecutadas': 0.0,
+            'Cap. Programadas': 0.0, 'Cap. Ejecutadas': 0.0,
+            'Medidas Abiertas': 0.0, 'Medidas Cerradas': 0.0,
+            'Expuestos Silice/Ruido': 0.0, 'Vig. Salud Vigente': 0.0,
+            'Observaciones': "",
+            # CALCULADOS
+            'HHT': 0.0, 'Tasa Acc.': 0.0, 'Tasa Sin.': 0.0, 'Indice Frec.': 0.0, 'Indice Grav.': 0.0
+        })
+    return pd.DataFrame(data)
+
+def inicializar_db_completa(centro=CENTRO_DEFECTO):
+    import pandas as pd
+    df_24 = get_structure_for_year(2024, centro)
+    df_25 = get_structure_for_year(2025, centro)
+    df_26 = get_structure_for_year(2026, centro)
+    return pd.concat([df_24, df_25, df_26], ignore_index=True)
+
+def version_datos(df):
+    # Huella del contenido: cambia con cualquier celda editada
+    import hashlib
+    import pandas as pd
+    h = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    h.update(",".join(map(str, df.columns)).encode())
+    return h.hexdigest()[:16]
+
+def version_incremental(version, df, filas):
+    # Nueva versión a partir de la anterior y solo las filas modificadas (costo independiente del histórico)
+    import hashlib
+    import pandas as pd
+    h = hashlib.sha1(str(version).encode())
+    h.update(pd.util.hash_pandas_object(df.loc[list(filas)], index=True).to_numpy().tobytes())
+    return h.hexdigest()[:16]
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from sst.kpi import procesar_datos
+from sst.schema import MESES_ORDEN, get_structure_for_year
+
+# --- DATOS SINTÉTICOS ---
+# Base de prueba con el esquema de get_structure_for_year para N centros x Y años,
+# generada de forma vectorizada y reproducible (semilla). Distribuciones aproximadas a
+# una faena forestal/maderera:
+#   - dotación lognormal por centro con deriva mensual y estacionalidad (cosecha);
+#   - meses con masa cero: centros que abren después del primer año y paradas (~3%);
+#   - accidentes y EP Poisson según la masa (tasa anual ~4% y ~0,5%), días perdidos
+#     lognormales por evento, fatales/pensiones muy raros (días cargo DS67);
+#   - gestión: ejecutadas/cerradas binomiales sobre lo programado/abierto.
+
+OBSERVACIONES = ["", "", "", "", "Sin novedades.", "Parada por mantención.", "Inspección de la mutual.",
+                 "Campaña de autocuidado.", "Accidente en línea de aserrío; se reforzó bloqueo de energías."]
+
+def generar_base(centros=3, anios=5, desde=2020, semilla=0, factor_base=210):
+    rng = np.random.default_rng(semilla)
+    n_meses = anios * 12
+    nombres = [f"Centro {i + 1}" for i in range(centros)]
+    forma = (centros, n_meses)
+
+    # Dotación: nivel por centro, deriva (paseo aleatorio) y estacionalidad de verano
+    nivel = rng.lognormal(np.log(80), 0.8, centros)[:, None]
+    deriva = np.exp(np.cumsum(rng.normal(0, 0.03, forma), axis=1))
+    estacion = 1 + 0.15 * np.cos(2 * np.pi * (np.arange(n_meses) % 12) / 12)
+    masa = np.round(nivel * deriva * estacion)
+    # Meses sin dotación: apertura tardía de algunos centros y paradas puntuales
+    apertura = np.where(rng.random(centros) < 0.3, rng.integers(1, max(2, n_meses // 2), centros), 0)[:, None]
+    masa[(np.arange(n_meses)[None, :] < apertura) | (rng.random(forma) < 0.03)] = 0.0
+    activo = masa > 0
+
+    extras = np.round(masa * rng.gamma(2.0, 4.0, forma), 1)
+    ausentismo = np.round(masa * factor_base * rng.beta(2, 60, forma), 1)
+    acc = rng.poisson(masa * 0.04 / 12)
+    fatales = rng.poisson(masa * 2e-5)
+    ep = rng.poisson(masa * 0.005 / 12)
+    # Días por evento ~ lognormal (mediana ~10): suma de n eventos aproximada con n * media
+    dias = np.round(acc * rng.lognormal(np.log(10), 0.9, forma))
+    dias_ep = np.round(ep * rng.lognormal(np.log(20), 0.7, forma))
+    pensionados = rng.poisson(masa * 1e-5); indemnizados = rng.poisson(masa * 5e-5)
+    dias_cargo = fatales * 6000 + pensionados * 1500 + indemnizados * rng.integers(50, 800, forma)
+
+    insp_p = np.where(activo, rng.poisson(4 + masa / 50), 0); insp_e = rng.binomial(insp_p, 0.85)
+    cap_p = np.where(activo, rng.poisson(2 + masa / 80), 0); cap_e = rng.binomial(cap_p, 0.8)
+    med_a = np.where(activo, rng.poisson(3 + acc * 2), 0); med_c = rng.binomial(med_a, 0.7)
+    expuestos = np.round(masa * rng.uniform(0.1, 0.5, centros)[:, None]); vig = rng.binomial(expuestos.astype('int64'), 0.9)
+    obs = np.array(OBSERVACIONES, dtype=object)[rng.integers(0, len(OBSERVACIONES), forma)]
+
+    valores = {
+        'Masa Laboral': masa, 'Horas Extras': extras, 'Horas Ausentismo': ausentismo,
+        'Accidentes CTP': acc, 'Accidentes Fatales': fatales, 'Días Perdidos': dias, 'Días Cargo': dias_cargo,
+        'Enf. Profesionales': ep, 'Días Perdidos EP': dias_ep, 'Pensionados': pensionados, 'Indemnizados': indemnizados,
+        'Insp. Programadas': insp_p, 'Insp. Ejecutadas': insp_e, 'Cap. Programadas': cap_p, 'Cap. Ejecutadas': cap_e,
+        'Medidas Abiertas': med_a, 'Medidas Cerradas': med_c, 'Expuestos Silice/Ruido': expuestos, 'Vig. Salud Vigente': vig,
+    }
+    df = pd.DataFrame({
+        'Centro': np.repeat(nombres, n_meses), 'Año': np.tile(np.repeat(np.arange(desde, desde + anios), 12), centros),
+        'Mes': np.tile(MESES_ORDEN, centros * anios),
+        **{c: np.where(activo, v, 0).astype('float64').ravel() for c, v in valores.items()},
+        'Observaciones': np.where(activo, obs, "").ravel(),
+    })
+    return procesar_datos(df.reindex(columns=get_structure_for_year(desde).columns), factor_base)
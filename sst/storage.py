@@ -0,0 +1,475 @@
+import os
+import sqlite3
+import tempfile
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+from sst.bloqueo import bloqueo_escritura
+from sst.historial import escritura
+from sst.kpi import calcular_derivados, procesar_datos
+from sst.medicion import medido
+from sst.schema import CENTRO_DEFECTO, COL_VERSION, CSV_FILE, DB_FILE, MES_IDX, get_structure_for_year, inicializar_db_completa
+
+# --- PERSISTENCIA ---
+# Motor por defecto: SQLite embebido (upsert por fila, commits atómicos, lectura
+# indexada por centro/año/mes). Alternativas: Parquet particionado por centro y año
+# (SST_ALMACEN=carpeta.parquet) y CSV, que queda como formato de importación/exportación
+# (SST_ALMACEN=archivo.csv).
+#
+# Concurrencia optimista: cada fila guarda una versión (COL_VERSION) que sube en 1
+# con cada escritura. upsert() compara la versión que trae cada fila con la vigente
+# (compare-and-swap) dentro del cerrojo de escritura y rechaza todo el lote con
+# ConflictoVersion si alguna cambió desde que se leyó. Versión 0 = fila nueva.
+# guardar() (reemplazo completo) hace la misma verificación con las filas que trae
+# y con las que elimina (las guardadas que no están en df); sin la columna de versión es
+# un reemplazo incondicional (importación, base sintética).
+# Los lectores nunca esperan al cerrojo.
+
+COLS_CLAVE = ['Centro', 'Año', 'Mes']
+_migrados = set()  # rutas de la base por defecto ya revisadas por migrar_csv en este proceso
+
+class ConflictoVersion(Exception):
+    def __init__(self, claves):
+        self.claves = claves
+        super().__init__(f"{len(claves)} fila(s) modificada(s) por otro usuario: " +
+                         ", ".join(f"{c} {m} {a}" for c, a, m in claves[:5]) + (" ..." if len(claves) > 5 else ""))
+
+def _py(v):
+    return v.item() if hasattr(v, 'item') else v
+
+def reparar_estructura(df):
+    # Agrega columnas faltantes y ordena según el esquema vigente
+    ref_df = get_structure_for_year(2026)
+    for col in ref_df.columns:
+        if col not in df.columns:
+            if col == 'Observaciones': df[col] = ""
+            elif col == 'Centro': df[col] = CENTRO_DEFECTO
+            else: df[col] = 0.0
+    return df[list(ref_df.columns) + ([COL_VERSION] if COL_VERSION in df.columns else [])]
+
+def _filtrar(df, year=None, month=None, centro=None):
+    for col, val in [('Centro', centro), ('Año', year), ('Mes', month)]:
+        if val is not None and col in df.columns: df = df[df[col] == val]
+    return df.reset_index(drop=True)
+
+def _con_centro(df):
+    if 'Centro' in df.columns: return df
+    return df.assign(Centro=CENTRO_DEFECTO)
+
+def _claves(df):
+    return list(zip(df['Centro'], df['Año'].astype(int), df['Mes']))
+
+def _versiones(df, defecto):
+    if COL_VERSION not in df.columns: return np.full(len(df), defecto, dtype='int64')
+    return df[COL_VERSION].fillna(defecto).to_numpy(dtype='int64')
+
+def _verificar(claves, esperadas, vigentes):
+    conflictos = [k for k, e, v in zip(claves, esperadas, vigentes) if e != v]
+    if conflictos: raise ConflictoVersion(conflictos)
+
+def _mapa_versiones(actual):
+    # {(centro, año, mes): versión}; filas guardadas antes del control de versiones = 1
+    return dict(zip(_claves(_con_centro(actual)), _versiones(actual, 1))) if not actual.empty else {}
+
+def _reemplazo(df, vigentes_tabla, cas=True, eliminadas=None):
+    # Versiones de un reemplazo completo: cada fila sube sobre la guardada. Con cas, la que
+    # trae cada fila debe ser la vigente (0 = nueva) y las guardadas que no están en df (se
+    # eliminan) deben seguir en la versión con que se leyeron: eliminadas {clave: versión};
+    # una fila que no figura ahí no la conocía quien guarda (p. ej. la creó otro usuario)
+    claves = _claves(_con_centro(df))
+    vigentes = np.array([vigentes_tabla.get(k, 0) for k in claves], dtype='int64')
+    if cas and COL_VERSION in df.columns:
+        en_df = set(claves); resto = [k for k in vigentes_tabla if k not in en_df]
+        _verificar(claves + resto, np.concatenate([_versiones(df, 0), [(eliminadas or {}).get(k, 0) for k in resto]]),
+                   np.concatenate([vigentes, [vigentes_tabla[k] for k in resto]]))
+    return vigentes + 1
+
+def _fusionar(actual, nuevas, cas=True):
+    # Aplica `nuevas` sobre `actual` por (Centro, Año, Mes), verificando versiones con cas.
+    # Devuelve (tabla resultante en el orden original, versiones escritas)
+    nuevas = _con_centro(nuevas)
+    vigentes_tabla = _mapa_versiones(actual)
+    claves = _claves(nuevas)
+    if not actual.empty and 'Observaciones' in actual.columns:
+        # Sin texto (None, o filas de la tabla compacta sin la columna): se conserva el guardado
+        previas = dict(zip(_claves(actual), actual['Observaciones']))
+        obs = nuevas['Observaciones'] if 'Observaciones' in nuevas.columns else [None] * len(nuevas)
+        nuevas = nuevas.assign(Observaciones=[o if isinstance(o, str) else previas.get(k, "") for o, k in zip(obs, claves)])
+    vigentes = np.array([vigentes_tabla.get(k, 0) for k in claves], dtype='int64')
+    if cas: _verificar(claves, _versiones(nuevas, 0), vigentes)
+    nuevas = nuevas.assign(**{COL_VERSION: vigentes + 1})
+    if actual.empty: return nuevas.reset_index(drop=True), vigentes + 1
+    todo = pd.concat([actual, nuevas], ignore_index=True)
+    grupo = todo.groupby(COLS_CLAVE, sort=False).ngroup()
+    todo = todo.assign(_g=grupo).drop_duplicates('_g', keep='last').sort_values('_g', kind='stable')
+    return todo.drop(columns='_g').reset_index(drop=True), vigentes + 1
+
+class AlmacenCSV:
+    def __init__(self, path=CSV_FILE):
+        self.path = path
+
+    def existe(self):
+        return os.path.exists(self.path)
+
+    @medido('almacen.cargar_csv')
+    def cargar(self, year=None, month=None, centro=None):
+        if not self.existe(): return pd.DataFrame()
+        df = pd.read_csv(self.path)
+        return _filtrar(df, year, month, centro)
+
+    def versiones(self):
+        # {(centro, año, mes): versión} guardadas, leyendo solo esas columnas
+        if not self.existe(): return {}
+        return _mapa_versiones(pd.read_csv(self.path, usecols=lambda c: c in COLS_CLAVE + [COL_VERSION]))
+
+    def guardar(self, df, cas=True, eliminadas=None):
+        # Reemplazo completo, con verificación de versión bajo el cerrojo
+        with bloqueo_escritura(self.path):
+            versiones = _reemplazo(df, self.versiones(), cas, eliminadas)
+            self._escribir(df.assign(**{COL_VERSION: versiones}))
+        return versiones
+
+    def _escribir(self, df):
+        # Escritura atómica: archivo temporal + os.replace (las versiones anteriores quedan en sst.historial)
+        carpeta = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(suffix=".csv", dir=carpeta)
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f: df.to_csv(f, index=False)
+            os.replace(tmp, self.path)
+        except:
+            if os.path.exists(tmp): os.unlink(tmp)
+            raise
+
+    def upsert(self, df, filas=None, cas=True):
+        # CSV no admite escritura parcial: bajo el cerrojo se relee, se aplican solo
+        # las filas indicadas sobre lo vigente y se reescribe. Devuelve las nuevas versiones
+        parte = df if filas is None else df.loc[list(filas)]
+        with bloqueo_escritura(self.path):
+            todo, versiones = _fusionar(self.cargar(), parte, cas)
+            self._escribir(todo)
+        return versiones
+
+class AlmacenSQLite:
+    TABLA = 'registros'
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+
+    def existe(self):
+        # El archivo puede existir solo con otras tablas (p. ej. el registro de eventos)
+        if not os.path.exists(self.path): return False
+        conn = self._conectar()
+        try: return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.TABLA,)).fetchone() is not None
+        finally: conn.close()
+
+    def _conectar(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _columnas(self):
+        return list(get_structure_for_year(2026).columns)
+
+    def crear(self):
+        cols = []
+        for c in self._columnas():
+            if c == 'Centro': continue
+            tipo = 'INTEGER' if c == 'Año' else 'TEXT' if c in ('Mes', 'Observaciones') else 'REAL'
+            cols.append(f'"{c}" {tipo}')
+        with self._conectar() as conn:
+            conn.execute(f'''CREATE TABLE IF NOT EXISTS {self.TABLA} ("Centro" TEXT NOT NULL DEFAULT '{CENTRO_DEFECTO}', {", ".join(cols)},
+                             "{COL_VERSION}" INTEGER NOT NULL DEFAULT 1, PRIMARY KEY ("Centro", "Año", "Mes"))''')
+            # Bases anteriores: Centro vacío (modelo de un solo centro) y sin versión por fila
+            conn.execute(f"UPDATE {self.TABLA} SET \"Centro\" = ? WHERE \"Centro\" = ''", (CENTRO_DEFECTO,))
+            if COL_VERSION not in [r[1] for r in conn.execute(f"PRAGMA table_info({self.TABLA})")]:
+                conn.execute(f'ALTER TABLE {self.TABLA} ADD COLUMN "{COL_VERSION}" INTEGER NOT NULL DEFAULT 1')
+        conn.close()
+
+    @medido('almacen.cargar_sqlite')
+    def cargar(self, year=None, month=None, centro=None):
+        if not self.existe(): return pd.DataFrame()
+        filtros, params = [], []
+        for col, val in [('Centro', centro), ('Año', year), ('Mes', month)]:
+            if val is not None: filtros.append(f'"{col}" = ?'); params.append(_py(val))
+        where = f" WHERE {' AND '.join(filtros)}" if filtros else ""
+        conn = self._conectar()
+        try: return pd.read_sql(f'SELECT * FROM {self.TABLA}{where} ORDER BY rowid', conn, params=params)
+        finally: conn.close()
+
+    def _sentencia_upsert(self, cols):
+        cols_sql = ", ".join(f'"{c}"' for c in cols)
+        marcas = ", ".join("?" for _ in cols)
+        # Observaciones NULL en la fila nueva conserva el texto guardado (ver _para_guardar)
+        sets = ", ".join(f'"{c}" = COALESCE(excluded."{c}", {self.TABLA}."{c}")' if c == 'Observaciones' else f'"{c}" = excluded."{c}"'
+                         for c in cols if c not in COLS_CLAVE)
+        return f'INSERT INTO {self.TABLA} ({cols_sql}) VALUES ({marcas}) ON CONFLICT("Centro", "Año", "Mes") DO UPDATE SET {sets}'
+
+    def _cols(self, df):
+        return ['Centro'] + [c for c in self._columnas() if c in df.columns and c != 'Centro'] + [COL_VERSION]
+
+    def _filas(self, df, cols):
+        datos = _con_centro(df).reindex(columns=cols)
+        return [tuple(_py(v) for v in fila) for fila in datos.itertuples(index=False, name=None)]
+
+    def _transaccion(self):
+        # BEGIN IMMEDIATE toma el cerrojo de escritura de SQLite (entre procesos) al inicio:
+        # la lectura de versiones y la escritura quedan en la misma sección crítica.
+        # En modo WAL los lectores siguen leyendo la última versión confirmada
+        conn = self._conectar()
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def _vigentes(self, conn, claves):
+        sql = f'SELECT "{COL_VERSION}" FROM {self.TABLA} WHERE "Centro" = ? AND "Año" = ? AND "Mes" = ?'
+        out = []
+        for c, a, m in claves:
+            fila = conn.execute(sql, (c, a, m)).fetchone()
+            out.append(fila[0] if fila else 0)
+        return np.array(out, dtype='int64')
+
+    def upsert(self, df, filas=None, cas=True):
+        # Inserta o actualiza solo las filas indicadas (índices de df) en una transacción.
+        # Devuelve las nuevas versiones de esas filas
+        self.crear()
+        parte = _con_centro(df if filas is None else df.loc[list(filas)])
+        claves = [(str(c), int(a), str(m)) for c, a, m in _claves(parte)]
+        conn = self._transaccion()
+        try:
+            vigentes = self._vigentes(conn, claves)
+            if cas: _verificar(claves, _versiones(parte, 0), vigentes)
+            cols = self._cols(parte)
+            conn.executemany(self._sentencia_upsert(cols), self._filas(parte.assign(**{COL_VERSION: vigentes + 1}), cols))
+            conn.execute("COMMIT")
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        finally: conn.close()
+        return vigentes + 1
+
+    def _leer_versiones(self, conn):
+        return _mapa_versiones(pd.read_sql(f'SELECT "Centro", "Año", "Mes", "{COL_VERSION}" FROM {self.TABLA}', conn))
+
+    def versiones(self):
+        # {(centro, año, mes): versión} guardadas
+        if not self.existe(): return {}
+        conn = self._conectar()
+        try: return self._leer_versiones(conn)
+        finally: conn.close()
+
+    def guardar(self, df, cas=True, eliminadas=None):
+        # Reemplazo completo, atómico; las versiones se leen y verifican en la misma transacción
+        self.crear()
+        cols = self._cols(df)
+        conn = self._transaccion()
+        try:
+            versiones = _reemplazo(df, self._leer_versiones(conn), cas, eliminadas)
+            conn.execute(f"DELETE FROM {self.TABLA}")
+            conn.executemany(self._sentencia_upsert(cols), self._filas(df.assign(**{COL_VERSION: versiones}), cols))
+            conn.execute("COMMIT")
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        finally: conn.close()
+        return versiones
+
+class AlmacenParquet:
+    # Carpeta particionada centro=<centro>/anio=<año>/datos.parquet. Leer un centro o
+    # un año solo abre esos archivos; guardar filas reescribe solo sus particiones
+    # (cada una es pequeña: 12 meses), con reemplazo atómico archivo a archivo
+    ARCHIVO = 'datos.parquet'
+
+    def __init__(self, path):
+        self.path = path
+
+    def existe(self):
+        return bool(self._particiones())
+
+    def _ruta(self, centro, year):
+        return os.path.join(self.path, f"centro={quote(str(centro), safe='')}", f"anio={int(year)}", self.ARCHIVO)
+
+    def _particiones(self, year=None, centro=None):
+        # [(centro, año, ruta)] que cumplen el filtro, resuelto solo con los nombres de carpeta
+        out = []
+        if not os.path.isdir(self.path): return out
+        for d_c in sorted(os.listdir(self.path)):
+            if not d_c.startswith('centro='): continue
+            c = unquote(d_c[len('centro='):])
+            if centro is not None and c != centro: continue
+            for d_y in sorted(os.listdir(os.path.join(self.path, d_c))):
+                if not d_y.startswith('anio='): continue
+                y = int(d_y[len('anio='):])
+                if year is not None and y != int(year): continue
+                ruta = os.path.join(self.path, d_c, d_y, self.ARCHIVO)
+                if os.path.exists(ruta): out.append((c, y, ruta))
+        return out
+
+    def centros(self):
+        return sorted({c for c, _, _ in self._particiones()})
+
+    @medido('almacen.cargar_parquet')
+    def cargar(self, year=None, month=None, centro=None):
+        partes = [pd.read_parquet(ruta) for _, _, ruta in self._particiones(year, centro)]
+        if not partes: return pd.DataFrame()
+        return _filtrar(pd.concat(partes, ignore_index=True), month=month)
+
+    def _escribir(self, parte, ruta):
+        carpeta = os.path.dirname(ruta)
+        os.makedirs(carpeta, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix=".parquet", dir=carpeta); os.close(fd)
+        try:
+            parte.to_parquet(tmp, index=False)
+            os.replace(tmp, ruta)
+        except:
+            if os.path.exists(tmp): os.unlink(tmp)
+            raise
+
+    def _ordenar(self, parte):
+        return parte.iloc[parte['Mes'].map(MES_IDX).fillna(99).argsort(kind='stable')].reset_index(drop=True)
+
+    def upsert(self, df, filas=None, cas=True):
+        # Fusiona las filas con lo ya guardado en cada partición (centro, año) tocada.
+        # Se verifican todas las particiones antes de escribir la primera
+        parte = _con_centro(df if filas is None else df.loc[list(filas)])
+        versiones = pd.Series(0, index=parte.index, dtype='int64')
+        with bloqueo_escritura(self.path):
+            escrituras = []
+            for (centro, year), nuevas in parte.groupby(['Centro', 'Año'], sort=False):
+                ruta = self._ruta(centro, year)
+                actual = pd.read_parquet(ruta) if os.path.exists(ruta) else pd.DataFrame()
+                todo, v = _fusionar(actual, nuevas, cas)
+                escrituras.append((self._ordenar(todo), ruta)); versiones[nuevas.index] = v
+            for todo, ruta in escrituras: self._escribir(todo, ruta)
+        return versiones.to_numpy()
+
+    def versiones(self):
+        # {(centro, año, mes): versión} guardadas, leyendo solo esas columnas de cada partición
+        partes = [pd.read_parquet(ruta, columns=COLS_CLAVE + [COL_VERSION]) for _, _, ruta in self._particiones()]
+        return _mapa_versiones(pd.concat(partes, ignore_index=True)) if partes else {}
+
+    def guardar(self, df, cas=True, eliminadas=None):
+        # Reemplazo completo: escribe cada partición y elimina las que ya no están en df.
+        # Las versiones de todas las particiones se verifican antes de escribir la primera
+        df = _con_centro(df); vigentes = set()
+        with bloqueo_escritura(self.path):
+            versiones = _reemplazo(df, self.versiones(), cas, eliminadas)
+            df = df.assign(**{COL_VERSION: versiones})
+            for (centro, year), parte in df.groupby(['Centro', 'Año'], sort=False):
+                ruta = self._ruta(centro, year); vigentes.add(ruta)
+                self._escribir(parte.reset_index(drop=True), ruta)
+            for _, _, ruta in self._particiones():
+                if ruta not in vigentes: os.unlink(ruta)
+        return versiones
+
+def migrar_csv(csv_path=CSV_FILE, db_path=DB_FILE):
+    # Migración única: importa el CSV histórico a SQLite si la base aún no existe
+    destino = AlmacenSQLite(db_path)
+    if destino.existe() or not os.path.exists(csv_path): return destino
+    df = pd.read_csv(csv_path)
+    if not df.empty: destino.guardar(procesar_datos(reparar_estructura(df), 210), cas=False)
+    return destino
+
+def abrir_almacen(path=None):
+    # .csv -> AlmacenCSV; .parquet (carpeta) -> AlmacenParquet; cualquier otro -> SQLite (migrando el CSV la primera vez)
+    path = path or os.environ.get('SST_ALMACEN') or DB_FILE
+    if path.lower().endswith('.csv'): return AlmacenCSV(path)
+    if path.lower().rstrip('/\\').endswith('.parquet'): return AlmacenParquet(path)
+    if path == DB_FILE and os.path.abspath(path) not in _migrados:
+        # Una vez por proceso: abrir_almacen se llama en cada ejecución de la app y en cada firma
+        destino = migrar_csv(CSV_FILE, path); _migrados.add(os.path.abspath(path))
+        return destino
+    return AlmacenSQLite(path)
+
+@medido('storage.load_data')
+def load_data(almacen=None, centro=None):
+    # centro: carga solo ese centro de trabajo (el resto no se lee)
+    # Solo una base inexistente o vacía parte de cero; un error de lectura se propaga
+    # (antes se descartaba el archivo y se mostraba una base vacía)
+    almacen = almacen or abrir_almacen()
+    df = almacen.cargar(centro=centro) if almacen.existe() else pd.DataFrame()
+    if df.empty: return inicializar_db_completa()
+    # Filas guardadas antes del control de versiones cuentan como versión 1
+    if COL_VERSION not in df.columns: df[COL_VERSION] = 1
+    # Se procesa inicialmente con 210, luego la UI lo actualiza si cambia
+    return procesar_datos(reparar_estructura(df), 210)
+
+def _para_guardar(df, almacen, textos=None, completo=False):
+    # Tabla compacta (sst.compacto, sin Observaciones): se escribe con los tipos anchos.
+    # textos {fila: texto} trae las observaciones editadas; el resto conserva el texto
+    # guardado (None en upsert; en un reemplazo completo se lee del almacén)
+    if 'Observaciones' in df.columns and not textos: return df
+    from sst.compacto import Observaciones, ensanchar
+    out = ensanchar(df)
+    if 'Observaciones' not in out.columns:
+        if completo: out['Observaciones'] = Observaciones(almacen).columna(out).to_numpy() if almacen.existe() else ""
+        elif textos: out['Observaciones'] = None
+        else: return out
+    if textos:
+        out['Observaciones'] = out['Observaciones'].astype(object)
+        for idx, t in textos.items():
+            if idx in out.index: out.at[idx, 'Observaciones'] = t
+    return out
+
+@medido('storage.save_data')
+def save_data(df, factor_base, almacen=None, filas=None, textos=None, motivo="guardado", eliminadas=None):
+    # filas: índices modificados (solo esas filas se recalculan y escriben, con verificación
+    # de versión: ConflictoVersion si otro usuario las cambió); None (o base aún inexistente)
+    # procesa y escribe la base completa, verificando las versiones de todas las filas de df
+    # si trae la columna; eliminadas {clave: versión leída}: filas guardadas que el reemplazo
+    # quita a sabiendas (ver _reemplazo). Las versiones nuevas quedan en df.
+    # textos: {fila: observación} para una tabla compacta (la columna no está en df)
+    # motivo: queda en el historial junto con las celdas que cambiaron
+    df_calc = procesar_datos(df, factor_base) if filas is None else calcular_derivados(df, factor_base, filas)
+    almacen = almacen or abrir_almacen()
+    with escritura(almacen) as historial:
+        completo = filas is None or not almacen.existe()
+        if completo:
+            escrito = _para_guardar(df_calc, almacen, textos, completo=True)
+            df_calc[COL_VERSION] = almacen.guardar(escrito, eliminadas=eliminadas)
+        else:
+            filas = list(filas)
+            escrito = _para_guardar(df_calc.loc[filas], almacen, textos)
+            versiones = almacen.upsert(escrito)
+            # Al tipo de la columna (int32 en la tabla compacta)
+            df_calc.loc[filas, COL_VERSION] = versiones.astype(df_calc[COL_VERSION].dtype) if COL_VERSION in df_calc else versiones
+        if historial: historial.registrar(escrito, completo, motivo)
+    from sst.compartido import invalidar
+    invalidar(almacen.path)
+    return df_calc
+
+def fusionar_meses(almacen, pares, valores, factor_base=210, intentos=3, motivo="fusión de meses"):
+    # Escribe valores por mes (Centro, Año, Mes + columnas) sobre lo vigente: las columnas no
+    # incluidas se conservan, un centro/año nuevo (pares) se crea con sus 12 meses y solo esas
+    # filas recalculan HHT e índices. Un único upsert con verificación de versión.
+    # `valores` puede ser una función: se evalúa después de leer las versiones, así un
+    # reintento por conflicto recalcula con datos frescos. Devuelve las filas escritas
+    from sst.compartido import invalidar
+    pares = [(str(c), int(y)) for c, y in pares]
+    for intento in range(intentos):
+        actuales = [almacen.cargar(year=y, centro=c) for c, y in pares] if almacen.existe() else []
+        actual = pd.concat([a for a in actuales if not a.empty] or [pd.DataFrame(columns=COLS_CLAVE)], ignore_index=True)
+        existentes = set(zip(actual['Centro'], actual['Año'].astype(int))) if not actual.empty else set()
+        nuevos = [get_structure_for_year(y, c) for c, y in pares if (c, y) not in existentes]
+        base = pd.concat([actual] + nuevos, ignore_index=True)
+        if COL_VERSION not in base: base[COL_VERSION] = 0
+        base = reparar_estructura(base.assign(**{COL_VERSION: base[COL_VERSION].fillna(0)})).set_index(COLS_CLAVE)
+        nuevas = (valores() if callable(valores) else valores).set_index(COLS_CLAVE)
+        faltan = nuevas.index.difference(base.index)
+        if len(faltan):  # meses que no estaban en la base (p. ej. filas borradas): se agregan
+            base = pd.concat([base, pd.DataFrame(index=faltan, columns=base.columns).assign(**{COL_VERSION: 0})])
+        for c in nuevas.columns: base.loc[nuevas.index, c] = nuevas[c].to_numpy()
+        tocadas = base.index.isin(nuevas.index) | (base[COL_VERSION].fillna(0).to_numpy() == 0)
+        filas = procesar_datos(base[tocadas].reset_index(), factor_base)
+        if filas.empty: return 0
+        try:
+            with escritura(almacen) as historial:
+                almacen.upsert(filas)
+                if historial: historial.registrar(filas, motivo=motivo)
+            break
+        except ConflictoVersion:
+            if intento == intentos - 1: raise
+    invalidar(almacen.path)
+    return len(filas)
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sst.sintetico import generar_base
+from sst.storage import abrir_almacen, save_data
+
+MOTORES = ['db', 'csv', 'parquet']
+
+@pytest.fixture(params=MOTORES)
+def almacen(request, tmp_path):
+    # Un almacén vacío por motor (SQLite, CSV, Parquet particionado)
+    return abrir_almacen(str(tmp_path / f"base.{request.param}"))
+
+@pytest.fixture
+def base(almacen):
+    # 2 centros x 1 año guardados (instantánea 1 del historial)
+    save_data(generar_base(2, 1, 2025), 210, almacen)
+    return almacen
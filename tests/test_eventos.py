@@ -0,0 +1,43 @@
+import pandas as pd
+
+from sst.eventos import registrar
+from sst.incremental import RegistroCambios
+from sst.storage import load_data, save_data
+
+# --- EVENTOS: RESUMEN MENSUAL ---
+
+def mes(almacen, centro, month, col):
+    df = load_data(almacen)
+    return df[(df['Centro'] == centro) & (df['Año'] == 2025) & (df['Mes'] == month)][col].iloc[0]
+
+def eventos(*filas):
+    return pd.DataFrame(filas, columns=['Centro', 'Fecha', 'Trabajador', 'Tipo', 'Días Perdidos', 'Días Cargo'])
+
+def test_eventos_se_resumen_por_mes(base):
+    registrar(base, eventos(('Centro 1', '2025-01-15', 'a', 'Accidente CTP', 10, 0),
+                            ('Centro 1', '20/01/2025', 'b', 'Accidente CTP', 2, 0),
+                            ('Centro 1', '2025-01-20', 'c', 'Enf. Profesional', 5, 0),
+                            ('Centro 1', '2025-02-01', 'd', 'Accidente Fatal', 0, 6000)))
+    assert mes(base, 'Centro 1', 'Enero', 'Accidentes CTP') == 2
+    assert mes(base, 'Centro 1', 'Enero', 'Días Perdidos') == 12
+    assert mes(base, 'Centro 1', 'Enero', 'Enf. Profesionales') == 1
+    assert mes(base, 'Centro 1', 'Enero', 'Días Perdidos EP') == 5
+    assert mes(base, 'Centro 1', 'Febrero', 'Accidentes Fatales') == 1
+    assert mes(base, 'Centro 1', 'Febrero', 'Días Cargo') == 6000
+
+def test_mover_y_borrar_recalculan_ambos_meses(base):
+    (i, j), _ = registrar(base, eventos(('Centro 1', '2025-01-15', 'a', 'Accidente CTP', 10, 0),
+                                        ('Centro 1', '2025-01-16', 'b', 'Accidente CTP', 3, 0)))
+    _, meses = registrar(base, cambios={i: {'Fecha': '2025-03-02'}})
+    assert meses == {('Centro 1', 2025, 'Enero'), ('Centro 1', 2025, 'Marzo')}
+    assert (mes(base, 'Centro 1', 'Enero', 'Accidentes CTP'), mes(base, 'Centro 1', 'Marzo', 'Días Perdidos')) == (1, 10)
+    registrar(base, borrar=[j])
+    assert mes(base, 'Centro 1', 'Enero', 'Accidentes CTP') == 0
+
+def test_meses_sin_eventos_conservan_lo_digitado(base):
+    df = load_data(base); idx = df.index[(df['Centro'] == 'Centro 2') & (df['Mes'] == 'Junio')][0]
+    cambios = RegistroCambios(); cambios.editar(df, idx, {'Accidentes CTP': 4.0})
+    save_data(df, 210, base, filas=cambios.filas)
+    registrar(base, eventos(('Centro 1', '2025-06-10', 'a', 'Accidente CTP', 1, 0)))
+    assert mes(base, 'Centro 2', 'Junio', 'Accidentes CTP') == 4.0
+    assert mes(base, 'Centro 1', 'Junio', 'Accidentes CTP') == 1
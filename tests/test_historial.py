@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from sst import historial
+from sst.historial import abrir_historial, restaurar
+from sst.incremental import RegistroCambios
+from sst.kpi import COLS_DERIVADAS
+from sst.schema import COL_VERSION
+from sst.storage import ConflictoVersion, fusionar_meses, load_data, save_data
+
+# --- HISTORIAL: RECONSTRUCCIÓN Y RESTAURACIÓN ---
+
+def entradas(df):
+    # Columnas de entrada comparables entre la base y una instantánea
+    cols = [c for c in historial._columnas() if c not in COLS_DERIVADAS + ['Observaciones']]
+    return df[['Centro', 'Año', 'Mes'] + cols].astype({'Año': 'int64'}).reset_index(drop=True)
+
+def editar(almacen, idx, valores):
+    df = load_data(almacen); cambios = RegistroCambios(); cambios.editar(df, idx, valores)
+    return save_data(df, 210, almacen, filas=cambios.filas)
+
+@pytest.mark.parametrize('compactar', [1.0, 0.001])  # 0.001: un checkpoint casi en cada guardado
+def test_estado_reconstruye_cada_instantanea(base, monkeypatch, compactar):
+    monkeypatch.setattr(historial, 'COMPACTAR', compactar)
+    vistas = {1: entradas(load_data(base))}
+    for i, valores in enumerate([{'Accidentes CTP': 3.0}, {'Masa Laboral': 90000.05}, {'Accidentes CTP': 0.0, 'Días Perdidos': 4.0}]):
+        editar(base, i * 5, valores)
+        vistas[int(abrir_historial(base).instantaneas()['id'].max())] = entradas(load_data(base))
+    hist = abrir_historial(base)
+    for sid, esperado in vistas.items():
+        pd.testing.assert_frame_equal(entradas(hist.estado(sid)), esperado, check_dtype=False)
+
+def test_cambio_pequeno_queda_registrado(base):
+    editar(base, 0, {'Horas Ausentismo': 90000.0})
+    editar(base, 0, {'Horas Ausentismo': 90000.05})
+    cambios = abrir_historial(base).cambios('Centro 1', 2025, 'Enero')
+    assert (cambios['Valor'] == 90000.05).any()
+
+def test_restaurar_vuelve_al_estado_y_sube_versiones(base):
+    original = entradas(load_data(base))
+    sesion = load_data(base)
+    editar(base, 0, {'Accidentes CTP': 8.0})
+    restaurar(1, base)
+    df = load_data(base)
+    pd.testing.assert_frame_equal(entradas(df), original, check_dtype=False)
+    assert df[COL_VERSION].min() >= 2
+    assert abrir_historial(base).instantaneas()['motivo'].iloc[-1] == "restaurar instantánea 1"
+    with pytest.raises(ConflictoVersion): save_data(sesion, 210, base)  # una sesión anterior a la restauración
+
+def test_restaurar_elimina_filas_posteriores(base):
+    fusionar_meses(base, [('Centro 3', 2025)], pd.DataFrame({'Centro': ['Centro 3'], 'Año': [2025], 'Mes': ['Enero'], 'Accidentes CTP': [1.0]}))
+    restaurar(1, base)
+    assert 'Centro 3' not in set(load_data(base)['Centro'])
+
+def test_restaurar_reintenta_si_otro_escribe_entre_medio(base, monkeypatch):
+    leer = base.versiones; lecturas = []
+    def versiones():
+        v = leer(); lecturas.append(1)
+        if len(lecturas) == 1: editar(base, 0, {'Accidentes CTP': 5.0})  # otro usuario, justo después de la lectura
+        return v
+    monkeypatch.setattr(base, 'versiones', versiones)
+    restaurar(1, base)
+    monkeypatch.undo()
+    assert load_data(base).at[0, 'Accidentes CTP'] == abrir_historial(base).estado(1).at[0, 'Accidentes CTP']
@@ -0,0 +1,83 @@
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+from sst.incremental import RegistroCambios
+from sst.schema import COL_VERSION
+from sst.sintetico import generar_base
+from sst.storage import ConflictoVersion, abrir_almacen, fusionar_meses, load_data, save_data
+
+# --- CONCURRENCIA OPTIMISTA (compare-and-swap por versión de fila) ---
+
+def editar(df, idx, valores, almacen):
+    cambios = RegistroCambios(); cambios.editar(df, idx, valores)
+    return save_data(df, 210, almacen, filas=cambios.filas)
+
+def test_guardado_parcial_con_version_vieja_se_rechaza(base):
+    a, b = load_data(base), load_data(base)
+    editar(a, 0, {'Accidentes CTP': 7.0}, base)
+    with pytest.raises(ConflictoVersion) as e: editar(b, 0, {'Accidentes CTP': 9.0}, base)
+    assert e.value.claves == [('Centro 1', 2025, 'Enero')]
+    assert load_data(base).at[0, 'Accidentes CTP'] == 7.0
+
+def test_filas_distintas_no_chocan(base):
+    a, b = load_data(base), load_data(base)
+    editar(a, 0, {'Accidentes CTP': 7.0}, base)
+    editar(b, 1, {'Accidentes CTP': 9.0}, base)
+    df = load_data(base)
+    assert (df.at[0, 'Accidentes CTP'], df.at[1, 'Accidentes CTP']) == (7.0, 9.0)
+
+def test_reemplazo_completo_verifica_versiones(base):
+    a, b = load_data(base), load_data(base)
+    a = save_data(a, 210, base)
+    assert a[COL_VERSION].eq(2).all()
+    with pytest.raises(ConflictoVersion): save_data(b, 210, base)
+    assert load_data(base)[COL_VERSION].eq(2).all()
+
+def test_reemplazo_completo_no_borra_filas_que_no_conocia(base):
+    df = load_data(base)
+    fusionar_meses(base, [('Centro 3', 2025)], pd.DataFrame({'Centro': ['Centro 3'], 'Año': [2025], 'Mes': ['Enero'], 'Accidentes CTP': [1.0]}))
+    with pytest.raises(ConflictoVersion) as e: save_data(df, 210, base)
+    assert {c for c, _, _ in e.value.claves} == {'Centro 3'}
+    assert 'Centro 3' in set(load_data(base)['Centro'])
+
+def test_reemplazo_sin_columna_de_version_es_incondicional(base):
+    editar(load_data(base), 0, {'Accidentes CTP': 7.0}, base)
+    df = save_data(generar_base(2, 1, 2025), 210, base)
+    assert load_data(base).at[0, 'Accidentes CTP'] == generar_base(2, 1, 2025).at[0, 'Accidentes CTP']
+    assert df[COL_VERSION].min() >= 2
+
+def test_fusionar_meses_conserva_columnas_no_incluidas(base):
+    antes = load_data(base).set_index(['Centro', 'Año', 'Mes'])
+    fusionar_meses(base, [('Centro 1', 2025)], pd.DataFrame({'Centro': ['Centro 1'], 'Año': [2025], 'Mes': ['Marzo'], 'Accidentes CTP': [4.0]}))
+    despues = load_data(base).set_index(['Centro', 'Año', 'Mes'])
+    k = ('Centro 1', 2025, 'Marzo')
+    assert despues.at[k, 'Accidentes CTP'] == 4.0
+    assert despues.at[k, 'Masa Laboral'] == antes.at[k, 'Masa Laboral']
+    assert despues.at[k, COL_VERSION] == antes.at[k, COL_VERSION] + 1
+    otras = despues.index != k
+    assert despues.loc[otras, COL_VERSION].equals(antes.loc[otras, COL_VERSION])
+
+# --- ESCRITORES CONCURRENTES: NINGUNA ACTUALIZACIÓN PERDIDA ---
+
+def _escritor(path, veces, largada):
+    # Ciclo de la app: leer fila -> sumar 1 -> guardar con verificación (reintento si hay conflicto)
+    almacen = abrir_almacen(path)
+    largada.wait()
+    for _ in range(veces):
+        while True:
+            fila = almacen.cargar(year=2025, month='Enero', centro='Centro 1')
+            fila.loc[0, 'Accidentes CTP'] += 1
+            try: save_data(fila, 210, almacen, filas=[0]); break
+            except ConflictoVersion: continue
+
+def test_escritores_concurrentes_sin_actualizaciones_perdidas(base):
+    procesos, veces = 4, 10
+    inicial = load_data(base).at[0, 'Accidentes CTP']
+    ctx = multiprocessing.get_context('spawn'); largada = ctx.Barrier(procesos)
+    ps = [ctx.Process(target=_escritor, args=(base.path, veces, largada)) for _ in range(procesos)]
+    for p in ps: p.start()
+    for p in ps: p.join(120)
+    assert all(p.exitcode == 0 for p in ps)
+    assert load_data(base).at[0, 'Accidentes CTP'] == inicial + procesos * veces